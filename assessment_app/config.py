@@ -10,12 +10,100 @@ class Config:
     DB_HOST = os.getenv("POSTGRES_HOST", "db")
     DB_PORT = os.getenv("POSTGRES_PORT", "5432")
     DB_NAME = os.getenv("POSTGRES_DB", "db")
+    DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+    # Startup: skip table creation when migrations have already been applied
+    SKIP_DDL = os.getenv("SKIP_DDL", "false").lower() == "true"
+    WARMUP_MARKET_DATA = os.getenv("WARMUP_MARKET_DATA", "true").lower() == "true"
     
     # Security configuration
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+    # Asymmetric JWT signing: a directory of <kid>.pem private keys (signing nodes)
+    # and/or a JWKS URL or file to verify against (verifying nodes). HS256 with
+    # SECRET_KEY is used when neither is set.
+    JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+    JWT_JWKS_URL = os.getenv("JWT_JWKS_URL")
+    JWKS_REFRESH_SECONDS = int(os.getenv("JWKS_REFRESH_SECONDS", "300"))
+    JWKS_MIN_REFETCH_SECONDS = int(os.getenv("JWKS_MIN_REFETCH_SECONDS", "30"))
+
+    # Password hashing: "bcrypt" or "argon2"; stored hashes are upgraded on login
+    PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+    ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))
+    ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+    # Verified tokens are cached so authenticated requests skip the user lookup
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
+    # Token revocation: each worker rebuilds its Bloom filter from the table this often
+    REVOCATION_REFRESH_SECONDS = int(os.getenv("REVOCATION_REFRESH_SECONDS", "30"))
+    REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+    REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
     
+    # Directory holding one <SYMBOL>.csv of daily bars per stock
+    DATA_DIR = os.getenv("MARKET_DATA_DIR", "assessment_app/data")
+
+    # Per-user, per-route rate limits as "<requests>/<seconds>"; RATE_LIMIT_RULES overrides
+    # the default for specific routes, e.g. "POST /market/trade=30/60;POST /backtest=5/60".
+    # RATE_LIMIT_STORE=database shares sliding-window counts between workers.
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+    RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "300/60")
+    RATE_LIMIT_RULES = os.getenv("RATE_LIMIT_RULES", "POST /market/trade=30/60;POST /backtest=5/60")
+    RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+
+    # Serialized market-data responses kept in memory, bounded by total body size
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESPONSE_CACHE_MAX_AGE = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "31536000"))
+
+    # Response compression, in order of preference among the codings a client accepts.
+    # Bodies smaller than COMPRESSION_MINIMUM_SIZE bytes are sent uncompressed.
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+    ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+    # /metrics; with METRICS_MULTIPROC_DIR set, each worker writes its metrics to that
+    # directory every METRICS_FLUSH_SECONDS and /metrics reports the sum over all workers
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+    # Request tracing: spans are kept only for requests slower than TRACE_SLOW_THRESHOLD_MS
+    # (or failing with a 5xx) and exported as OTLP/JSON lines to TRACE_FILE or stdout
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")
+    TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+    TRACE_SLOW_THRESHOLD_MS = float(os.getenv("TRACE_SLOW_THRESHOLD_MS", "500"))
+    TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "1000"))
+    TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "stock-simulator")
+
+    # Position snapshots older than this are compacted to one per month
+    SNAPSHOT_RETENTION_DAYS = int(os.getenv("SNAPSHOT_RETENTION_DAYS", "90"))
+
+    # Trades table partitioning (Postgres only) and cold-partition archival
+    TRADES_PARTITIONED = os.getenv("TRADES_PARTITIONED", "false").lower() == "true"
+    TRADE_PARTITION_MONTHS_AHEAD = int(os.getenv("TRADE_PARTITION_MONTHS_AHEAD", "3"))
+    TRADE_HOT_MONTHS = int(os.getenv("TRADE_HOT_MONTHS", "12"))
+    TRADE_ARCHIVE_DIR = os.getenv("TRADE_ARCHIVE_DIR", "archive/trades")
+
+    # Each worker rebuilds its in-memory task interval index from the table this often
+    TASK_INDEX_REFRESH_SECONDS = int(os.getenv("TASK_INDEX_REFRESH_SECONDS", "30"))
+
+    # Largest number of rows accepted by one bulk task or group import
+    BULK_IMPORT_MAX_ROWS = int(os.getenv("BULK_IMPORT_MAX_ROWS", "100000"))
+
+    # Seconds the schedule endpoint may spend leveling before it returns the schedule as incomplete
+    SCHEDULE_FLOW_SECONDS = float(os.getenv("SCHEDULE_FLOW_SECONDS", "0.8"))
+
     # Test user configuration
     TEST_USER_ID = "test-user-id"
     TEST_USER_EMAIL = "test@example.com" 
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Revoked-token cleanup.
+
+Deletes revocation rows whose tokens have all expired; they no longer need to
+be in the table or in the workers' Bloom filters. Run with
+`python -m assessment_app.jobs.revocation_purge`.
+"""
+import logging
+from datetime import datetime
+
+from assessment_app.repository.database import SessionLocal, get_engine
+from assessment_app.repository.revoked_token_repository import RevokedTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+def run() -> None:
+    get_engine()
+    db = SessionLocal()
+    try:
+        deleted = RevokedTokenRepository(db).delete_expired(datetime.utcnow())
+        logger.info(f"Deleted {deleted} expired token revocations")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Token revocation purge failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+"""
+Nightly position snapshot compaction.
+
+Values every snapshot written since the last run at closing prices (the daily
+P&L rollup) and thins snapshots older than the retention window to one per
+month. Run with `python -m assessment_app.jobs.snapshot_compaction`.
+"""
+import logging
+from datetime import date, timedelta
+
+from assessment_app.config import Config
+from assessment_app.repository.database import SessionLocal, get_engine
+from assessment_app.service.position_service import PositionService
+
+logger = logging.getLogger(__name__)
+
+
+def run(retention_days: int = Config.SNAPSHOT_RETENTION_DAYS) -> None:
+    get_engine()
+    db = SessionLocal()
+    try:
+        service = PositionService(db)
+        valued = service.value_snapshots()
+        removed = service.compact_snapshots(date.today() - timedelta(days=retention_days))
+        db.commit()
+        logger.info(f"Valued {valued} position snapshots, removed {removed} superseded snapshots")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Snapshot compaction failed: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
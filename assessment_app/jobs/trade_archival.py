@@ -0,0 +1,58 @@
+"""
+Trade partition maintenance and archival.
+
+Creates the upcoming monthly partitions of `trades`, then moves partitions
+older than Config.TRADE_HOT_MONTHS to zstd-compressed Parquet files in
+Config.TRADE_ARCHIVE_DIR and drops them from Postgres. Archived rows stay
+visible through TradeRepository. Run with
+`python -m assessment_app.jobs.trade_archival`.
+"""
+import logging
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import text
+
+from assessment_app.config import Config
+from assessment_app.repository.database import get_engine
+from assessment_app.repository.trade_archive import TradeArchive
+from assessment_app.repository.trade_partitions import get_partition_manager
+
+logger = logging.getLogger(__name__)
+
+
+def archive_cutoff(today: date, hot_months: int) -> date:
+    """First day of the oldest month that stays in the database"""
+    months = today.year * 12 + today.month - 1 - hot_months
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def run(hot_months: int = Config.TRADE_HOT_MONTHS, archive_dir: str = Config.TRADE_ARCHIVE_DIR) -> int:
+    engine = get_engine()
+    manager = get_partition_manager(engine)
+    if not manager.enabled:
+        logger.info("Trades table is not partitioned, nothing to archive")
+        return 0
+
+    manager.ensure_default_partition()
+    manager.ensure_partitions_ahead(date.today())
+
+    archive = TradeArchive(archive_dir)
+    cutoff = archive_cutoff(date.today(), hot_months)
+    archived = 0
+    for name, year, month in manager.list_partitions():
+        if date(year, month, 1) >= cutoff:
+            break
+        with engine.connect() as conn:
+            df = pd.read_sql(text(f"SELECT * FROM {name}"), conn)
+        # The file is in place before the partition is dropped, so rows are never unreachable
+        if not df.empty:
+            archive.write_month(year, month, df)
+        manager.drop_partition(name, year, month)
+        archived += 1
+        logger.info(f"Archived {len(df)} trades from {name}")
+    return archived
+
+
+if __name__ == "__main__":
+    run()
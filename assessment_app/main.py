@@ -1,23 +1,70 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from assessment_app.config import Config
+from assessment_app.middleware.compression import CompressionMiddleware
+from assessment_app.middleware.metrics import MetricsMiddleware
+from assessment_app.middleware.tracing import TracingMiddleware
+from assessment_app.models.constants import StockSymbols
 from assessment_app.routers.user_mgmt import router as user_mgmt_router
 from assessment_app.routers.strategy import router as strategy_router
 from assessment_app.routers.market_integration import router as market_router
 from assessment_app.routers.analysis import router as analysis_router
 from assessment_app.routers.groups import router as group_router
 from assessment_app.routers.tasks import router as task_router
+from assessment_app.routers.trades import router as trades_router
+from assessment_app.routers.metrics import router as metrics_router
 from assessment_app.repository.init_db import init_db
+from assessment_app.service.price_store import get_price_store
+from assessment_app.utils.metrics import get_multiprocess_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup work runs here instead of at import, so importing the app never touches
+    the database. Schema creation and market-data warmup run concurrently.
+    """
+    startup = []
+    if not Config.SKIP_DDL:
+        startup.append(run_in_threadpool(init_db))
+    if Config.WARMUP_MARKET_DATA:
+        startup.append(run_in_threadpool(get_price_store().warmup, [s.value for s in StockSymbols]))
+    await asyncio.gather(*startup)
+    metrics_snapshots = get_multiprocess_snapshots() if Config.METRICS_ENABLED else None
+    if metrics_snapshots is not None:
+        metrics_snapshots.start()
+    logger.info("Application startup complete")
+    yield
+    if metrics_snapshots is not None:
+        metrics_snapshots.stop()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
-# Initialize database
-init_db()
+if Config.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if Config.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+# Added last so it is outermost and its latency includes the other middleware
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(user_mgmt_router, prefix="", tags=["user_mgmt"])
 app.include_router(strategy_router, prefix="", tags=["strategy"])
 app.include_router(market_router, prefix="", tags=["market_data"])
+app.include_router(trades_router, prefix="", tags=["trades"])
 app.include_router(analysis_router, prefix="", tags=["analysis"])
 app.include_router(group_router, prefix="", tags=["analysis"])
 app.include_router(task_router, prefix="", tags=["analysis"])
+if Config.METRICS_ENABLED:
+    app.include_router(metrics_router, prefix="", tags=["metrics"])
 
 
 @app.get("/")
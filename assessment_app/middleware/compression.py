@@ -0,0 +1,175 @@
+import zlib
+from typing import Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from assessment_app.config import Config
+
+# brotli and zstandard are optional; encodings whose module is missing are never offered
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+class GzipEncoder:
+    def __init__(self, level: int = Config.GZIP_LEVEL):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int = Config.BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int = Config.ZSTD_LEVEL):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+ENCODERS = {"gzip": GzipEncoder}
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    accepted = {}
+    for part in filter(None, (part.strip() for part in header.split(","))):
+        coding, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: str, preferred: Sequence[str]) -> Optional[str]:
+    """Pick the client's highest-q coding we support, ties going to the earlier entry in preferred"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in preferred:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in ENCODERS and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON and text responses with zstd, brotli or gzip, as negotiated via Accept-Encoding.
+    Complete bodies below minimum_size go out as-is: small responses such as single ticks
+    would gain a few bytes at best and still pay the CPU cost. Streaming responses are
+    compressed chunk by chunk and flushed after each one, so clients still get rows as they
+    are produced. Responses that are already encoded pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = Config.COMPRESSION_MINIMUM_SIZE,
+                 encodings: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings or [e.strip() for e in Config.COMPRESSION_ENCODINGS.split(",") if e.strip()]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Holds back http.response.start until the first body chunk shows whether to compress"""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._encoder = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._encoder is None:
+            headers = Headers(raw=self._start["headers"])
+            if (
+                "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                self._passthrough = True
+                await self._send(self._start)
+                await self._send(message)
+                return
+            self._encoder = ENCODERS[self.encoding]()
+            self._rewrite_headers()
+
+        if more_body:
+            body = self._encoder.compress(body) if body else b""
+        elif self._start is not None:
+            # The whole body is in this one message
+            body = self._encoder.compress(body) + self._encoder.finish()
+            MutableHeaders(raw=self._start["headers"])["content-length"] = str(len(body))
+        else:
+            body = (self._encoder.compress(body) if body else b"") + self._encoder.finish()
+
+        if self._start is not None:
+            if more_body:
+                del MutableHeaders(raw=self._start["headers"])["content-length"]
+            await self._send(self._start)
+            self._start = None
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _rewrite_headers(self) -> None:
+        headers = MutableHeaders(raw=self._start["headers"])
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # The encoded bytes differ from the identity ones, so a strong validator becomes weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
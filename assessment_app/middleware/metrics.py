@@ -0,0 +1,42 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from assessment_app.utils.metrics import Histogram
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency until the response is fully sent",
+    ["method", "route", "status"]
+)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every HTTP request by method, route template and status.
+    Routes are labelled by template (e.g. /portfolio/{portfolio_id}) and unmatched
+    paths share one label, so label values stay bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route, str(status_code))
@@ -0,0 +1,54 @@
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from assessment_app.config import Config
+from assessment_app.utils.tracing import JsonLinesExporter, build_exporter, finish_trace, start_trace
+
+
+class TracingMiddleware:
+    """
+    Traces every request, but with tail-based sampling: spans are only buffered in
+    memory while the request runs, and the trace is exported once it has finished
+    and turned out slower than slow_threshold_ms or failed with a 5xx. Fast requests
+    cost a few span objects and are then dropped.
+    """
+
+    def __init__(self, app: ASGIApp, exporter: Optional[JsonLinesExporter] = None,
+                 slow_threshold_ms: float = Config.TRACE_SLOW_THRESHOLD_MS):
+        self.app = app
+        self.exporter = exporter or build_exporter()
+        self.slow_threshold_ms = slow_threshold_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        root, token = start_trace(f"{method} {scope['path']}", Headers(scope=scope).get("traceparent"))
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                root.name = f"{method} {route}"
+                root.set_attribute("http.route", route)
+            root.set_attribute("http.request.method", method)
+            root.set_attribute("url.path", scope["path"])
+            root.set_attribute("http.response.status_code", status_code)
+            root.error = status_code >= 500
+            finish_trace(root, token)
+            if root.error or root.duration_ms >= self.slow_threshold_ms:
+                if root.trace.dropped_spans:
+                    root.set_attribute("trace.dropped_spans", root.trace.dropped_spans)
+                self.exporter.export(root.trace)
@@ -1,9 +1,10 @@
 from datetime import datetime
 import uuid
 
-from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, ForeignKey, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 
+from assessment_app.config import Config
 from assessment_app.models.base import Base
 
 
@@ -24,6 +25,20 @@ class User(Base):
     trades = relationship("Trade", back_populates="user")
 
 
+class RevokedToken(Base):
+    """
+    A revoked access token (jti set) or, with jti empty, every token of the user
+    issued up to revoked_at. Rows are useless once expires_at has passed.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    jti = Column(String, unique=True, nullable=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
 class Portfolio(Base):
     __tablename__ = "portfolios"
 
@@ -60,11 +75,46 @@ class Trade(Base):
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
     trade_type = Column(String, nullable=False)
-    execution_ts = Column(DateTime, nullable=False)
+    # A partitioned table's primary key must include the partition key
+    execution_ts = Column(DateTime, nullable=False, primary_key=Config.TRADES_PARTITIONED)
     created_at = Column(DateTime, default=datetime.now)
 
     user = relationship("User", back_populates="trades")
 
+    # Keyset pagination orders history by (execution_ts, id)
+    __table_args__ = (
+        Index("ix_trades_user_execution_ts_id", "user_id", "execution_ts", "id"),
+        Index("ix_trades_execution_ts_id", "execution_ts", "id"),
+        {"postgresql_partition_by": "RANGE (execution_ts)"} if Config.TRADES_PARTITIONED else {},
+    )
+
+
+class PositionSnapshot(Base):
+    __tablename__ = "position_snapshots"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    portfolio_id = Column(String, ForeignKey("portfolios.id"), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    cash_balance = Column(Float, nullable=False)
+    # {stock_symbol: {"quantity": int, "average_price": float}} at end of day
+    holdings = Column(JSON, nullable=False)
+    # Valued at close by the nightly compaction job, None until then
+    net_worth = Column(Float, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("portfolio_id", "snapshot_date", name="uq_position_snapshots_portfolio_date"),
+    )
+
+
+class RateLimitWindow(Base):
+    """Request count of one rate-limit key in one fixed window, shared by all workers"""
+    __tablename__ = "rate_limit_windows"
+
+    key = Column(String, primary_key=True)
+    window_start = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False)
+
 
 class Strategy(Base):
     __tablename__ = "strategies"
@@ -87,7 +137,7 @@ class Task(Base):
     __tablename__ = "task"
 
     id = Column(String, primary_key=True, default=generate_uuid)
-    group_id = Column(String, nullable=False)
+    group_id = Column(String, nullable=False, index=True)
     name = Column(String, nullable=False)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Dict, List, Optional, Any
 from enum import Enum
 
@@ -58,6 +58,11 @@ class Trade(BaseModel):
     created_at: datetime
 
 
+class TradePage(BaseModel):
+    trades: List[Trade]
+    next_cursor: Optional[str] = None
+
+
 class TickData(BaseModel):
     stock_symbol: str
     timestamp: datetime
@@ -76,6 +81,15 @@ class PortfolioHolding(BaseModel):
     current_value: float
 
 
+class PositionValuation(BaseModel):
+    portfolio_id: str
+    as_of: date
+    cash_balance: float
+    holdings_value: float
+    net_worth: float
+    holdings: List[PortfolioHolding]
+
+
 class PortfolioAnalysis(BaseModel):
     total_investment: float
     current_value: float
@@ -121,3 +135,72 @@ class Task(BaseModel):
     end_date: datetime
     estimated_effort: float
     weekdays: List[int]
+
+
+class TaskDayWorkload(BaseModel):
+    day: date
+    total_effort: float
+    tasks: List[Task]
+
+
+class GroupWorkloadDay(BaseModel):
+    day: date
+    total_effort: float
+    active_tasks: int
+
+
+class GroupWorkload(BaseModel):
+    group_id: str
+    start_day: date
+    end_day: date
+    total_effort: float
+    days: List[GroupWorkloadDay]
+    peak_days: List[GroupWorkloadDay]
+    # Only with matrix=true: effort_matrix[day][task] is task_ids[task]'s effort on that day
+    task_ids: Optional[List[str]] = None
+    effort_matrix: Optional[List[List[float]]] = None
+
+
+class ScheduleDay(BaseModel):
+    day: date
+    original_effort: float
+    scheduled_effort: float
+
+
+class TaskMove(BaseModel):
+    task_id: str
+    from_day: date
+    to_day: date
+    effort: float
+
+
+class GroupSchedule(BaseModel):
+    group_id: str
+    start_day: date
+    end_day: date
+    capacity: float
+    # False when some days still exceed capacity after leveling ran to completion; their excess is
+    # unresolved_effort. None when the time limit stopped leveling with excess left
+    feasible: Optional[bool]
+    # False when the time limit stopped leveling before it had tried every way to move work
+    complete: bool
+    # "none", "greedy" or "min_cost_flow": the last pass that was needed
+    method: str
+    moved_effort: float
+    unresolved_effort: float
+    days: List[ScheduleDay]
+    moves: List[TaskMove]
+
+
+class BulkImportError(BaseModel):
+    # 0-based position of the record in the JSON array, or of the data line in the CSV
+    row: int
+    field: str
+    message: str
+
+
+class BulkImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkImportError]
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Set
+
+from sqlalchemy import Column, Table, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.types import JSON
+
+# Stays well under every backend's limit on bound parameters per statement
+ID_LOOKUP_BATCH_SIZE = 500
+
+
+def existing_ids(db: Session, column: Column, ids: Iterable[str]) -> Set[str]:
+    """The subset of ids already present in a primary key column"""
+    ids = list(dict.fromkeys(ids))
+    found = set()
+    for start in range(0, len(ids), ID_LOOKUP_BATCH_SIZE):
+        batch = ids[start:start + ID_LOOKUP_BATCH_SIZE]
+        found.update(db.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+
+def _copy_value(value: Any, is_json: bool) -> Any:
+    if is_json:
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _copy(db: Session, table: Table, records: Sequence[Dict[str, Any]]) -> None:
+    """COPY the rows over the session's own connection, so they share its transaction"""
+    columns = list(records[0])
+    json_columns = {column for column in columns if isinstance(table.c[column].type, JSON)}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in records:
+        writer.writerow([_copy_value(record[column], column in json_columns) for column in columns])
+    buffer.seek(0)
+
+    preparer = db.bind.dialect.identifier_preparer
+    statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        preparer.format_table(table),
+        ", ".join(preparer.quote(column) for column in columns)
+    )
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(statement, buffer)
+
+
+def bulk_insert(db: Session, table: Table, records: List[Dict[str, Any]]) -> int:
+    """
+    Insert rows in the session's transaction without building ORM objects: COPY on
+    PostgreSQL, one executemany INSERT elsewhere. Does not commit.
+    """
+    if not records:
+        return 0
+    if db.bind.dialect.name == "postgresql" and db.bind.dialect.driver == "psycopg2":
+        _copy(db, table, records)
+    else:
+        db.execute(insert(table), records)
+    return len(records)
@@ -1,9 +1,14 @@
 import os
 import logging
+from threading import Lock
+from typing import Optional
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.engine import Engine
 
+from assessment_app.config import Config
+from assessment_app.models.base import Base
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,32 +23,51 @@ DB_NAME = os.getenv("POSTGRES_DB", "db")  # This should match the POSTGRES_DB in
 # Use SQLite for testing
 if os.getenv("TESTING", "false").lower() == "true":
     SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        connect_args={"check_same_thread": False}  # Needed for SQLite
-    )
 else:
-    SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    logger.info(f"Connecting to database at host: {DB_HOST}, port: {DB_PORT}, database: {DB_NAME}")
-    try:
-        engine = create_engine(
+    SQLALCHEMY_DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# The engine is created on first use rather than at import, so importing the app
+# (tests, tooling, worker spawn) never blocks on the database.
+_engine: Optional[Engine] = None
+_engine_lock = Lock()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def _create_engine() -> Engine:
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+        return create_engine(
             SQLALCHEMY_DATABASE_URL,
-            pool_pre_ping=True,  # Enable connection health checks
-            echo=True  # Enable SQL query logging
+            connect_args={"check_same_thread": False}  # Needed for SQLite
         )
-        
-        # Test the connection
-        with engine.connect() as conn:
-            logger.info("Successfully connected to the database")
-            
-    except Exception as e:
-        logger.error(f"Failed to connect to the database: {str(e)}")
-        logger.error(f"Connection URL: {SQLALCHEMY_DATABASE_URL}")
-        raise
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    logger.info(f"Connecting to database at host: {DB_HOST}, port: {DB_PORT}, database: {DB_NAME}")
+    return create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_pre_ping=True,  # Enable connection health checks
+        echo=Config.DB_ECHO  # SQL query logging, off by default
+    )
+
+
+def __getattr__(name: str):
+    # Keeps `from assessment_app.repository.database import engine` working without eager creation
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_db():
+    get_engine()
     db = SessionLocal()
     try:
         yield db
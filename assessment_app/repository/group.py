@@ -1,15 +1,25 @@
-from typing import List
+from typing import Any, Dict, Iterable, List, Set
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
+from starlette import status
 from assessment_app.models.models import Group as PydanticGroup
 from assessment_app.models.db_models import Group as DBGroup
+from assessment_app.repository.bulk_insert import bulk_insert, existing_ids
+from assessment_app.repository.instrumentation import instrumented
 
 
+@instrumented
 class GroupRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def get_group(self, group_id: str) -> PydanticGroup:
         db_group = self.db.query(DBGroup).filter(DBGroup.id == group_id).first()
+        if db_group is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Group not found"
+            )
         return PydanticGroup(
             id=db_group.id,
             name=db_group.name
@@ -37,3 +47,12 @@ class GroupRepository:
             id=db_group.id,
             name=db_group.name,
         )
+
+    def get_existing_group_ids(self, group_ids: Iterable[str]) -> Set[str]:
+        return existing_ids(self.db, DBGroup.id, group_ids)
+
+    def bulk_insert_groups(self, records: List[Dict[str, Any]]) -> int:
+        """Insert group rows (dicts keyed by column) in one transaction"""
+        inserted = bulk_insert(self.db, DBGroup.__table__, records)
+        self.db.commit()
+        return inserted
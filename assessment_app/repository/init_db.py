@@ -1,13 +1,19 @@
 import logging
+from datetime import date
 from assessment_app.models.base import Base
-from assessment_app.repository.database import engine
+from assessment_app.repository.database import get_engine
+from assessment_app.repository.trade_partitions import get_partition_manager
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 def init_db():
     try:
+        engine = get_engine()
         Base.metadata.create_all(bind=engine)
+        partition_manager = get_partition_manager(engine)
+        partition_manager.ensure_default_partition()
+        partition_manager.ensure_partitions_ahead(date.today())
         logger.info("Successfully created database tables")
     except Exception as e:
         logger.error(f"Failed to create database tables: {str(e)}")
@@ -0,0 +1,100 @@
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from assessment_app.utils.metrics import Histogram
+from assessment_app.utils.tracing import SPAN_KIND_CLIENT, current_span, end_span, start_span
+
+REPOSITORY_CALL_SECONDS = Histogram(
+    "repository_call_duration_seconds", "Repository method latency", ["repository", "method"]
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds", "SQL statement latency by the repository method that issued it",
+    ["repository", "method"]
+)
+
+# Repository method currently running in this context, which DB statements are attributed to
+_current_method: ContextVar[Tuple[str, str]] = ContextVar("current_repository_method", default=("none", "none"))
+
+
+def instrumented(cls):
+    """
+    Class decorator timing every public method of a repository and attributing
+    the SQL statements issued while it runs to it.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.isfunction(method):
+            continue
+        setattr(cls, name, _wrap(method, cls.__name__, name))
+    return cls
+
+
+def _wrap(method, repository: str, name: str):
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            generator = method(*args, **kwargs)
+            try:
+                while True:
+                    # Statements run lazily as the caller iterates, so each step is attributed
+                    token = _current_method.set((repository, name))
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        _current_method.reset(token)
+                    yield item
+            finally:
+                generator.close()
+                REPOSITORY_CALL_SECONDS.observe(time.perf_counter() - start, repository, name)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        token = _current_method.set((repository, name))
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            REPOSITORY_CALL_SECONDS.observe(time.perf_counter() - start, repository, name)
+            _current_method.reset(token)
+
+    return wrapper
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = None
+    if current_span() is not None:
+        repository, method = _current_method.get()
+        span = start_span("db.query", {
+            "db.system": conn.dialect.name,
+            "db.statement": statement,
+            "code.function": f"{repository}.{method}",
+        }, SPAN_KIND_CLIENT)
+    conn.info.setdefault("query_starts", []).append((time.perf_counter(), span))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start, span = conn.info["query_starts"].pop()
+    DB_QUERY_SECONDS.observe(time.perf_counter() - start, *_current_method.get())
+    if span is not None:
+        end_span(span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_starts"):
+        _, span = connection.info["query_starts"].pop()
+        if span is not None:
+            end_span(span, error=True)
@@ -1,10 +1,77 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import Row, select
+from sqlalchemy.orm import Session, joinedload
 from assessment_app.models.models import Portfolio as PydanticPortfolio
 from assessment_app.models.db_models import Portfolio as DBPortfolio
 from assessment_app.models.models import PortfolioHolding
 from assessment_app.models.db_models import PortfolioHolding as DBPortfolioHolding
+from assessment_app.models.db_models import Trade as DBTrade
+from assessment_app.repository.position_snapshot_repository import PositionSnapshotRepository
+from assessment_app.repository.trade_partitions import ensure_trade_partition
+from assessment_app.repository.instrumentation import instrumented
 
+
+def snapshot_holdings(holdings: Iterable[DBPortfolioHolding]) -> Dict[str, Dict[str, float]]:
+    """Convert holdings to the JSON layout stored in position snapshots"""
+    return {
+        holding.stock_symbol: {"quantity": holding.quantity, "average_price": holding.average_price}
+        for holding in holdings
+        if holding.quantity > 0
+    }
+
+
+class PortfolioUnitOfWork:
+    """
+    A portfolio loaded together with its holdings for a single trade.
+    Callers mutate the ORM objects in place and call `commit` once, so every
+    change (portfolio, holding, trade, end-of-day snapshot) goes out in one transaction.
+    """
+
+    def __init__(self, db: Session, portfolio: DBPortfolio):
+        self.db = db
+        self.portfolio = portfolio
+        self._holdings: Dict[str, DBPortfolioHolding] = {
+            holding.stock_symbol: holding for holding in portfolio.holdings
+        }
+        self._snapshot_date: Optional[date] = None
+
+    def get_holding(self, stock_symbol: str) -> Optional[DBPortfolioHolding]:
+        return self._holdings.get(stock_symbol)
+
+    def add_holding(self, holding: DBPortfolioHolding) -> DBPortfolioHolding:
+        self.db.add(holding)
+        self._holdings[holding.stock_symbol] = holding
+        return holding
+
+    def remove_holding(self, holding: DBPortfolioHolding) -> None:
+        self.db.delete(holding)
+        self._holdings.pop(holding.stock_symbol, None)
+
+    def add_trade(self, trade: DBTrade) -> DBTrade:
+        ensure_trade_partition(self.db, trade.execution_ts)
+        self.db.add(trade)
+        self._snapshot_date = trade.execution_ts.date()
+        return trade
+
+    def commit(self) -> None:
+        try:
+            if self._snapshot_date is not None:
+                # Trades are never executed in the past, so the post-trade state is the
+                # end-of-day position for the trade's date until a later trade replaces it
+                PositionSnapshotRepository(self.db).upsert_snapshot(
+                    self.portfolio.id,
+                    self._snapshot_date,
+                    self.portfolio.cash_balance,
+                    snapshot_holdings(self._holdings.values())
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+
+@instrumented
 class PortfolioRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -45,6 +112,11 @@ class PortfolioRepository:
             created_at=portfolio.created_at
         )
         self.db.add(db_portfolio)
+        self.db.flush()
+        # Opening snapshot so historical valuation never needs to start before it
+        PositionSnapshotRepository(self.db).upsert_snapshot(
+            db_portfolio.id, db_portfolio.current_ts.date(), db_portfolio.cash_balance, {}
+        )
         self.db.commit()
         self.db.refresh(db_portfolio)
         return PydanticPortfolio(
@@ -77,14 +149,20 @@ class PortfolioRepository:
     def delete_portfolio(self, user_id: str) -> None:
         db_portfolio = self.db.query(DBPortfolio).filter(DBPortfolio.user_id == user_id).first()
         if db_portfolio:
+            PositionSnapshotRepository(self.db).delete_portfolio_snapshots(db_portfolio.id)
             self.db.delete(db_portfolio)
             self.db.commit()
 
-    def get_holdings(self, user_id: str, stock_symbol: str) -> Optional[PortfolioHolding]:
-        portfolio = self.get_portfolio(user_id)
-        if not portfolio:
+    def get_portfolio_for_trade(self, user_id: str) -> Optional[PortfolioUnitOfWork]:
+        """Load a user's portfolio and all of its holdings in a single query"""
+        db_portfolio = self.db.query(DBPortfolio).options(
+            joinedload(DBPortfolio.holdings)
+        ).filter(DBPortfolio.user_id == user_id).first()
+        if not db_portfolio:
             return None
-        
+        return PortfolioUnitOfWork(self.db, db_portfolio)
+
+    def get_holdings(self, user_id: str, stock_symbol: str) -> Optional[PortfolioHolding]:
         db_holding = self.db.query(DBPortfolioHolding).join(DBPortfolio).filter(
             DBPortfolio.user_id == user_id,
             DBPortfolioHolding.stock_symbol == stock_symbol
@@ -101,10 +179,6 @@ class PortfolioRepository:
         )
 
     def get_all_holdings(self, user_id: str) -> List[PortfolioHolding]:
-        portfolio = self.get_portfolio(user_id)
-        if not portfolio:
-            return []
-        
         db_holdings = self.db.query(DBPortfolioHolding).join(DBPortfolio).filter(
             DBPortfolio.user_id == user_id
         ).all()
@@ -132,4 +206,16 @@ class PortfolioRepository:
                 created_at=portfolio.created_at
             )
             for portfolio in db_portfolios
-        ] 
\ No newline at end of file
+        ]
+
+    def get_all_portfolio_rows(self) -> List[Row]:
+        """Get all portfolios as Core rows with the Portfolio response fields"""
+        statement = select(
+            DBPortfolio.id,
+            DBPortfolio.user_id,
+            DBPortfolio.cash_balance,
+            DBPortfolio.current_ts,
+            DBPortfolio.net_worth,
+            DBPortfolio.created_at
+        )
+        return self.db.execute(statement).all()
\ No newline at end of file
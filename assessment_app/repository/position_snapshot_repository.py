@@ -0,0 +1,111 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func, union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from assessment_app.models.db_models import PositionSnapshot as DBPositionSnapshot
+from assessment_app.repository.instrumentation import instrumented
+
+DELETE_BATCH_SIZE = 500
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+@instrumented
+class PositionSnapshotRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert_snapshot(self, portfolio_id: str, snapshot_date: date, cash_balance: float,
+                        holdings: Dict[str, Dict[str, float]]) -> None:
+        """
+        Write the end-of-day position for a portfolio, replacing any earlier snapshot of the same day.
+        Runs inside the caller's transaction and does not commit.
+        """
+        values = {
+            "portfolio_id": portfolio_id,
+            "snapshot_date": snapshot_date,
+            "cash_balance": cash_balance,
+            "holdings": holdings,
+            "net_worth": None,
+        }
+        insert = _UPSERT_DIALECTS.get(self.db.bind.dialect.name)
+        if insert is not None:
+            statement = insert(DBPositionSnapshot).values(created_at=datetime.now(), **values)
+            statement = statement.on_conflict_do_update(
+                index_elements=["portfolio_id", "snapshot_date"],
+                set_=values
+            )
+            self.db.execute(statement)
+            return
+
+        db_snapshot = self.get_snapshot(portfolio_id, snapshot_date)
+        if db_snapshot is None:
+            self.db.add(DBPositionSnapshot(**values))
+        else:
+            for key, value in values.items():
+                setattr(db_snapshot, key, value)
+
+    def get_snapshot(self, portfolio_id: str, snapshot_date: date) -> Optional[DBPositionSnapshot]:
+        return self.db.query(DBPositionSnapshot).filter(
+            DBPositionSnapshot.portfolio_id == portfolio_id,
+            DBPositionSnapshot.snapshot_date == snapshot_date
+        ).first()
+
+    def get_latest_snapshot(self, portfolio_id: str, as_of: date) -> Optional[DBPositionSnapshot]:
+        """Get the most recent snapshot taken on or before as_of"""
+        return self.db.query(DBPositionSnapshot).filter(
+            DBPositionSnapshot.portfolio_id == portfolio_id,
+            DBPositionSnapshot.snapshot_date <= as_of
+        ).order_by(DBPositionSnapshot.snapshot_date.desc()).first()
+
+    def delete_portfolio_snapshots(self, portfolio_id: str) -> None:
+        """Delete every snapshot of a portfolio; does not commit"""
+        self.db.query(DBPositionSnapshot).filter(
+            DBPositionSnapshot.portfolio_id == portfolio_id
+        ).delete(synchronize_session=False)
+
+    def get_unvalued_snapshots(self, limit: int = 1000) -> List[DBPositionSnapshot]:
+        """Get snapshots the compaction job has not valued yet"""
+        return self.db.query(DBPositionSnapshot).filter(
+            DBPositionSnapshot.net_worth.is_(None)
+        ).order_by(DBPositionSnapshot.snapshot_date).limit(limit).all()
+
+    def delete_superseded_snapshots(self, before: date) -> int:
+        """
+        Keep only each portfolio's first snapshot and the last snapshot of each month for days
+        before `before`. Any later date can still be reconstructed from the nearest earlier
+        snapshot plus trades; the first one anchors the days before the first month end.
+        """
+        month = func.strftime("%Y-%m", DBPositionSnapshot.snapshot_date) \
+            if self.db.bind.dialect.name == "sqlite" \
+            else func.to_char(DBPositionSnapshot.snapshot_date, "YYYY-MM")
+        month_ends = self.db.query(
+            DBPositionSnapshot.portfolio_id,
+            func.max(DBPositionSnapshot.snapshot_date).label("snapshot_date")
+        ).filter(
+            DBPositionSnapshot.snapshot_date < before
+        ).group_by(DBPositionSnapshot.portfolio_id, month)
+        firsts = self.db.query(
+            DBPositionSnapshot.portfolio_id,
+            func.min(DBPositionSnapshot.snapshot_date).label("snapshot_date")
+        ).group_by(DBPositionSnapshot.portfolio_id)
+        kept = union(month_ends.statement, firsts.statement).subquery()
+
+        superseded = self.db.query(DBPositionSnapshot.id).outerjoin(
+            kept,
+            (kept.c.portfolio_id == DBPositionSnapshot.portfolio_id) &
+            (kept.c.snapshot_date == DBPositionSnapshot.snapshot_date)
+        ).filter(
+            DBPositionSnapshot.snapshot_date < before,
+            kept.c.snapshot_date.is_(None)
+        )
+        ids = [row.id for row in superseded]
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            self.db.query(DBPositionSnapshot).filter(
+                DBPositionSnapshot.id.in_(ids[start:start + DELETE_BATCH_SIZE])
+            ).delete(synchronize_session=False)
+        return len(ids)
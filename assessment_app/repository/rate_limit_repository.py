@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from assessment_app.models.db_models import RateLimitWindow as DBRateLimitWindow
+from assessment_app.repository.instrumentation import instrumented
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+@instrumented
+class RateLimitRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def increment(self, key: str, window_start: int) -> int:
+        """Count one request in a window and return the window's new count; does not commit"""
+        insert = _UPSERT_DIALECTS.get(self.db.bind.dialect.name)
+        if insert is not None:
+            statement = insert(DBRateLimitWindow).values(key=key, window_start=window_start, count=1)
+            statement = statement.on_conflict_do_update(
+                index_elements=["key", "window_start"],
+                set_={"count": DBRateLimitWindow.count + 1}
+            ).returning(DBRateLimitWindow.count)
+            return self.db.execute(statement).scalar_one()
+
+        window = self.db.get(DBRateLimitWindow, (key, window_start), with_for_update=True)
+        if window is None:
+            window = DBRateLimitWindow(key=key, window_start=window_start, count=0)
+            self.db.add(window)
+        window.count += 1
+        self.db.flush()
+        return window.count
+
+    def decrement(self, key: str, window_start: int) -> None:
+        """Take back a request counted by increment; does not commit"""
+        self.db.query(DBRateLimitWindow).filter(
+            DBRateLimitWindow.key == key,
+            DBRateLimitWindow.window_start == window_start
+        ).update({DBRateLimitWindow.count: DBRateLimitWindow.count - 1}, synchronize_session=False)
+
+    def get_count(self, key: str, window_start: int) -> int:
+        count = self.db.execute(
+            select(DBRateLimitWindow.count).where(
+                DBRateLimitWindow.key == key,
+                DBRateLimitWindow.window_start == window_start
+            )
+        ).scalar()
+        return count or 0
+
+    def delete_windows_before(self, window_start: int) -> int:
+        """Delete windows that can no longer affect any limit; does not commit"""
+        return self.db.query(DBRateLimitWindow).filter(
+            DBRateLimitWindow.window_start < window_start
+        ).delete(synchronize_session=False)
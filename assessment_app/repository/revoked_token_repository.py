@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from assessment_app.models.db_models import RevokedToken as DBRevokedToken
+from assessment_app.repository.instrumentation import instrumented
+
+
+@instrumented
+class RevokedTokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def revoke_token(self, jti: str, user_id: str, expires_at: datetime) -> None:
+        """Revoke a single token until it would have expired anyway"""
+        if self.is_token_revoked(jti):
+            return
+        self.db.add(DBRevokedToken(jti=jti, user_id=user_id, revoked_at=datetime.utcnow(), expires_at=expires_at))
+        self.db.commit()
+
+    def revoke_user_tokens(self, user_id: str, expires_at: datetime) -> datetime:
+        """Revoke every token of a user issued up to now; expires_at is when the newest of them expires"""
+        revoked_at = datetime.utcnow()
+        self.db.add(DBRevokedToken(user_id=user_id, revoked_at=revoked_at, expires_at=expires_at))
+        self.db.commit()
+        return revoked_at
+
+    def is_token_revoked(self, jti: str) -> bool:
+        return self.db.query(DBRevokedToken.id).filter(DBRevokedToken.jti == jti).first() is not None
+
+    def get_user_revoked_at(self, user_id: str) -> Optional[datetime]:
+        """Get the latest time all of a user's tokens were revoked"""
+        return self.db.query(func.max(DBRevokedToken.revoked_at)).filter(
+            DBRevokedToken.user_id == user_id,
+            DBRevokedToken.jti.is_(None)
+        ).scalar()
+
+    def get_active_revocations(self, now: datetime) -> List[Tuple[Optional[str], str, datetime]]:
+        """Get (jti, user_id, revoked_at) of every revocation that has not expired yet"""
+        return self.db.query(DBRevokedToken.jti, DBRevokedToken.user_id, DBRevokedToken.revoked_at).filter(
+            DBRevokedToken.expires_at > now
+        ).all()
+
+    def delete_expired(self, now: datetime) -> int:
+        deleted = self.db.query(DBRevokedToken).filter(
+            DBRevokedToken.expires_at <= now
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
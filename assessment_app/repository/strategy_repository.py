@@ -2,7 +2,9 @@ from typing import List
 from sqlalchemy.orm import Session
 from assessment_app.models.models import Strategy as PydanticStrategy
 from assessment_app.models.db_models import Strategy as DBStrategy
+from assessment_app.repository.instrumentation import instrumented
 
+@instrumented
 class StrategyRepository:
     def __init__(self, db: Session):
         self.db = db
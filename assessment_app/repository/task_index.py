@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+import weakref
+from datetime import date, datetime
+from typing import Callable, List, Optional, Union
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from assessment_app.config import Config
+from assessment_app.models.db_models import Task as DBTask
+from assessment_app.models.models import Task as PydanticTask
+from assessment_app.utils.interval_tree import IntervalTree
+
+logger = logging.getLogger(__name__)
+
+
+def as_date(day: Union[date, datetime]) -> date:
+    return day.date() if isinstance(day, datetime) else day
+
+
+def to_task(db_task: DBTask) -> PydanticTask:
+    return PydanticTask(
+        id=db_task.id,
+        name=db_task.name,
+        group_id=db_task.group_id,
+        start_date=db_task.start_date,
+        end_date=db_task.end_date,
+        estimated_effort=db_task.estimated_effort,
+        weekdays=db_task.weekdays
+    )
+
+
+def sort_key(task: PydanticTask):
+    return task.start_date, task.id
+
+
+class TaskIndex:
+    """
+    In-memory interval tree of all tasks over their [start_date, end_date] days, so
+    "tasks active on a day" takes O(log n + k) instead of a scan of the task table.
+    create_task adds new tasks directly; the tree is rebuilt from the table every
+    refresh_seconds, which picks up tasks created by other workers and rebalances it.
+    """
+
+    def __init__(self, refresh_seconds: float = Config.TASK_INDEX_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._tree: IntervalTree[PydanticTask] = IntervalTree()
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._rebuilding = False
+        # Bumped by invalidate, so a rebuild that read the table before it doesn't count as fresh
+        self._generation = 0
+        # Tasks added locally while a rebuild is reading the table
+        self._pending: List[PydanticTask] = []
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def scheduled_on(self, db: Session, day: date) -> List[PydanticTask]:
+        """Tasks active on day whose weekdays include day's weekday"""
+        self.refresh_if_stale(db)
+        weekday = day.weekday()
+        return sorted((task for task in self._tree.at(day) if weekday in task.weekdays), key=sort_key)
+
+    def overlapping(self, db: Session, start_day: date, end_day: date) -> List[PydanticTask]:
+        """Tasks active on at least one day of [start_day, end_day]"""
+        self.refresh_if_stale(db)
+        return sorted(self._tree.overlapping(start_day, end_day), key=sort_key)
+
+    def add(self, task: PydanticTask) -> None:
+        with self._lock:
+            self._tree.add(task.start_date.date(), task.end_date.date(), task)
+            if self._rebuilding:
+                self._pending.append(task)
+
+    def refresh_if_stale(self, db: Session) -> None:
+        refreshed_at = self._refreshed_at
+        if refreshed_at is not None and self._clock() - refreshed_at < self.refresh_seconds:
+            return
+        # The first load is waited for; later rebuilds run in one request while others use the current tree
+        if not self._refresh_lock.acquire(blocking=refreshed_at is None):
+            return
+        try:
+            if self._refreshed_at is refreshed_at:
+                self.refresh(db)
+        finally:
+            self._refresh_lock.release()
+
+    def invalidate(self) -> None:
+        """Rebuild the tree on the next query, e.g. after a bulk insert"""
+        with self._lock:
+            self._generation += 1
+            self._refreshed_at = None
+
+    def refresh(self, db: Session) -> None:
+        """Rebuild the tree from every task in the table"""
+        with self._lock:
+            self._rebuilding = True
+            self._pending = []
+            generation = self._generation
+        try:
+            tasks = [to_task(db_task) for db_task in db.query(DBTask).all()]
+            tree = IntervalTree((task.start_date.date(), task.end_date.date(), task) for task in tasks)
+            with self._lock:
+                loaded = {task.id for task in tasks}
+                for task in self._pending:
+                    if task.id not in loaded:
+                        tree.add(task.start_date.date(), task.end_date.date(), task)
+                self._tree = tree
+                self._refreshed_at = self._clock() if self._generation == generation else None
+        finally:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = []
+        logger.debug(f"Rebuilt task index with {len(tasks)} tasks")
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, TaskIndex]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def get_task_index(db: Session) -> TaskIndex:
+    """Get the process-wide index of the database the session is bound to"""
+    engine = db.get_bind()
+    index = _indexes.get(engine)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(engine, TaskIndex())
+    return index
@@ -1,14 +1,36 @@
 import uuid
-from typing import List
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Set, Union
 
+import pandas as pd
 from fastapi import HTTPException
+from sqlalchemy import String, cast, select
 from sqlalchemy.orm import Session
 from starlette import status
 
-from assessment_app.models.models import Task as PydanticTask
+from assessment_app.models.models import Task as PydanticTask, TaskDayWorkload
 from assessment_app.models.db_models import Task as DBTask
+from assessment_app.repository.bulk_insert import bulk_insert, existing_ids
+from assessment_app.repository.instrumentation import instrumented
+from assessment_app.repository.task_index import as_date, get_task_index
 
 
+# Dates and weekdays are read as text and parsed a column at a time, not row by row
+WORKLOAD_COLUMNS = (
+    DBTask.id,
+    cast(DBTask.start_date, String).label("start_date"),
+    cast(DBTask.end_date, String).label("end_date"),
+    DBTask.estimated_effort,
+    cast(DBTask.weekdays, String).label("weekdays"),
+)
+
+
+def daily_share(task: PydanticTask) -> PydanticTask:
+    """The task with estimated_effort spread evenly over its weekdays, i.e. its effort for one day"""
+    return task.model_copy(update={"estimated_effort": task.estimated_effort / len(task.weekdays)})
+
+
+@instrumented
 class TaskRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -55,7 +77,7 @@ class TaskRepository:
         self.db.add(db_task)
         self.db.commit()
         self.db.refresh(db_task)
-        return PydanticTask(
+        created = PydanticTask(
             id=db_task.id,
             name=db_task.name,
             group_id=db_task.group_id,
@@ -64,19 +86,71 @@ class TaskRepository:
             estimated_effort=db_task.estimated_effort,
             weekdays=db_task.weekdays
         )
+        get_task_index(self.db).add(created)
+        return created
 
-    def tasks_for_day(self, day) -> List[PydanticTask]:
-        db_task = self.db.query(DBTask).filter(DBTask.start_date<= day,
-                                               DBTask.end_date >= day).all()
-        return [
-            PydanticTask(
-                id=task.id,
-                name=task.name,
-                group_id=task.group_id,
-                start_date=task.start_date,
-                end_date=task.end_date,
-                estimated_effort=task.estimated_effort/len(task.weekdays),
-                weekdays=task.weekdays
+    def tasks_for_day(self, day: Union[date, datetime]) -> List[PydanticTask]:
+        """
+        Get the tasks active on day whose weekdays (0 = Monday) include it,
+        each with its effort for that one day.
+        """
+        day = as_date(day)
+        return [daily_share(task) for task in get_task_index(self.db).scheduled_on(self.db, day)]
+
+    def tasks_for_range(self, start_day: Union[date, datetime],
+                        end_day: Union[date, datetime]) -> List[TaskDayWorkload]:
+        """
+        Get tasks_for_day for every day of [start_day, end_day], from a single
+        pass over the tasks overlapping the window.
+        """
+        start_day, end_day = as_date(start_day), as_date(end_day)
+        if start_day > end_day:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Start day can't be after end day"
             )
-            for task in db_task
+        days = [start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1)]
+        tasks_by_day: List[List[PydanticTask]] = [[] for _ in days]
+        for task in get_task_index(self.db).overlapping(self.db, start_day, end_day):
+            if not task.weekdays:
+                continue
+            share = daily_share(task)
+            weekdays = set(task.weekdays)
+            first = (max(task.start_date.date(), start_day) - start_day).days
+            last = (min(task.end_date.date(), end_day) - start_day).days
+            for offset in range(first, last + 1):
+                if days[offset].weekday() in weekdays:
+                    tasks_by_day[offset].append(share)
+        return [
+            TaskDayWorkload(day=day, total_effort=sum(task.estimated_effort for task in tasks), tasks=tasks)
+            for day, tasks in zip(days, tasks_by_day)
         ]
+
+    def get_group_task_frame(self, group_id: str, start_day: date, end_day: date) -> pd.DataFrame:
+        """
+        Get the WORKLOAD_COLUMNS of a group's tasks active on at least one day of
+        [start_day, end_day]. Dates are parsed to datetime64; weekdays stay JSON text.
+        """
+        statement = select(*WORKLOAD_COLUMNS).where(
+            DBTask.group_id == group_id,
+            DBTask.start_date < datetime.combine(end_day + timedelta(days=1), time.min),
+            DBTask.end_date >= datetime.combine(start_day, time.min)
+        ).order_by(DBTask.start_date, DBTask.id)
+        frame = pd.read_sql(statement, self.db.connection())
+        for column in ("start_date", "end_date"):
+            frame[column] = pd.to_datetime(frame[column], format="ISO8601")
+        return frame
+
+    def get_existing_task_ids(self, task_ids: Iterable[str]) -> Set[str]:
+        return existing_ids(self.db, DBTask.id, task_ids)
+
+    def bulk_insert_tasks(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Insert task rows (dicts keyed by column) in one transaction. The task index
+        is rebuilt on its next query rather than grown one task at a time.
+        """
+        inserted = bulk_insert(self.db, DBTask.__table__, records)
+        self.db.commit()
+        if inserted:
+            get_task_index(self.db).invalidate()
+        return inserted
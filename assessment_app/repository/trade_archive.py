@@ -0,0 +1,115 @@
+import os
+import re
+from collections import namedtuple
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from assessment_app.config import Config
+
+ARCHIVE_COLUMNS = [
+    "id", "user_id", "stock_symbol", "quantity", "price", "trade_type", "execution_ts", "created_at",
+]
+
+# Same fields (and attribute access) as the Core rows returned by TradeRepository
+ArchivedTrade = namedtuple("ArchivedTrade", ARCHIVE_COLUMNS)
+
+_FILE_PATTERN = re.compile(r"^trades_(\d{4})_(\d{2})\.parquet$")
+
+
+def month_start(year: int, month: int) -> datetime:
+    return datetime(year, month, 1)
+
+
+def next_month_start(year: int, month: int) -> datetime:
+    return datetime(year + month // 12, month % 12 + 1, 1)
+
+
+class TradeArchive:
+    """
+    Cold trade storage: one zstd-compressed Parquet file per archived month.
+    Reading Parquet requires pyarrow, which is only imported when a query
+    actually reaches into archived months.
+    """
+
+    def __init__(self, archive_dir: str = Config.TRADE_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self._listing_mtime: Optional[float] = None
+        self._months: List[Tuple[int, int]] = []
+
+    def months(self) -> List[Tuple[int, int]]:
+        """Get archived (year, month) pairs in chronological order"""
+        try:
+            mtime = os.stat(self.archive_dir).st_mtime
+        except FileNotFoundError:
+            return []
+        # Re-list the directory only when a file was added or removed
+        if mtime != self._listing_mtime:
+            months = []
+            for file_name in os.listdir(self.archive_dir):
+                match = _FILE_PATTERN.match(file_name)
+                if match:
+                    months.append((int(match.group(1)), int(match.group(2))))
+            self._months = sorted(months)
+            self._listing_mtime = mtime
+        return self._months
+
+    def path_for(self, year: int, month: int) -> str:
+        return os.path.join(self.archive_dir, f"trades_{year:04d}_{month:02d}.parquet")
+
+    def write_month(self, year: int, month: int, df: pd.DataFrame) -> str:
+        """Write one month of trades, merging with rows already archived for that month"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = self.path_for(year, month)
+        if os.path.exists(path):
+            df = pd.concat([pd.read_parquet(path), df[ARCHIVE_COLUMNS]]).drop_duplicates("id", keep="last")
+        tmp_path = f"{path}.tmp"
+        # Written to a temporary file first so readers never see a partial month
+        df[ARCHIVE_COLUMNS].sort_values(["execution_ts", "id"]).to_parquet(
+            tmp_path, compression="zstd", index=False
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    def covers(self, start_ts: Optional[datetime] = None, end_ts: Optional[datetime] = None) -> bool:
+        """Check whether any archived month overlaps [start_ts, end_ts]"""
+        return bool(self._overlapping_months(start_ts, end_ts))
+
+    def read(self, start_ts: Optional[datetime] = None, end_ts: Optional[datetime] = None,
+             user_id: Optional[str] = None) -> Iterator[ArchivedTrade]:
+        """
+        Stream archived trades in (execution_ts, id) order.
+        Only files for months overlapping the range are opened, one at a time.
+        """
+        for year, month in self._overlapping_months(start_ts, end_ts):
+            filters = []
+            if start_ts is not None:
+                filters.append(("execution_ts", ">=", pd.Timestamp(start_ts)))
+            if end_ts is not None:
+                filters.append(("execution_ts", "<=", pd.Timestamp(end_ts)))
+            if user_id is not None:
+                filters.append(("user_id", "==", user_id))
+            df = pd.read_parquet(self.path_for(year, month), filters=filters or None)
+            for record in df.sort_values(["execution_ts", "id"]).to_dict("records"):
+                record["execution_ts"] = record["execution_ts"].to_pydatetime()
+                record["created_at"] = record["created_at"].to_pydatetime() if pd.notna(record["created_at"]) else None
+                yield ArchivedTrade(**record)
+
+    def _overlapping_months(self, start_ts: Optional[datetime], end_ts: Optional[datetime]) -> List[Tuple[int, int]]:
+        return [
+            (year, month) for year, month in self.months()
+            if (start_ts is None or next_month_start(year, month) > start_ts)
+            and (end_ts is None or month_start(year, month) <= end_ts)
+        ]
+
+
+_default_archive: Optional[TradeArchive] = None
+
+
+def get_default_archive() -> TradeArchive:
+    """Get the process-wide archive rooted at Config.TRADE_ARCHIVE_DIR"""
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = TradeArchive()
+    return _default_archive
@@ -0,0 +1,117 @@
+import logging
+import re
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, List, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from assessment_app.config import Config
+from assessment_app.repository.trade_archive import month_start, next_month_start
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "trades_default"
+_PARTITION_PATTERN = re.compile(r"^trades_p(\d{4})_(\d{2})$")
+
+
+def partition_name(year: int, month: int) -> str:
+    return f"trades_p{year:04d}_{month:02d}"
+
+
+class TradePartitionManager:
+    """
+    Monthly range partitions of the `trades` table on execution_ts.
+    Only active on Postgres with Config.TRADES_PARTITIONED; otherwise every method is a no-op.
+    DDL runs on its own autocommitted connection so it never joins a request's transaction.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._known: Set[Tuple[int, int]] = set()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return Config.TRADES_PARTITIONED and self.engine.dialect.name == "postgresql"
+
+    def ensure_default_partition(self) -> None:
+        """Create the catch-all partition for rows outside every monthly partition"""
+        if not self.enabled:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF trades DEFAULT"))
+
+    def ensure_partition(self, ts: datetime) -> None:
+        """Create the partition for ts's month if this process has not seen it yet"""
+        if not self.enabled:
+            return
+        key = (ts.year, ts.month)
+        if key in self._known:
+            return
+        with self._lock:
+            if key in self._known:
+                return
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {partition_name(*key)} PARTITION OF trades "
+                        f"FOR VALUES FROM ('{month_start(*key).isoformat()}') "
+                        f"TO ('{next_month_start(*key).isoformat()}')"
+                    ))
+            except DBAPIError as e:
+                # Another worker created it concurrently, or rows for the month already
+                # sit in the default partition; either way inserts still succeed
+                logger.warning(f"Could not create trades partition {partition_name(*key)}: {str(e)}")
+            self._known.add(key)
+
+    def ensure_partitions_ahead(self, start: date, months: int = Config.TRADE_PARTITION_MONTHS_AHEAD) -> None:
+        """Create partitions for start's month and the following `months` months"""
+        year, month = start.year, start.month
+        for _ in range(months + 1):
+            self.ensure_partition(datetime(year, month, 1))
+            year, month = year + month // 12, month % 12 + 1
+
+    def list_partitions(self) -> List[Tuple[str, int, int]]:
+        """List monthly partitions as (name, year, month), oldest first"""
+        if not self.enabled:
+            return []
+        with self.engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'trades'::regclass"
+            )).scalars().all()
+        partitions = []
+        for name in names:
+            match = _PARTITION_PATTERN.match(name)
+            if match:
+                partitions.append((name, int(match.group(1)), int(match.group(2))))
+        return sorted(partitions, key=lambda partition: (partition[1], partition[2]))
+
+    def drop_partition(self, name: str, year: int, month: int) -> None:
+        """Detach and drop a monthly partition once its rows are archived"""
+        with self.engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE trades DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        self._known.discard((year, month))
+
+
+_managers: Dict[int, TradePartitionManager] = {}
+
+
+def get_partition_manager(engine: Engine) -> TradePartitionManager:
+    """Get the per-engine manager, so the known-partition cache is shared by all sessions"""
+    manager = _managers.get(id(engine))
+    if manager is None:
+        manager = _managers.setdefault(id(engine), TradePartitionManager(engine))
+    return manager
+
+
+def ensure_trade_partition(db: Session, execution_ts: datetime) -> None:
+    """Make sure a trade executed at execution_ts has a monthly partition to land in"""
+    if Config.TRADES_PARTITIONED:
+        get_partition_manager(db.get_bind()).ensure_partition(execution_ts)
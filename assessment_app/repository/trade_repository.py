@@ -1,16 +1,51 @@
+import heapq
 from datetime import datetime
-from typing import List, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from sqlalchemy import and_, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from assessment_app.models.db_models import Trade as DBTrade
+from assessment_app.repository.trade_archive import ArchivedTrade, TradeArchive, get_default_archive
+from assessment_app.repository.trade_partitions import ensure_trade_partition
+from assessment_app.repository.instrumentation import instrumented
 
+# Columns returned by the paginated/streaming history queries, in order
+TRADE_HISTORY_COLUMNS = (
+    DBTrade.id,
+    DBTrade.user_id,
+    DBTrade.stock_symbol,
+    DBTrade.quantity,
+    DBTrade.price,
+    DBTrade.trade_type,
+    DBTrade.execution_ts,
+    DBTrade.created_at,
+)
+
+TradeRow = Union[Row, ArchivedTrade]
+
+
+def trade_sort_key(row: TradeRow) -> Tuple[datetime, str]:
+    return row.execution_ts, row.id
+
+
+@instrumented
 class TradeRepository:
-    def __init__(self, db: Session):
+    """
+    Trades live in the database (partitioned by month on Postgres) and, once cold,
+    in the Parquet archive. Time-range and history queries merge both transparently;
+    the archive is only opened when the requested range reaches an archived month.
+    """
+
+    def __init__(self, db: Session, archive: Optional[TradeArchive] = None):
         self.db = db
+        self.archive = archive if archive is not None else get_default_archive()
 
     def get_trade(self, trade_id: str) -> Optional[DBTrade]:
         return self.db.query(DBTrade).filter(DBTrade.id == trade_id).first()
 
     def create_trade(self, trade: DBTrade) -> DBTrade:
+        ensure_trade_partition(self.db, trade.execution_ts)
         self.db.add(trade)
         self.db.commit()
         self.db.refresh(trade)
@@ -26,10 +61,92 @@ class TradeRepository:
         return self.db.query(DBTrade).filter(DBTrade.trade_type == trade_type).all()
 
     def get_trades_by_time_range(self, start_ts: datetime, end_ts: datetime) -> List[DBTrade]:
-        return self.db.query(DBTrade).filter(
+        trades = self.db.query(DBTrade).filter(
             DBTrade.execution_ts >= start_ts,
             DBTrade.execution_ts <= end_ts
         ).all()
+        if self.archive.covers(start_ts, end_ts):
+            # Archived rows come back as transient ORM objects that are not added to the session
+            trades.extend(DBTrade(**row._asdict()) for row in self.archive.read(start_ts, end_ts))
+            trades.sort(key=trade_sort_key)
+        return trades
+
+    def get_user_trades_page(
+            self,
+            user_id: str,
+            after: Optional[Tuple[datetime, str]] = None,
+            limit: int = 100
+    ) -> List[TradeRow]:
+        """Get one page of a user's trades ordered by (execution_ts, id), starting after the cursor"""
+        return self._get_page([DBTrade.user_id == user_id], after, limit, user_id=user_id)
+
+    def get_trades_by_time_range_page(
+            self,
+            start_ts: datetime,
+            end_ts: datetime,
+            after: Optional[Tuple[datetime, str]] = None,
+            limit: int = 100,
+            user_id: Optional[str] = None
+    ) -> List[TradeRow]:
+        """Get one page of the trades executed between start_ts and end_ts, only user_id's if given"""
+        filters = [DBTrade.execution_ts >= start_ts, DBTrade.execution_ts <= end_ts]
+        if user_id is not None:
+            filters.append(DBTrade.user_id == user_id)
+        return self._get_page(filters, after, limit, user_id=user_id, start_ts=start_ts, end_ts=end_ts)
+
+    def get_user_trades_between(self, user_id: str, start_ts: datetime, end_ts: datetime) -> List[TradeRow]:
+        """Get a user's trades with start_ts <= execution_ts < end_ts in execution order"""
+        statement = select(*TRADE_HISTORY_COLUMNS).where(
+            DBTrade.user_id == user_id,
+            DBTrade.execution_ts >= start_ts,
+            DBTrade.execution_ts < end_ts
+        ).order_by(DBTrade.execution_ts, DBTrade.id)
+        rows = self.db.execute(statement).all()
+        if not self.archive.covers(start_ts, end_ts):
+            return rows
+        archived = (row for row in self.archive.read(start_ts, end_ts, user_id) if row.execution_ts < end_ts)
+        return list(heapq.merge(rows, archived, key=trade_sort_key))
+
+    def stream_user_trades(self, user_id: str, batch_size: int = 1000) -> Iterator[TradeRow]:
+        """
+        Stream every trade of a user in (execution_ts, id) order.
+        Rows are fetched `batch_size` at a time through a server-side cursor,
+        and archived months are read one file at a time, so memory stays
+        constant regardless of history length.
+        """
+        statement = select(*TRADE_HISTORY_COLUMNS).where(
+            DBTrade.user_id == user_id
+        ).order_by(DBTrade.execution_ts, DBTrade.id).execution_options(yield_per=batch_size)
+        live: Iterable[TradeRow] = self.db.execute(statement)
+        if self.archive.covers():
+            live = heapq.merge(self.archive.read(user_id=user_id), live, key=trade_sort_key)
+        yield from live
+
+    def _get_page(self, filters: list, after: Optional[Tuple[datetime, str]], limit: int,
+                  user_id: Optional[str] = None, start_ts: Optional[datetime] = None,
+                  end_ts: Optional[datetime] = None) -> List[TradeRow]:
+        statement = select(*TRADE_HISTORY_COLUMNS).where(*filters)
+        if after is not None:
+            after_ts, after_id = after
+            # Keyset predicate: (execution_ts, id) > (after_ts, after_id)
+            statement = statement.where(or_(
+                DBTrade.execution_ts > after_ts,
+                and_(DBTrade.execution_ts == after_ts, DBTrade.id > after_id)
+            ))
+        statement = statement.order_by(DBTrade.execution_ts, DBTrade.id).limit(limit)
+        rows = self.db.execute(statement).all()
+
+        # Archived months entirely before the cursor can be skipped
+        if after is not None:
+            start_ts = after[0] if start_ts is None else max(start_ts, after[0])
+        if not self.archive.covers(start_ts, end_ts):
+            return rows
+        archived = islice(
+            (row for row in self.archive.read(start_ts, end_ts, user_id)
+             if after is None or trade_sort_key(row) > after),
+            limit
+        )
+        return list(islice(heapq.merge(rows, archived, key=trade_sort_key), limit))
 
     def delete_trade(self, trade_id: str) -> bool:
         trade = self.get_trade(trade_id)
@@ -37,4 +154,4 @@ class TradeRepository:
             self.db.delete(trade)
             self.db.commit()
             return True
-        return False 
\ No newline at end of file
+        return False
@@ -1,8 +1,11 @@
 from typing import List, Optional
+from sqlalchemy import Row, select
 from sqlalchemy.orm import Session
 from assessment_app.models.db_models import User as DBUser
 from assessment_app.models.models import UserResponse, RegisterUserRequest
+from assessment_app.repository.instrumentation import instrumented
 
+@instrumented
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -22,6 +25,11 @@ class UserRepository:
     def get_all_users(self) -> List[DBUser]:
         return self.db.query(DBUser).all()
 
+    def get_all_user_rows(self) -> List[Row]:
+        """Get the public fields of all users as Core rows, without loading ORM objects"""
+        statement = select(DBUser.id, DBUser.username, DBUser.email, DBUser.created_at)
+        return self.db.execute(statement).all()
+
     def create_user(self, user: DBUser) -> DBUser:
         self.db.add(user)
         self.db.commit()
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Dict, Any, List
 
-from fastapi import Depends, APIRouter, HTTPException, status
+from fastapi import Depends, APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from assessment_app.models.constants import StockSymbols
@@ -10,26 +11,29 @@ from assessment_app.utils.utils import compute_cagr
 from assessment_app.repository.database import get_db
 from assessment_app.repository.portfolio_repository import PortfolioRepository
 from assessment_app.repository.trade_repository import TradeRepository
-from assessment_app.models.models import PortfolioAnalysis, PortfolioHolding
+from assessment_app.models.models import PortfolioAnalysis, PortfolioHolding, PositionValuation, Portfolio
 from assessment_app.service.analysis_service import AnalysisService
+from assessment_app.service.position_service import PositionService
+from assessment_app.service.price_store import get_price_store
+from assessment_app.service.response_cache import cached_json_response
+from assessment_app.utils.fast_json import json_response
+from assessment_app.utils.tracing import span
 import pandas as pd
 import os
 
 router = APIRouter()
 
 
+@span("price_lookup")
 def get_stock_price_at_timestamp(stock_symbol: str, timestamp: datetime) -> float:
     """Get stock price at a specific timestamp"""
-    file_path = f"assessment_app/data/{stock_symbol}.csv"
-    if not os.path.exists(file_path):
+    df = get_price_store().get_frame(stock_symbol)
+    if df is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock data not found for {stock_symbol}"
         )
 
-    df = pd.read_csv(file_path)
-    df['Date'] = pd.to_datetime(df['Date'])
-
     # Find the closest date to the requested timestamp
     target_date = timestamp.date()
     available_dates = df['Date'].dt.date.unique()
@@ -61,9 +65,10 @@ async def get_stock_analysis(
         stock_symbol: str,
         start_ts: datetime,
         end_ts: datetime,
+        request: Request,
         current_user_id: str = Depends(get_current_user_from_request),
         db: Session = Depends(get_db)
-) -> dict:
+) -> Response:
     """
     Estimate returns for given stock based on stock prices between the given timestamps.
     """
@@ -73,7 +78,7 @@ async def get_stock_analysis(
             detail=f"Invalid stock symbol. Valid symbols are: {[s.value for s in StockSymbols]}"
         )
 
-    try:
+    def build_estimate():
         start_price = get_stock_price_at_timestamp(stock_symbol, start_ts)
         end_price = get_stock_price_at_timestamp(stock_symbol, end_ts)
 
@@ -87,12 +92,20 @@ async def get_stock_analysis(
         if cagr is None:
             cagr = 0.0  # Return 0% if CAGR calculation fails
 
+        # Timestamps at or past the last bar resolve to it, so they move when bars are added
+        last_date = get_price_store().get_frame(stock_symbol)['Date'].max().date()
         return {
             "returns": end_price - start_price,
             "returns_percentage": cagr * 100,  # Convert to percentage
             "start_price": start_price,
             "end_price": end_price
-        }
+        }, max(start_ts, end_ts).date() < last_date
+
+    try:
+        return cached_json_response(
+            request, "/analysis/estimate_returns/stock", stock_symbol,
+            (start_ts.isoformat(), end_ts.isoformat()), build_estimate, public=False
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -109,7 +122,7 @@ async def estimate_portfolio_returns(
         end_ts: datetime,
         current_user_id: str = Depends(get_current_user_from_request),
         db: Session = Depends(get_db)
-) -> PortfolioAnalysis:
+) -> Response:
     """
     Estimate returns for a portfolio between start_ts and end_ts.
     """
@@ -166,13 +179,80 @@ async def estimate_portfolio_returns(
     returns = current_value - total_investment
     returns_percentage = (returns / total_investment) * 100 if total_investment > 0 else 0
 
-    return PortfolioAnalysis(
+    return json_response(PortfolioAnalysis(
         total_investment=total_investment,
         current_value=current_value,
         returns=returns,
         returns_percentage=returns_percentage,
         holdings=holdings_list
-    )
+    ))
+
+
+def get_owned_portfolio(portfolio_id: str, current_user_id: str, db: Session) -> Portfolio:
+    """Get a portfolio, raising 404/403 if it does not exist or belongs to another user"""
+    portfolio = PortfolioRepository(db).get_portfolio_by_id(portfolio_id)
+    if not portfolio:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Portfolio not found"
+        )
+    if portfolio.user_id != current_user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this portfolio"
+        )
+    return portfolio
+
+
+@router.get("/analysis/net_worth", response_model=PositionValuation)
+async def get_historical_net_worth(
+        portfolio_id: str,
+        as_of: datetime,
+        current_user_id: str = Depends(get_current_user_from_request),
+        db: Session = Depends(get_db)
+) -> PositionValuation:
+    """
+    Get the portfolio's end-of-day holdings, cash and net worth on the given date.
+    """
+    portfolio = get_owned_portfolio(portfolio_id, current_user_id, db)
+    valuation = PositionService(db).get_valuation(portfolio, as_of.date())
+    if valuation is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No position found for portfolio {portfolio_id} on {as_of.date()}"
+        )
+    return valuation
+
+
+@router.get("/analysis/pnl", response_model=dict)
+async def get_historical_pnl(
+        portfolio_id: str,
+        start_ts: datetime,
+        end_ts: datetime,
+        current_user_id: str = Depends(get_current_user_from_request),
+        db: Session = Depends(get_db)
+) -> dict:
+    """
+    Get the profit/loss of the portfolio between the end of start_ts and the end of end_ts.
+    """
+    if start_ts > end_ts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_ts can't be later than end_ts"
+        )
+    portfolio = get_owned_portfolio(portfolio_id, current_user_id, db)
+    profit_loss = PositionService(db).get_profit_loss(portfolio, start_ts.date(), end_ts.date())
+    if profit_loss is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No position found for portfolio {portfolio_id} on {start_ts.date()}"
+        )
+    return {
+        "portfolio_id": portfolio.id,
+        "start_date": start_ts.date(),
+        "end_date": end_ts.date(),
+        **profit_loss
+    }
 
 
 @router.get("/portfolio-analysis", response_model=PortfolioAnalysis)
@@ -1,18 +1,40 @@
 from fastapi import APIRouter
+from datetime import date
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from assessment_app.models.models import (Group)
+from starlette.concurrency import run_in_threadpool
+from assessment_app.models.models import (BulkImportResult, Group, GroupSchedule, GroupWorkload)
 from assessment_app.repository.database import get_db
 from assessment_app.repository.group import GroupRepository
 from pydantic import BaseModel
 
 from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.service.bulk_import import BulkImportService, read_import
+from assessment_app.service.group_service import GroupService
+from assessment_app.utils.fast_json import json_response
 
 router = APIRouter()
 
+MAX_RANGE_DAYS = 366
+MAX_MATRIX_CELLS = 1_000_000
+
+
+def check_range(start_day: date, end_day: date) -> None:
+    if start_day > end_day:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start day can't be after end day"
+        )
+    if (end_day - start_day).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range can't be longer than {MAX_RANGE_DAYS} days"
+        )
+
 
 @router.get("/groups", response_model=List[Group])
 async def get_groups(
@@ -35,3 +57,57 @@ async def create_groups(
     """
     groups_repo = GroupRepository(db)
     return groups_repo.create_group(group)
+
+
+@router.get("/groups/{group_id}/workload", response_model=GroupWorkload)
+async def get_group_workload(
+        group_id: str,
+        start_day: date = Query(..., alias="from"),
+        end_day: date = Query(..., alias="to"),
+        peaks: int = Query(5, ge=0, le=MAX_RANGE_DAYS),
+        matrix: bool = False,
+        db: Session = Depends(get_db)
+) -> Response:
+    """
+    Get the group's effort on each day between `from` and `to` and its peak-load days.
+    With matrix=true, also get the days x tasks effort matrix.
+    """
+    check_range(start_day, end_day)
+    group_service = GroupService(db)
+    workload = await run_in_threadpool(group_service.get_workload, group_id, start_day, end_day, peaks, matrix,
+                                       MAX_MATRIX_CELLS)
+    return json_response(workload)
+
+
+@router.get("/groups/{group_id}/schedule", response_model=GroupSchedule)
+async def get_group_schedule(
+        group_id: str,
+        capacity: float = Query(..., gt=0),
+        start_day: date = Query(..., alias="from"),
+        end_day: date = Query(..., alias="to"),
+        db: Session = Depends(get_db)
+) -> Response:
+    """
+    Level the group's work between `from` and `to` so that no day exceeds `capacity`,
+    moving work only within each task's own dates and weekdays.
+    Returns each day's effort before and after, and the moves that get there.
+    """
+    check_range(start_day, end_day)
+    group_service = GroupService(db)
+    schedule = await run_in_threadpool(group_service.get_schedule, group_id, start_day, end_day, capacity)
+    return json_response(schedule)
+
+
+@router.post("/groups/bulk", response_model=BulkImportResult)
+async def bulk_create_groups(
+        request: Request,
+        all_or_nothing: bool = False,
+        db: Session = Depends(get_db)
+) -> BulkImportResult:
+    """
+    Create many groups from a JSON array, a text/csv body or a CSV file uploaded as `file`.
+    Valid rows are inserted in one transaction and every invalid row is reported;
+    with all_or_nothing=true, nothing is inserted unless every row is valid.
+    """
+    frame = await read_import(request)
+    return await run_in_threadpool(BulkImportService(db).import_groups, frame, all_or_nothing)
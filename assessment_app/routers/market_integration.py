@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 import pandas as pd
 import os
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -13,9 +14,12 @@ from assessment_app.models.db_models import Trade as DBTrade, Portfolio as DBPor
     PortfolioHolding as DBPortfolioHolding
 from assessment_app.service.auth_service import get_current_user_from_request
 from assessment_app.repository.database import get_db
-from assessment_app.repository.trade_repository import TradeRepository
 from assessment_app.repository.portfolio_repository import PortfolioRepository
 from assessment_app.models.constants import StockSymbols
+from assessment_app.service.price_store import PRICE_LOOKUP_SECONDS, PriceBars, get_price_store, parse_interval, \
+    resample_bars, to_nanos
+from assessment_app.service.response_cache import cached_json_response
+from assessment_app.utils.fast_json import tick_records
 
 router = APIRouter()
 
@@ -29,6 +33,8 @@ class MarketDataRangeRequest(BaseModel):
     stock_symbol: str
     from_ts: datetime
     to_ts: datetime
+    # Resample to this bar size, e.g. 5m, 1h or 1d; the file's own bars when omitted
+    interval: Optional[str] = None
 
 
 class TradeRequest(BaseModel):
@@ -39,45 +45,40 @@ class TradeRequest(BaseModel):
     execution_ts: datetime
 
 
-def get_stock_data(stock_symbol: str, timestamp: datetime) -> pd.DataFrame:
-    """Load and filter stock data from CSV file"""
-    file_path = f"assessment_app/data/{stock_symbol}.csv"
-    if not os.path.exists(file_path):
+def load_stock_bars(stock_symbol: str) -> PriceBars:
+    """Get all cached bars for a stock, raising 404 if there is no data file"""
+    bars = get_price_store().get_bars(stock_symbol)
+    if bars is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock data not found for {stock_symbol}"
         )
+    return bars
 
-    df = pd.read_csv(file_path)
-    df['Date'] = pd.to_datetime(df['Date'])
-    # Filter by date component only
-    target_date = timestamp.date()
-    df = df[df['Date'].dt.date == target_date]
-    return df
 
+def load_stock_data(stock_symbol: str) -> pd.DataFrame:
+    """Get all cached bars for a stock as a frame, raising 404 if there is no data file"""
+    return load_stock_bars(stock_symbol).frame
 
-def get_stock_data_range(stock_symbol: str, from_ts: datetime, to_ts: datetime) -> pd.DataFrame:
-    """Load and filter stock data for a date range"""
-    file_path = f"assessment_app/data/{stock_symbol}.csv"
-    if not os.path.exists(file_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Stock data not found for {stock_symbol}"
-        )
 
-    df = pd.read_csv(file_path)
-    df['Date'] = pd.to_datetime(df['Date'])
-    # Filter by date component only
-    from_date = from_ts.date()
-    to_date = to_ts.date()
-    return df[(df['Date'].dt.date >= from_date) & (df['Date'].dt.date <= to_date)]
+@PRICE_LOOKUP_SECONDS.time("get_stock_data")
+def get_stock_data(stock_symbol: str, timestamp: datetime) -> pd.DataFrame:
+    """Get the bar covering timestamp: the day's bar for daily data, the minute's or second's for intraday data"""
+    return load_stock_bars(stock_symbol).at(timestamp)
+
+
+@PRICE_LOOKUP_SECONDS.time("get_stock_data_range")
+def get_stock_data_range(stock_symbol: str, from_ts: datetime, to_ts: datetime) -> pd.DataFrame:
+    """Get the bars overlapping a time range"""
+    return load_stock_bars(stock_symbol).between(from_ts, to_ts)
 
 
 @router.post("/market/data/tick", response_model=TickData)
 async def get_market_data_tick(
         request: MarketDataRequest,
+        http_request: Request,
         db: Session = Depends(get_db)
-) -> TickData:
+) -> Response:
     """
     Get data for stocks for a given datetime from `data` folder.
     """
@@ -87,31 +88,38 @@ async def get_market_data_tick(
             detail=f"Invalid stock symbol. Valid symbols are: {[s.value for s in StockSymbols]}"
         )
 
-    df = get_stock_data(request.stock_symbol, request.current_ts)
-    if df.empty:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No data found for {request.stock_symbol} at {request.current_ts}"
-        )
+    def build_tick():
+        df = get_stock_data(request.stock_symbol, request.current_ts)
+        if df.empty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No data found for {request.stock_symbol} at {request.current_ts}"
+            )
 
-    row = df.iloc[0]
-    return TickData(
-        stock_symbol=request.stock_symbol,
-        timestamp=request.current_ts,
-        price=(row['Open'] + row['Close']) / 2,
-        open_price=row['Open'],
-        high_price=row['High'],
-        low_price=row['Low'],
-        close_price=row['Close'],
-        volume=row['Volume']
+        row = df.iloc[0]
+        # A bar never changes once it is in the file
+        return TickData(
+            stock_symbol=request.stock_symbol,
+            timestamp=request.current_ts,
+            price=(row['Open'] + row['Close']) / 2,
+            open_price=row['Open'],
+            high_price=row['High'],
+            low_price=row['Low'],
+            close_price=row['Close'],
+            volume=row['Volume']
+        ), True
+
+    return cached_json_response(
+        http_request, "/market/data/tick", request.stock_symbol, (request.current_ts.isoformat(),), build_tick
     )
 
 
 @router.post("/market/data/range", response_model=List[TickData])
 async def get_market_data_range(
         request: MarketDataRangeRequest,
+        http_request: Request,
         db: Session = Depends(get_db)
-) -> List[TickData]:
+) -> Response:
     """
     Get data for stocks for a given datetime range from `data` folder.
     """
@@ -121,26 +129,43 @@ async def get_market_data_range(
             detail=f"Invalid stock symbol. Valid symbols are: {[s.value for s in StockSymbols]}"
         )
 
-    df = get_stock_data_range(request.stock_symbol, request.from_ts, request.to_ts)
-    if df.empty:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No data found for {request.stock_symbol} between {request.from_ts} and {request.to_ts}"
-        )
+    interval = None
+    if request.interval is not None:
+        try:
+            interval = parse_interval(request.interval)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    bars = load_stock_bars(request.stock_symbol)
+    from_ns, to_ns = to_nanos(request.from_ts), to_nanos(request.to_ts)
+    if interval is not None:
+        if interval < bars.interval:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Interval {request.interval} is finer than the bars of {request.stock_symbol}"
+            )
+        # Widen the range to whole buckets so the first and last resampled bars are complete
+        from_ns -= from_ns % interval
+        to_ns += interval - 1 - to_ns % interval
+    first, last = bars.bounds(pd.Timestamp(from_ns), pd.Timestamp(to_ns))
+
+    def build_range():
+        df = bars.frame.iloc[first:last]
+        if df.empty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No data found for {request.stock_symbol} between {request.from_ts} and {request.to_ts}"
+            )
+        if interval is not None:
+            df = resample_bars(df, interval)
 
-    return [
-        TickData(
-            stock_symbol=request.stock_symbol,
-            timestamp=row['Date'],
-            price=(row['Open'] + row['Close']) / 2,
-            open_price=row['Open'],
-            high_price=row['High'],
-            low_price=row['Low'],
-            close_price=row['Close'],
-            volume=row['Volume']
-        )
-        for _, row in df.iterrows()
-    ]
+        ticks = tick_records(request.stock_symbol, df)
+        # A range that reaches the last bar in the file grows when new bars are added
+        return ticks, last < len(bars.starts)
+
+    # Requests covering the same bars share an entry; a reload of the file invalidates the positions
+    params = (first, last, request.interval or "")
+    return cached_json_response(http_request, "/market/data/range", request.stock_symbol, params, build_range)
 
 
 @router.post("/market/trade", response_model=Trade)
@@ -159,7 +184,7 @@ async def trade_stock(
             detail=f"Invalid stock symbol. Valid symbols are: {[s.value for s in StockSymbols]}"
         )
 
-    # Get market data for trade timestamp
+    # Get the bar covering the trade timestamp
     df = get_stock_data(trade_request.stock_symbol, trade_request.execution_ts)
     if df.empty:
         raise HTTPException(
@@ -177,15 +202,16 @@ async def trade_stock(
             detail=f"Trade price must be equal to average price: {avg_price}"
         )
 
-    # Get user's portfolio
+    # Load portfolio and holdings in one query; every change below is flushed once
     portfolio_repo = PortfolioRepository(db)
-    portfolio = portfolio_repo.get_portfolio(current_user_id)
+    unit_of_work = portfolio_repo.get_portfolio_for_trade(current_user_id)
 
-    if not portfolio:
+    if not unit_of_work:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Portfolio not found"
         )
+    portfolio = unit_of_work.portfolio
 
     # Validate trade timestamp
     if trade_request.execution_ts < portfolio.current_ts:
@@ -196,6 +222,7 @@ async def trade_stock(
 
     # Calculate trade value
     trade_value = trade_request.price * trade_request.quantity
+    holding = unit_of_work.get_holding(trade_request.stock_symbol)
 
     # Validate trade based on type
     if trade_request.trade_type == "BUY":
@@ -207,8 +234,7 @@ async def trade_stock(
         portfolio.cash_balance -= trade_value
     else:  # SELL
         # Check if user has enough shares
-        holdings = portfolio_repo.get_holdings(current_user_id, trade_request.stock_symbol)
-        if not holdings or holdings.quantity < trade_request.quantity:
+        if not holding or holding.quantity < trade_request.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient shares"
@@ -217,10 +243,8 @@ async def trade_stock(
 
     # Update portfolio
     portfolio.current_ts = trade_request.execution_ts
-    portfolio_repo.update_portfolio(portfolio)
 
     # Get or create portfolio holding
-    holding = portfolio_repo.get_holdings(current_user_id, trade_request.stock_symbol)
     if trade_request.trade_type == "BUY":
         if holding:
             # Update existing holding
@@ -232,27 +256,26 @@ async def trade_stock(
             holding.current_value = total_quantity * trade_request.price
         else:
             # Create new holding
-            holding = DBPortfolioHolding(
+            unit_of_work.add_holding(DBPortfolioHolding(
                 id=str(uuid.uuid4()),
                 portfolio_id=portfolio.id,
                 stock_symbol=trade_request.stock_symbol,
                 quantity=trade_request.quantity,
                 average_price=trade_request.price,
                 current_value=trade_value
-            )
-            db.add(holding)
+            ))
     else:  # SELL
         # Update existing holding
         holding.quantity -= trade_request.quantity
         if holding.quantity == 0:
             # Remove holding if no shares left
-            db.delete(holding)
+            unit_of_work.remove_holding(holding)
         else:
             # Update current value
             holding.current_value = holding.quantity * trade_request.price
 
     # Create trade object
-    db_trade = DBTrade(
+    trade = Trade(
         id=str(uuid.uuid4()),
         user_id=current_user_id,
         stock_symbol=trade_request.stock_symbol,
@@ -262,22 +285,21 @@ async def trade_stock(
         execution_ts=trade_request.execution_ts,
         created_at=datetime.now()
     )
-
-    # Save trade and commit all changes
-    trade_repo = TradeRepository(db)
-    saved_trade = trade_repo.create_trade(db_trade)
-
-    # Convert to Pydantic model for response
-    return Trade(
-        id=saved_trade.id,
-        user_id=saved_trade.user_id,
-        stock_symbol=saved_trade.stock_symbol,
-        quantity=saved_trade.quantity,
-        price=saved_trade.price,
-        trade_type=saved_trade.trade_type,
-        execution_ts=saved_trade.execution_ts,
-        created_at=saved_trade.created_at
-    )
+    unit_of_work.add_trade(DBTrade(
+        id=trade.id,
+        user_id=trade.user_id,
+        stock_symbol=trade.stock_symbol,
+        quantity=trade.quantity,
+        price=trade.price,
+        trade_type=trade.trade_type,
+        execution_ts=trade.execution_ts,
+        created_at=trade.created_at
+    ))
+
+    # Save trade and commit all changes in a single flush. The response is
+    # built from the request values so expired attributes are not reloaded.
+    unit_of_work.commit()
+    return trade
 
 
 @router.get("/stocks")
@@ -287,10 +309,8 @@ async def get_stocks():
     """
     stocks = []
     for stock_symbol in [s.value for s in StockSymbols]:
-        file_path = f"assessment_app/data/{stock_symbol}.csv"
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path)
-            df['Date'] = pd.to_datetime(df['Date'])
+        df = get_price_store().get_frame(stock_symbol)
+        if df is not None:
             latest_data = df.iloc[-1]
             current_price = (latest_data['Open'] + latest_data['Close']) / 2
             stocks.append(StockInfo(
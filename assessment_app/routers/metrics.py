@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from assessment_app.utils.metrics import generate_latest
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics() -> PlainTextResponse:
+    """
+    Metrics in the Prometheus text format, summed across workers in multiprocess mode.
+    """
+    return PlainTextResponse(generate_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
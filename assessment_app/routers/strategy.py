@@ -3,6 +3,7 @@ from typing import List
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
 from assessment_app.models.models import Portfolio, PortfolioRequest, Strategy, UserResponse, StockInfo
@@ -12,6 +13,8 @@ from assessment_app.repository.database import get_db
 from assessment_app.repository.portfolio_repository import PortfolioRepository
 from assessment_app.repository.strategy_repository import StrategyRepository
 from assessment_app.repository.user_repository import UserRepository
+from assessment_app.service.price_store import get_price_store
+from assessment_app.utils.fast_json import json_response, row_records
 import pandas as pd
 import os
 from pydantic import BaseModel
@@ -21,15 +24,12 @@ router = APIRouter()
 
 def get_stock_price_at_timestamp(stock_symbol: str, timestamp: datetime) -> float:
     """Get stock price at a specific timestamp"""
-    file_path = f"assessment_app/data/{stock_symbol}.csv"
-    if not os.path.exists(file_path):
+    df = get_price_store().get_frame(stock_symbol)
+    if df is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Stock data not found for {stock_symbol}"
         )
-
-    df = pd.read_csv(file_path)
-    df['Date'] = pd.to_datetime(df['Date'])
     df = df[df['Date'] == timestamp.date()]
 
     if df.empty:
@@ -239,10 +239,8 @@ async def get_all_stocks() -> List[StockInfo]:
 
     for stock in available_stocks:
         try:
-            # Read the CSV file and get the latest data
-            file_path = f"assessment_app/data/{stock}.csv"
-            df = pd.read_csv(file_path)
-            df['Date'] = pd.to_datetime(df['Date'])
+            # Get the cached bars and the latest data
+            df = get_price_store().get_frame(stock)
             latest_data = df.iloc[-1]  # Get the last row (most recent data)
 
             # Calculate average price
@@ -269,24 +267,23 @@ async def get_all_stocks() -> List[StockInfo]:
 @router.get("/users", response_model=List[UserResponse])
 async def get_all_users(
         db: Session = Depends(get_db)
-) -> List[UserResponse]:
+) -> Response:
     """
     Get all users.
     """
     user_repo = UserRepository(db)
-    users = user_repo.get_all_users()
-    return [UserResponse.from_orm(user) for user in users]
+    return json_response(row_records(user_repo.get_all_user_rows()))
 
 
 @router.get("/portfolios", response_model=List[Portfolio])
 async def get_all_portfolios(
         db: Session = Depends(get_db)
-) -> List[Portfolio]:
+) -> Response:
     """
     Get list of all portfolios.
     """
     portfolio_repo = PortfolioRepository(db)
-    return portfolio_repo.get_all_portfolios()
+    return json_response(row_records(portfolio_repo.get_all_portfolio_rows()))
 
 
 class TimestampUpdateRequest(BaseModel):
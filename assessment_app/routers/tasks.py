@@ -1,19 +1,23 @@
 from fastapi import APIRouter
-from datetime import datetime
+from datetime import date, datetime
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from assessment_app.models.models import (Task)
+from starlette.concurrency import run_in_threadpool
+from assessment_app.models.models import (BulkImportResult, Task, TaskDayWorkload)
 from assessment_app.repository.database import get_db
 from assessment_app.repository.tasks import TaskRepository
 from pydantic import BaseModel
 
 from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.service.bulk_import import BulkImportService, read_import
 
 router = APIRouter()
 
+MAX_RANGE_DAYS = 366
+
 
 @router.get("/tasks", response_model=List[Task])
 async def get_tasks(
@@ -35,7 +39,7 @@ async def create_tasks(
     Create a new trading tasks.
     """
     tasks_repo = TaskRepository(db)
-    return tasks_repo.creat e_task(task)
+    return tasks_repo.create_task(task)
 
 
 @router.get("/tasks_for_days", response_model=List[Task])
@@ -48,3 +52,36 @@ async def get_tasks(
     """
     task_repo = TaskRepository(db)
     return task_repo.tasks_for_day(day)
+
+
+@router.get("/tasks_for_range", response_model=List[TaskDayWorkload])
+async def get_tasks_for_range(
+        start_day: date,
+        end_day: date,
+        db: Session = Depends(get_db)
+) -> List[TaskDayWorkload]:
+    """
+    Get the tasks scheduled on each day between start_day and end_day, with each day's total effort.
+    """
+    if (end_day - start_day).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The range can't be longer than {MAX_RANGE_DAYS} days"
+        )
+    task_repo = TaskRepository(db)
+    return task_repo.tasks_for_range(start_day, end_day)
+
+
+@router.post("/tasks/bulk", response_model=BulkImportResult)
+async def bulk_create_tasks(
+        request: Request,
+        all_or_nothing: bool = False,
+        db: Session = Depends(get_db)
+) -> BulkImportResult:
+    """
+    Create many tasks from a JSON array, a text/csv body or a CSV file uploaded as `file`.
+    Valid rows are inserted in one transaction and every invalid row is reported;
+    with all_or_nothing=true, nothing is inserted unless every row is valid.
+    """
+    frame = await read_import(request)
+    return await run_in_threadpool(BulkImportService(db).import_tasks, frame, all_or_nothing)
@@ -0,0 +1,112 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session
+
+from assessment_app.models.models import TradePage
+from assessment_app.repository.database import get_db
+from assessment_app.repository.trade_repository import TradeRepository, TradeRow, TRADE_HISTORY_COLUMNS
+from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.utils.fast_json import json_response, row_records
+from assessment_app.utils.utils import encode_cursor, decode_cursor
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+
+def parse_cursor(after: Optional[str]):
+    """Decode the `after` query parameter, mapping malformed cursors to a 400"""
+    if after is None:
+        return None
+    try:
+        return decode_cursor(after)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def to_trade_page(rows: List[TradeRow], limit: int) -> Response:
+    """
+    Build a TradePage response straight from the rows; next_cursor is set only when the page is full
+    """
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.execution_ts, last.id)
+    return json_response({"trades": row_records(rows), "next_cursor": next_cursor})
+
+
+@router.get("/trades", response_model=TradePage)
+async def get_trades(
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        current_user_id: str = Depends(get_current_user_from_request),
+        db: Session = Depends(get_db)
+) -> Response:
+    """
+    Get the current user's trade history, oldest first, one page at a time.
+    Pass the returned `next_cursor` as `after` to fetch the next page.
+    """
+    trade_repo = TradeRepository(db)
+    rows = trade_repo.get_user_trades_page(current_user_id, parse_cursor(after), limit)
+    return to_trade_page(rows, limit)
+
+
+@router.get("/trades/range", response_model=TradePage)
+async def get_trades_by_time_range(
+        start_ts: datetime,
+        end_ts: datetime,
+        after: Optional[str] = None,
+        limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+        current_user_id: str = Depends(get_current_user_from_request),
+        db: Session = Depends(get_db)
+) -> Response:
+    """
+    Get the current user's trades executed between start_ts and end_ts, one page at a time.
+    """
+    if start_ts > end_ts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_ts can't be later than end_ts"
+        )
+    trade_repo = TradeRepository(db)
+    rows = trade_repo.get_trades_by_time_range_page(start_ts, end_ts, parse_cursor(after), limit, current_user_id)
+    return to_trade_page(rows, limit)
+
+
+@router.get("/trades/export")
+async def export_trades(
+        current_user_id: str = Depends(get_current_user_from_request),
+        db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Export the current user's complete trade history as CSV.
+    Rows are streamed from a server-side cursor, so memory use is constant.
+    """
+    trade_repo = TradeRepository(db)
+
+    def generate_csv() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.key for column in TRADE_HISTORY_COLUMNS])
+        for index, row in enumerate(trade_repo.stream_user_trades(current_user_id, EXPORT_BATCH_SIZE), 1):
+            writer.writerow(row)
+            if index % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+
+    return StreamingResponse(
+        generate_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=trades.csv"}
+    )
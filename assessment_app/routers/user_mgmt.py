@@ -1,44 +1,23 @@
-from datetime import datetime, timedelta
-from typing import Optional
-import uuid
+from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
+from assessment_app.config import Config
 from assessment_app.models.models import RegisterUserRequest, UserResponse
 from assessment_app.models.db_models import User
 from assessment_app.models.constants import JWT_TOKEN
 from assessment_app.repository.database import get_db
 from assessment_app.repository.user_repository import UserRepository
+from assessment_app.service.auth_service import get_token_from_request, get_verified_token
+from assessment_app.service.password_hasher import password_hasher
+from assessment_app.service.revocation_list import revocation_list
+from assessment_app.service.token_service import create_access_token, get_keyring
 
-# Security configuration
-SECRET_KEY = "your-secret-key-here"  # In production, use environment variable
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 router = APIRouter()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
 @router.post("/register", response_model=UserResponse)
 async def register_user(user: RegisterUserRequest, db: Session = Depends(get_db)) -> UserResponse:
     """
@@ -54,7 +33,7 @@ async def register_user(user: RegisterUserRequest, db: Session = Depends(get_db)
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = User(
         username=user.username,
         email=user.email,
@@ -72,16 +51,24 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
     user_repo = UserRepository(db)
     user = user_repo.get_user_by_email(form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = (False, None)
+    if user:
+        verified, new_hash = await password_hasher.verify(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Upgrade hashes made with an older scheme or cost while the plain password is at hand
+    if new_hash:
+        user.hashed_password = new_hash
+        user_repo.update_user(user)
+    
+    access_token_expires = timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
     )
     
     response = JSONResponse(content={"access_token": access_token, "token_type": "bearer"})
@@ -93,3 +80,41 @@ async def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Sessi
         samesite="lax"
     )
     return response
+
+@router.post("/logout")
+async def logout_user(request: Request, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Revoke the jwt_token used for this request and remove it from the response cookies.
+    """
+    verified = await get_verified_token(get_token_from_request(request), db)
+    if verified.jti is None:
+        # Tokens issued without a jti can only be revoked together with the user's other tokens
+        revocation_list.revoke_user(db, verified.user_id)
+    else:
+        revocation_list.revoke_token(db, verified.jti, verified.user_id)
+    
+    response = JSONResponse(content={"message": "Logged out"})
+    response.delete_cookie(key=JWT_TOKEN)
+    return response
+
+@router.post("/logout/all")
+async def logout_all_sessions(request: Request, db: Session = Depends(get_db)) -> JSONResponse:
+    """
+    Revoke every jwt_token issued to the user so far, on all devices.
+    """
+    verified = await get_verified_token(get_token_from_request(request), db)
+    revocation_list.revoke_user(db, verified.user_id)
+    
+    response = JSONResponse(content={"message": "Logged out of all sessions"})
+    response.delete_cookie(key=JWT_TOKEN)
+    return response
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks() -> JSONResponse:
+    """
+    Public keys for verifying access tokens, keyed by kid. Verifying nodes cache this.
+    """
+    return JSONResponse(
+        content=get_keyring().jwks(),
+        headers={"Cache-Control": f"public, max-age={Config.JWKS_REFRESH_SECONDS}"}
+    )
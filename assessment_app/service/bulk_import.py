@@ -0,0 +1,239 @@
+import io
+import uuid
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import HTTPException, Request
+from sqlalchemy.orm import Session
+from starlette import status
+
+from assessment_app.config import Config
+from assessment_app.models.models import BulkImportError, BulkImportResult
+from assessment_app.repository.group import GroupRepository
+from assessment_app.repository.tasks import TaskRepository
+
+MAX_REPORTED_ERRORS = 1000
+
+WEEKDAYS_MESSAGE = "weekdays must be a non-empty set of distinct days 0-6 (0 = Monday)"
+
+# Sorted day list of every 7-bit weekday mask
+WEEKDAY_LISTS = [[day for day in range(7) if bits >> day & 1] for bits in range(1 << 7)]
+
+
+def bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+def read_rows(data: bytes, csv_format: bool) -> pd.DataFrame:
+    """Parse a JSON array of objects, or a CSV file with a header line, into one frame row per record"""
+    if csv_format:
+        try:
+            frame = pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False, skipinitialspace=True)
+        except pd.errors.EmptyDataError:
+            frame = pd.DataFrame()
+        except (ValueError, UnicodeDecodeError) as e:
+            raise bad_request(f"Invalid CSV: {e}")
+    else:
+        try:
+            records = orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            raise bad_request(f"Invalid JSON: {e}")
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise bad_request("Expected a JSON array of objects")
+        frame = pd.DataFrame.from_records(records)
+    if len(frame) > Config.BULK_IMPORT_MAX_ROWS:
+        raise bad_request(f"An import can't have more than {Config.BULK_IMPORT_MAX_ROWS} rows")
+    return frame.reset_index(drop=True)
+
+
+async def read_import(request: Request) -> pd.DataFrame:
+    """
+    Read the rows of a bulk import sent as a JSON array body, a text/csv body,
+    or a multipart upload in the `file` field (CSV unless it is named *.json)
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "multipart/form-data":
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise bad_request("Upload the rows as a file in the `file` field")
+        csv_format = not (upload.filename or "").lower().endswith(".json")
+        return read_rows(await upload.read(), csv_format)
+    return read_rows(await request.body(), content_type in ("text/csv", "application/csv"))
+
+
+class RowErrors:
+    """Per-row validation failures, collected one vectorized check at a time"""
+
+    def __init__(self, n_rows: int):
+        self.invalid = np.zeros(n_rows, dtype=bool)
+        self._checks: List[Tuple[np.ndarray, str, str]] = []
+
+    def add(self, mask: Any, field: str, message: str) -> None:
+        mask = np.asarray(mask, dtype=bool)
+        rows = np.flatnonzero(mask)
+        if rows.size:
+            self.invalid |= mask
+            self._checks.append((rows, field, message))
+
+    def report(self, limit: int = MAX_REPORTED_ERRORS) -> List[BulkImportError]:
+        """The errors of the first rows, in row order; each check contributes at most limit of them"""
+        found = [
+            (row, order, field, message)
+            for order, (rows, field, message) in enumerate(self._checks)
+            for row in rows[:limit].tolist()
+        ]
+        found.sort()
+        return [BulkImportError(row=row, field=field, message=message) for row, _, field, message in found[:limit]]
+
+
+def text_column(frame: pd.DataFrame, column: str) -> pd.Series:
+    """The column as stripped strings; missing and non-string values become empty"""
+    if column not in frame:
+        return pd.Series("", index=frame.index, dtype=object)
+    values = frame[column]
+    return values.where(values.map(lambda value: isinstance(value, str)), "").astype(object).str.strip()
+
+
+def non_text(frame: pd.DataFrame, column: str) -> np.ndarray:
+    """Rows where the column holds a value that is not a string, e.g. a number in a JSON record"""
+    if column not in frame:
+        return np.zeros(len(frame), dtype=bool)
+    values = frame[column]
+    return (values.notna() & ~values.map(lambda value: isinstance(value, str))).to_numpy()
+
+
+def datetime_column(frame: pd.DataFrame, column: str) -> pd.Series:
+    """ISO 8601 dates or datetimes as naive UTC timestamps, NaT where missing or invalid"""
+    parsed = pd.to_datetime(text_column(frame, column).replace("", None), errors="coerce", format="ISO8601", utc=True)
+    return parsed.dt.tz_convert(None)
+
+
+def weekdays_column(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weekday sets given as JSON lists or as CSV text like "1;2;3" or "[1,2,3]".
+    Returns each row's days as a 7-bit mask (bit 0 = Monday) and a mask of the invalid rows.
+    """
+    if "weekdays" not in frame:
+        return np.zeros(len(frame), dtype=np.int64), np.ones(len(frame), dtype=bool)
+    text = frame["weekdays"].map(
+        lambda value: ",".join(map(str, value)) if isinstance(value, list) else value if isinstance(value, str) else ""
+    )
+    items = text.str.replace(r"[\[\]\s]", "", regex=True).str.split(r"[,;]", regex=True).explode()
+    days = pd.to_numeric(items, errors="coerce")
+    pairs = pd.DataFrame({"row": days.index.to_numpy(), "day": days.to_numpy()})
+    bad_item = pairs["day"].isna() | (pairs["day"] % 1 != 0) | ~pairs["day"].between(0, 6) | pairs.duplicated()
+    invalid = bad_item.groupby(pairs["row"]).any().reindex(frame.index, fill_value=True).to_numpy()
+
+    good = ~bad_item.to_numpy()
+    # Days within a valid row are distinct, so summing their bits ORs them
+    bits = np.bincount(
+        pairs["row"].to_numpy()[good],
+        weights=np.left_shift(1, pairs["day"].to_numpy()[good].astype(np.int64)),
+        minlength=len(frame)
+    )
+    return bits.astype(np.int64), invalid
+
+
+class BulkImportService:
+    """
+    Validates a whole import with column-wise checks and inserts the valid rows
+    in one transaction, instead of one request, commit and refresh per row.
+    With all_or_nothing, a single invalid row rejects the whole import.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.task_repo = TaskRepository(db)
+        self.group_repo = GroupRepository(db)
+
+    @staticmethod
+    def _check_text(errors: RowErrors, frame: pd.DataFrame, columns: List[str]) -> None:
+        for column in columns:
+            errors.add(non_text(frame, column), column, f"{column} must be a string")
+
+    def _check_ids(self, errors: RowErrors, ids: pd.Series, existing_ids) -> None:
+        given = ids != ""
+        errors.add(given & ids.duplicated(), "id", "id appears earlier in the import")
+        errors.add(given & ids.isin(existing_ids(ids[given])), "id", "id already exists")
+
+    @staticmethod
+    def _fill_ids(ids: pd.Series) -> List[str]:
+        return [task_id or str(uuid.uuid4()) for task_id in ids.tolist()]
+
+    def import_tasks(self, frame: pd.DataFrame, all_or_nothing: bool = False) -> BulkImportResult:
+        errors = RowErrors(len(frame))
+        self._check_text(errors, frame, ["id", "group_id", "name"])
+        ids = text_column(frame, "id")
+        self._check_ids(errors, ids, self.task_repo.get_existing_task_ids)
+        group_ids = text_column(frame, "group_id")
+        errors.add(group_ids == "", "group_id", "group_id is required")
+        names = text_column(frame, "name")
+        errors.add(names == "", "name", "name is required")
+        start_dates = datetime_column(frame, "start_date")
+        errors.add(start_dates.isna(), "start_date", "start_date must be an ISO 8601 date or datetime")
+        end_dates = datetime_column(frame, "end_date")
+        errors.add(end_dates.isna(), "end_date", "end_date must be an ISO 8601 date or datetime")
+        errors.add(start_dates > end_dates, "end_date", "start_date can't be after end_date")
+        efforts = pd.to_numeric(
+            frame["estimated_effort"] if "estimated_effort" in frame else pd.Series(np.nan, index=frame.index),
+            errors="coerce"
+        ).to_numpy(dtype=float)
+        errors.add(~np.isfinite(efforts), "estimated_effort", "estimated_effort must be a number")
+        weekdays, invalid_weekdays = weekdays_column(frame)
+        errors.add(invalid_weekdays, "weekdays", WEEKDAYS_MESSAGE)
+
+        inserted = 0
+        keep = np.flatnonzero(~errors.invalid)
+        if keep.size and not (all_or_nothing and errors.invalid.any()):
+            records = [
+                {
+                    "id": task_id,
+                    "group_id": group_id,
+                    "name": name,
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "estimated_effort": effort,
+                    "weekdays": days,
+                }
+                for task_id, group_id, name, start_date, end_date, effort, days in zip(
+                    self._fill_ids(ids.iloc[keep]),
+                    group_ids.iloc[keep].tolist(),
+                    names.iloc[keep].tolist(),
+                    pd.DatetimeIndex(start_dates.iloc[keep]).to_pydatetime(),
+                    pd.DatetimeIndex(end_dates.iloc[keep]).to_pydatetime(),
+                    efforts[keep].tolist(),
+                    [list(WEEKDAY_LISTS[bits]) for bits in weekdays[keep].tolist()],
+                )
+            ]
+            inserted = self.task_repo.bulk_insert_tasks(records)
+        return self._result(len(frame), inserted, errors)
+
+    def import_groups(self, frame: pd.DataFrame, all_or_nothing: bool = False) -> BulkImportResult:
+        errors = RowErrors(len(frame))
+        self._check_text(errors, frame, ["id", "name"])
+        ids = text_column(frame, "id")
+        self._check_ids(errors, ids, self.group_repo.get_existing_group_ids)
+        names = text_column(frame, "name")
+        errors.add(names == "", "name", "name is required")
+
+        inserted = 0
+        keep = np.flatnonzero(~errors.invalid)
+        if keep.size and not (all_or_nothing and errors.invalid.any()):
+            records = [
+                {"id": group_id, "name": name}
+                for group_id, name in zip(self._fill_ids(ids.iloc[keep]), names.iloc[keep].tolist())
+            ]
+            inserted = self.group_repo.bulk_insert_groups(records)
+        return self._result(len(frame), inserted, errors)
+
+    @staticmethod
+    def _result(received: int, inserted: int, errors: RowErrors) -> BulkImportResult:
+        return BulkImportResult(
+            received=received,
+            inserted=inserted,
+            failed=int(errors.invalid.sum()),
+            errors=errors.report()
+        )
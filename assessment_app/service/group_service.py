@@ -0,0 +1,160 @@
+import json
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette import status
+
+from assessment_app.config import Config
+from assessment_app.repository.group import GroupRepository
+from assessment_app.repository.tasks import TaskRepository
+from assessment_app.service.scheduler import WorkloadLeveler
+
+DAYS_PER_WEEK = 7
+
+
+def weekday_masks(weekdays: Iterable[Sequence[int]]) -> np.ndarray:
+    """A (tasks x 7) boolean array, True where the task runs on that weekday (0 = Monday)"""
+    # Tasks share a handful of distinct weekday lists, so each is turned into bits once
+    bits_of: Dict[Tuple[int, ...], int] = {}
+    bits = []
+    for days in weekdays:
+        key = tuple(days)
+        value = bits_of.get(key)
+        if value is None:
+            value = bits_of[key] = sum(1 << day for day in set(days) if 0 <= day < DAYS_PER_WEEK)
+        bits.append(value)
+    bits = np.array(bits, dtype=np.int64)
+    return ((bits[:, None] >> np.arange(DAYS_PER_WEEK)) & 1).astype(bool)
+
+
+class WorkloadMatrix:
+    """
+    Effort of a set of tasks on each day of [start_day, end_day]. A task's
+    estimated_effort is spread evenly over its weekdays, as in tasks_for_day.
+    Per-day totals come from one difference array per weekday, so they take
+    O(tasks + days) without ever materializing the days x tasks matrix.
+    """
+
+    def __init__(self, start_day: date, end_day: date, task_ids: Sequence[str], starts: np.ndarray,
+                 ends: np.ndarray, efforts: np.ndarray, masks: np.ndarray):
+        self.start_day = start_day
+        self.end_day = end_day
+        self.n_days = (end_day - start_day).days + 1
+        origin = np.datetime64(start_day, "D")
+        # Day offsets into the window, clipped so that tasks outside it get first > last
+        first = np.clip((starts.astype("datetime64[D]") - origin).astype(np.int64), 0, self.n_days)
+        last = np.clip((ends.astype("datetime64[D]") - origin).astype(np.int64), -1, self.n_days - 1)
+        runs_per_week = masks.sum(axis=1)
+        keep = (first <= last) & (runs_per_week > 0)
+
+        self.task_ids = np.asarray(task_ids, dtype=object)[keep].tolist()
+        self.first = first[keep]
+        self.last = last[keep]
+        self.masks = masks[keep]
+        self.daily_effort = np.asarray(efforts, dtype=float)[keep] / runs_per_week[keep]
+        self.day_weekdays = (start_day.weekday() + np.arange(self.n_days)) % DAYS_PER_WEEK
+        self.totals, self.active_tasks = self._sweep()
+
+    def _sweep(self):
+        days = np.arange(self.n_days)
+        # One contiguous row of weights per weekday
+        efforts = np.ascontiguousarray((self.masks * self.daily_effort[:, None]).T)
+        runs = np.ascontiguousarray(self.masks.T, dtype=float)
+        totals = np.empty((DAYS_PER_WEEK, self.n_days))
+        counts = np.empty((DAYS_PER_WEEK, self.n_days))
+        for weekday in range(DAYS_PER_WEEK):
+            # +weight where a task starts, -weight the day after it ends; the running sum is the load
+            for out, weights in ((totals, efforts[weekday]), (counts, runs[weekday])):
+                diff = np.bincount(self.first, weights=weights, minlength=self.n_days + 1)
+                diff -= np.bincount(self.last + 1, weights=weights, minlength=self.n_days + 1)
+                out[weekday] = np.cumsum(diff[:self.n_days])
+        # Each day only counts the tasks that run on its own weekday
+        totals = np.maximum(totals[self.day_weekdays, days], 0.0)
+        active_tasks = np.rint(counts[self.day_weekdays, days]).astype(np.int64)
+        return totals, active_tasks
+
+    def effort_matrix(self) -> np.ndarray:
+        """The (days x tasks) effort matrix, columns in task_ids order"""
+        days = np.arange(self.n_days)[:, None]
+        scheduled = (days >= self.first) & (days <= self.last) & self.masks[:, self.day_weekdays].T
+        return np.where(scheduled, self.daily_effort, 0.0)
+
+    def peak_days(self, count: int) -> np.ndarray:
+        """Offsets of the count busiest days with any effort, busiest (then earliest) first"""
+        loaded = np.flatnonzero(self.totals > 0)
+        if count <= 0 or loaded.size == 0:
+            return loaded[:0]
+        if count < loaded.size:
+            loaded = loaded[np.argpartition(-self.totals[loaded], count - 1)[:count]]
+        return loaded[np.lexsort((loaded, -self.totals[loaded]))]
+
+    def day_records(self, offsets: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        if offsets is None:
+            offsets = np.arange(self.n_days)
+        return [
+            {"day": self.start_day + timedelta(days=offset), "total_effort": total, "active_tasks": active}
+            for offset, total, active in zip(
+                offsets.tolist(), self.totals[offsets].tolist(), self.active_tasks[offsets].tolist()
+            )
+        ]
+
+
+class GroupService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.group_repo = GroupRepository(db)
+        self.task_repo = TaskRepository(db)
+
+    def get_workload_matrix(self, group_id: str, start_day: date, end_day: date) -> WorkloadMatrix:
+        """Build the workload of every task in the group over [start_day, end_day]"""
+        self.group_repo.get_group(group_id)
+        tasks = self.task_repo.get_group_task_frame(group_id, start_day, end_day)
+        # Each distinct weekdays value is decoded once, not once per task
+        codes, distinct_weekdays = pd.factorize(tasks["weekdays"])
+        return WorkloadMatrix(
+            start_day,
+            end_day,
+            tasks["id"].tolist(),
+            tasks["start_date"].to_numpy(dtype="datetime64[D]"),
+            tasks["end_date"].to_numpy(dtype="datetime64[D]"),
+            tasks["estimated_effort"].to_numpy(dtype=float),
+            weekday_masks(json.loads(weekdays) for weekdays in distinct_weekdays)[codes]
+        )
+
+    def get_workload(self, group_id: str, start_day: date, end_day: date, peaks: int = 5,
+                     include_matrix: bool = False, max_matrix_cells: int = 1_000_000) -> Dict[str, Any]:
+        """
+        A GroupWorkload-shaped dict; the effort matrix is left as an array, which
+        fast_json writes directly
+        """
+        workload = self.get_workload_matrix(group_id, start_day, end_day)
+        if include_matrix and workload.n_days * len(workload.task_ids) > max_matrix_cells:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"The effort matrix can't have more than {max_matrix_cells} cells, narrow the range"
+            )
+        content = {
+            "group_id": group_id,
+            "start_day": start_day,
+            "end_day": end_day,
+            "total_effort": float(workload.totals.sum()),
+            "days": workload.day_records(),
+            "peak_days": workload.day_records(workload.peak_days(peaks)),
+            "task_ids": None,
+            "effort_matrix": None,
+        }
+        if include_matrix:
+            content["task_ids"] = workload.task_ids
+            content["effort_matrix"] = workload.effort_matrix()
+        return content
+
+    def get_schedule(self, group_id: str, start_day: date, end_day: date, capacity: float) -> Dict[str, Any]:
+        """A GroupSchedule-shaped dict: the group's work leveled to at most capacity per day"""
+        workload = self.get_workload_matrix(group_id, start_day, end_day)
+        schedule = WorkloadLeveler(workload, capacity, Config.SCHEDULE_FLOW_SECONDS).level().schedule()
+        schedule.update(group_id=group_id, start_day=start_day, end_day=end_day, capacity=capacity)
+        return schedule
@@ -1,37 +1,44 @@
 import os
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 import pandas as pd
 
+from assessment_app.config import Config
 from assessment_app.models.models import Trade, TickData, StockInfo
+from assessment_app.service.price_store import PRICE_LOOKUP_SECONDS, PriceBars, get_price_store
 
 
 class MarketService:
     def __init__(self):
-        self.data_dir = "assessment_app/data"
+        self.data_dir = Config.DATA_DIR
 
+    def _load(self, stock_symbol: str) -> Optional[PriceBars]:
+        """Get all bars for a stock from the shared price store, None if there is no data file"""
+        return get_price_store(self.data_dir).get_bars(stock_symbol)
+
+    @PRICE_LOOKUP_SECONDS.time("get_stock_data")
     def get_stock_data(self, stock_symbol: str, timestamp: datetime) -> pd.DataFrame:
-        """Get stock data for a specific timestamp"""
-        file_path = os.path.join(self.data_dir, f"{stock_symbol}.csv")
-        if not os.path.exists(file_path):
-            return pd.DataFrame()
-        
-        df = pd.read_csv(file_path)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df[df['Date'].dt.date == timestamp.date()]
-        return df
+        """Get the bar covering a timestamp"""
+        bars = self._load(stock_symbol)
+        return pd.DataFrame() if bars is None else bars.at(timestamp)
 
+    @PRICE_LOOKUP_SECONDS.time("get_stock_data_range")
     def get_stock_data_range(self, stock_symbol: str, start_ts: datetime, end_ts: datetime) -> pd.DataFrame:
-        """Get stock data for a date range"""
-        file_path = os.path.join(self.data_dir, f"{stock_symbol}.csv")
-        if not os.path.exists(file_path):
-            return pd.DataFrame()
-        
-        df = pd.read_csv(file_path)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df[(df['Date'].dt.date >= start_ts.date()) & (df['Date'].dt.date <= end_ts.date())]
-        return df
+        """Get the bars overlapping a time range"""
+        bars = self._load(stock_symbol)
+        return pd.DataFrame() if bars is None else bars.between(start_ts, end_ts)
+
+    @PRICE_LOOKUP_SECONDS.time("get_close_price_asof")
+    def get_close_price_asof(self, stock_symbol: str, as_of: date) -> Optional[float]:
+        """Get the closing price of the last bar on or before as_of"""
+        bars = self._load(stock_symbol)
+        if bars is None:
+            return None
+        df = bars.last_before(as_of)
+        if df.empty:
+            return None
+        return float(df.iloc[0]['Close'])
 
     def validate_trade(self, trade: Trade) -> bool:
         """Validate if a trade can be executed"""
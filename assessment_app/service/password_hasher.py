@@ -0,0 +1,67 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from assessment_app.config import Config
+from assessment_app.utils.metrics import Histogram
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "Password hashing and verification time, excluding queueing", ["operation"]
+)
+
+
+def build_crypt_context(scheme: str = Config.PASSWORD_SCHEME) -> CryptContext:
+    """
+    Build the password context from Config. Hashes made with another scheme or
+    other cost parameters still verify, but are flagged for a rehash.
+    argon2 requires the optional argon2-cffi package.
+    """
+    if scheme == "argon2":
+        return CryptContext(
+            schemes=["argon2", "bcrypt"],
+            deprecated="auto",
+            argon2__time_cost=Config.ARGON2_TIME_COST,
+            argon2__memory_cost=Config.ARGON2_MEMORY_COST,
+            argon2__parallelism=Config.ARGON2_PARALLELISM,
+            bcrypt__rounds=Config.BCRYPT_ROUNDS,
+        )
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=Config.BCRYPT_ROUNDS)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing on a small dedicated thread pool so the 100ms+ of CPU
+    per bcrypt call never blocks the event loop. The pool size caps how many
+    hashes run at once; further logins queue instead of starving other requests.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = Config.PASSWORD_HASH_WORKERS):
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current scheme and cost"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password. Returns (verified, new_hash); new_hash is set when the
+        stored hash used outdated parameters and should replace it.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._verify, password, hashed_password)
+
+    def _hash(self, password: str) -> str:
+        with PASSWORD_HASH_SECONDS.time("hash"):
+            return self.context.hash(password)
+
+    def _verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        with PASSWORD_HASH_SECONDS.time("verify"):
+            return self.context.verify_and_update(password, hashed_password)
+
+
+pwd_context = build_crypt_context()
+password_hasher = PasswordHasher(pwd_context)
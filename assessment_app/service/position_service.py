@@ -0,0 +1,139 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from assessment_app.models.constants import TradeType
+from assessment_app.models.models import Portfolio, PortfolioHolding, PositionValuation
+from assessment_app.repository.position_snapshot_repository import PositionSnapshotRepository
+from assessment_app.repository.trade_repository import TradeRepository
+from assessment_app.service.market_service import MarketService
+
+Holdings = Dict[str, Dict[str, float]]
+
+
+def start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+class PositionService:
+    """
+    Historical positions and valuations built from end-of-day snapshots.
+    A query for day X reads the latest snapshot on or before X and replays
+    only the trades executed after it, instead of the user's whole history.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.snapshot_repo = PositionSnapshotRepository(db)
+        self.trade_repo = TradeRepository(db)
+        self.market_service = MarketService()
+
+    def get_positions_as_of(self, portfolio: Portfolio, as_of: date) -> Optional[Tuple[float, Holdings]]:
+        """Get (cash_balance, holdings) at the end of as_of, or None if the portfolio did not exist yet"""
+        snapshot = self.snapshot_repo.get_latest_snapshot(portfolio.id, as_of)
+        if snapshot is None:
+            return None
+
+        cash_balance = snapshot.cash_balance
+        holdings = {symbol: dict(position) for symbol, position in snapshot.holdings.items()}
+        if snapshot.snapshot_date < as_of:
+            trades = self.trade_repo.get_user_trades_between(
+                portfolio.user_id,
+                start_of_day(snapshot.snapshot_date + timedelta(days=1)),
+                start_of_day(as_of + timedelta(days=1))
+            )
+            for trade in trades:
+                cash_balance = self._apply_trade(cash_balance, holdings, trade)
+        return cash_balance, holdings
+
+    def get_valuation(self, portfolio: Portfolio, as_of: date) -> Optional[PositionValuation]:
+        """Value a portfolio's end-of-day position at closing prices"""
+        positions = self.get_positions_as_of(portfolio, as_of)
+        if positions is None:
+            return None
+
+        cash_balance, holdings = positions
+        valued_holdings = [
+            PortfolioHolding(
+                stock_symbol=symbol,
+                quantity=position["quantity"],
+                average_price=position["average_price"],
+                current_value=position["quantity"] * self._close_price(symbol, as_of, position["average_price"])
+            )
+            for symbol, position in holdings.items()
+        ]
+        holdings_value = sum(h.current_value for h in valued_holdings)
+        return PositionValuation(
+            portfolio_id=portfolio.id,
+            as_of=as_of,
+            cash_balance=cash_balance,
+            holdings_value=holdings_value,
+            net_worth=cash_balance + holdings_value,
+            holdings=valued_holdings
+        )
+
+    def get_net_worth(self, portfolio: Portfolio, as_of: date) -> Optional[float]:
+        """Get net worth at the end of as_of, using the rolled-up value when the snapshot has one"""
+        snapshot = self.snapshot_repo.get_snapshot(portfolio.id, as_of)
+        if snapshot is not None and snapshot.net_worth is not None:
+            return snapshot.net_worth
+
+        valuation = self.get_valuation(portfolio, as_of)
+        return valuation.net_worth if valuation else None
+
+    def get_profit_loss(self, portfolio: Portfolio, start: date, end: date) -> Optional[Dict[str, float]]:
+        """Get the change in net worth between the end of start and the end of end"""
+        start_net_worth = self.get_net_worth(portfolio, start)
+        end_net_worth = self.get_net_worth(portfolio, end)
+        if start_net_worth is None or end_net_worth is None:
+            return None
+
+        profit_loss = end_net_worth - start_net_worth
+        return {
+            "start_net_worth": start_net_worth,
+            "end_net_worth": end_net_worth,
+            "profit_loss": profit_loss,
+            "profit_loss_percentage": (profit_loss / start_net_worth * 100) if start_net_worth > 0 else 0.0
+        }
+
+    def value_snapshots(self, batch_size: int = 1000) -> int:
+        """Fill in the closing net worth of every snapshot that does not have one yet"""
+        valued = 0
+        while True:
+            snapshots = self.snapshot_repo.get_unvalued_snapshots(batch_size)
+            if not snapshots:
+                return valued
+            for snapshot in snapshots:
+                snapshot.net_worth = snapshot.cash_balance + sum(
+                    position["quantity"] * self._close_price(symbol, snapshot.snapshot_date, position["average_price"])
+                    for symbol, position in snapshot.holdings.items()
+                )
+            self.db.flush()
+            valued += len(snapshots)
+
+    def compact_snapshots(self, before: date) -> int:
+        """Thin snapshots older than `before` to each portfolio's first one and the last one of each month"""
+        return self.snapshot_repo.delete_superseded_snapshots(before)
+
+    def _close_price(self, stock_symbol: str, as_of: date, fallback: float) -> float:
+        # Without market data for the day the position is carried at cost
+        price = self.market_service.get_close_price_asof(stock_symbol, as_of)
+        return fallback if price is None else price
+
+    @staticmethod
+    def _apply_trade(cash_balance: float, holdings: Holdings, trade) -> float:
+        trade_value = trade.price * trade.quantity
+        position = holdings.setdefault(trade.stock_symbol, {"quantity": 0, "average_price": 0.0})
+        if trade.trade_type == TradeType.BUY:
+            total_quantity = position["quantity"] + trade.quantity
+            position["average_price"] = (
+                position["quantity"] * position["average_price"] + trade_value
+            ) / total_quantity
+            position["quantity"] = total_quantity
+            return cash_balance - trade_value
+
+        position["quantity"] -= trade.quantity
+        if position["quantity"] <= 0:
+            del holdings[trade.stock_symbol]
+        return cash_balance + trade_value
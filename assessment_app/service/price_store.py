@@ -0,0 +1,184 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from assessment_app.config import Config
+from assessment_app.utils.metrics import CACHE_REQUESTS, Histogram
+from assessment_app.utils.tracing import span
+
+PRICE_LOOKUP_SECONDS = Histogram("price_lookup_duration_seconds", "Market-data lookup latency", ["operation"])
+
+NANOS_PER_DAY = 86_400 * 10 ** 9
+_INTERVAL_UNITS = {"s": 10 ** 9, "m": 60 * 10 ** 9, "h": 3_600 * 10 ** 9, "d": NANOS_PER_DAY}
+_INTERVAL_PATTERN = re.compile(r"(\d+)([smhd])")
+
+
+def to_nanos(ts) -> int:
+    """A datetime or date as naive nanoseconds since the epoch; aware datetimes keep their wall-clock time"""
+    if isinstance(ts, datetime):
+        ts = ts.replace(tzinfo=None)
+    return pd.Timestamp(ts).value
+
+
+def parse_interval(interval: str) -> int:
+    """A bar size such as `1m`, `5m`, `1h` or `1d` in nanoseconds"""
+    match = _INTERVAL_PATTERN.fullmatch(interval)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid interval {interval!r}; use a count and one of s, m, h, d, e.g. 5m")
+    return int(match.group(1)) * _INTERVAL_UNITS[match.group(2)]
+
+
+def bar_starts(df: pd.DataFrame) -> np.ndarray:
+    return df["Date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def resample_bars(df: pd.DataFrame, interval: int) -> pd.DataFrame:
+    """
+    Aggregate time-sorted bars into bars of `interval` nanoseconds, aligned to multiples of it
+    since the epoch (so `1d` bars start at midnight): first open, highest high, lowest low,
+    last close and summed volume of each bucket
+    """
+    if df.empty:
+        return df
+    starts = bar_starts(df)
+    buckets = starts - starts % interval
+    firsts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lasts = np.r_[firsts[1:], len(starts)] - 1
+    resampled = {
+        "Date": buckets[firsts].view("datetime64[ns]"),
+        "Open": df["Open"].to_numpy()[firsts],
+        "High": np.maximum.reduceat(df["High"].to_numpy(), firsts),
+        "Low": np.minimum.reduceat(df["Low"].to_numpy(), firsts),
+        "Close": df["Close"].to_numpy()[lasts],
+    }
+    if "Adj Close" in df:
+        resampled["Adj Close"] = df["Adj Close"].to_numpy()[lasts]
+    resampled["Volume"] = np.add.reduceat(df["Volume"].to_numpy(dtype=np.int64), firsts)
+    return pd.DataFrame(resampled)
+
+
+class PriceBars:
+    """
+    A symbol's bars sorted by start time, with the starts as int64 nanoseconds for binary search.
+    Each bar covers `interval` nanoseconds from its start: the smallest gap between two bars,
+    so a day for daily files and a minute or second for intraday ones.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        if not frame["Date"].is_monotonic_increasing:
+            frame = frame.sort_values("Date", kind="stable", ignore_index=True)
+        self.frame = frame
+        self.starts = bar_starts(frame)
+        gaps = np.diff(self.starts)
+        gaps = gaps[gaps > 0]
+        self.interval = int(gaps.min()) if gaps.size else NANOS_PER_DAY
+
+    def at(self, ts) -> pd.DataFrame:
+        """The bar covering ts as a one-row frame, empty if ts falls in no bar"""
+        nanos = to_nanos(ts)
+        i = int(np.searchsorted(self.starts, nanos, side="right")) - 1
+        if i < 0 or nanos >= self.starts[i] + self.interval:
+            return self.frame.iloc[0:0]
+        return self.frame.iloc[i:i + 1]
+
+    def bounds(self, from_ts, to_ts) -> Tuple[int, int]:
+        """Row positions [first, last) of the bars overlapping [from_ts, to_ts]"""
+        first = np.searchsorted(self.starts, to_nanos(from_ts) - self.interval, side="right")
+        last = np.searchsorted(self.starts, to_nanos(to_ts), side="right")
+        return int(first), int(last)
+
+    def between(self, from_ts, to_ts) -> pd.DataFrame:
+        """The bars overlapping [from_ts, to_ts]"""
+        first, last = self.bounds(from_ts, to_ts)
+        return self.frame.iloc[first:last]
+
+    def last_before(self, day: date) -> pd.DataFrame:
+        """The last bar starting on or before day as a one-row frame, empty if there is none"""
+        i = int(np.searchsorted(self.starts, to_nanos(day) + NANOS_PER_DAY, side="left"))
+        return self.frame.iloc[max(i - 1, 0):i]
+
+
+class PriceStore:
+    """
+    Daily or intraday bars per stock symbol, parsed from `<data_dir>/<SYMBOL>.csv` once and kept
+    in memory with nanosecond timestamps. Every lookup re-stats the file and reloads it only when
+    it changed on disk. Returned frames are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, data_dir: str = Config.DATA_DIR):
+        self.data_dir = data_dir
+        self._frames: Dict[str, Tuple[Tuple[int, int], PriceBars]] = {}
+        self._lock = Lock()
+        self._reload_listeners: List[Callable[[str], None]] = []
+
+    def add_reload_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(stock_symbol) whenever a loaded symbol's file changes or disappears"""
+        self._reload_listeners.append(listener)
+
+    def path_for(self, stock_symbol: str) -> str:
+        return os.path.join(self.data_dir, f"{stock_symbol}.csv")
+
+    @PRICE_LOOKUP_SECONDS.time("get_frame")
+    def get_frame(self, stock_symbol: str) -> Optional[pd.DataFrame]:
+        """Get all bars of a symbol with a parsed `Date` column, or None if there is no data file"""
+        bars = self.get_bars(stock_symbol)
+        return None if bars is None else bars.frame
+
+    def get_bars(self, stock_symbol: str) -> Optional[PriceBars]:
+        """Get all bars of a symbol indexed by start time, or None if there is no data file"""
+        with span("price_store.get_frame", {"stock_symbol": stock_symbol}) as current:
+            try:
+                stat = os.stat(self.path_for(stock_symbol))
+            except FileNotFoundError:
+                if self._frames.pop(stock_symbol, None) is not None:
+                    self._notify_reload(stock_symbol)
+                return None
+
+            version = (stat.st_mtime_ns, stat.st_size)
+            cached = self._frames.get(stock_symbol)
+            if cached is not None and cached[0] == version:
+                CACHE_REQUESTS.inc("price_store", "hit")
+                current.set_attribute("cache.hit", True)
+                return cached[1]
+
+            CACHE_REQUESTS.inc("price_store", "miss")
+            current.set_attribute("cache.hit", False)
+            # The CSV read is what makes a miss slow
+            with span("price_store.read_csv"):
+                df = pd.read_csv(self.path_for(stock_symbol))
+                df['Date'] = pd.to_datetime(df['Date']).astype("datetime64[ns]")
+            bars = PriceBars(df)
+            with self._lock:
+                self._frames[stock_symbol] = (version, bars)
+            if cached is not None:
+                self._notify_reload(stock_symbol)
+            return bars
+
+    def _notify_reload(self, stock_symbol: str) -> None:
+        for listener in self._reload_listeners:
+            listener(stock_symbol)
+
+    def warmup(self, stock_symbols: Iterable[str], max_workers: Optional[int] = None) -> int:
+        """Load several symbols in parallel; returns how many had data"""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(self.get_frame, stock_symbols))
+        return sum(frame is not None for frame in frames)
+
+
+_stores: Dict[str, PriceStore] = {}
+_stores_lock = Lock()
+
+
+def get_price_store(data_dir: str = Config.DATA_DIR) -> PriceStore:
+    """Get the process-wide store for a data directory"""
+    store = _stores.get(data_dir)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(data_dir, PriceStore(data_dir))
+    return store
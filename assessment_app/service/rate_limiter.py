@@ -0,0 +1,159 @@
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from assessment_app.config import Config
+from assessment_app.repository.database import get_engine
+from assessment_app.repository.rate_limit_repository import RateLimitRepository
+
+RateLimit = namedtuple("RateLimit", ["requests", "period_seconds"])
+
+
+def parse_rate_limit(spec: str) -> RateLimit:
+    """Parse "<requests>/<seconds>", e.g. "30/60" """
+    requests, period_seconds = spec.split("/")
+    return RateLimit(int(requests), float(period_seconds))
+
+
+def parse_rate_limit_rules(spec: str) -> Dict[str, RateLimit]:
+    """Parse "POST /market/trade=30/60;POST /backtest=5/60" into {route: limit}"""
+    rules = {}
+    for rule in filter(None, (part.strip() for part in spec.split(";"))):
+        route, limit = rule.rsplit("=", 1)
+        rules[route.strip()] = parse_rate_limit(limit)
+    return rules
+
+
+class TokenBucketStore:
+    """
+    Per-process token buckets, one per key, kept in a bounded LRU.
+    A bucket holds up to `requests` tokens and refills continuously at
+    requests / period_seconds, so short bursts are allowed but the sustained
+    rate is capped. Evicting an idle bucket only forgets an already-refilled one.
+    """
+
+    def __init__(self, max_buckets: int = Config.RATE_LIMIT_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, limit: RateLimit, now: float) -> float:
+        """Take one token; returns 0 when allowed, else the seconds until a token is available"""
+        rate = limit.requests / limit.period_seconds
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(limit.requests), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(float(limit.requests), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / rate
+
+
+class DatabaseWindowStore:
+    """
+    Sliding-window limits shared by every worker through the rate_limit_windows table.
+    The count over the last period is approximated from two fixed windows:
+    previous_count weighted by how much of it still overlaps, plus current_count.
+    """
+
+    def __init__(self, engine: Engine, max_period_seconds: float, purge_interval_seconds: float = 60):
+        self.engine = engine
+        self.max_period_seconds = max_period_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._last_purge = 0.0
+
+    def acquire(self, key: str, limit: RateLimit, now: float) -> float:
+        period = limit.period_seconds
+        window_start = int(now // period * period)
+        elapsed = now - window_start
+        with Session(self.engine) as db:
+            rate_limit_repo = RateLimitRepository(db)
+            # Incrementing first keeps concurrent workers from both taking the last slot
+            current_count = rate_limit_repo.increment(key, window_start)
+            previous_count = rate_limit_repo.get_count(key, int(window_start - period))
+            allowed = previous_count * (period - elapsed) / period + current_count <= limit.requests
+            if not allowed:
+                # Rejected requests do not count, so a client backing off is let back in on time
+                rate_limit_repo.decrement(key, window_start)
+            if now - self._last_purge >= self.purge_interval_seconds:
+                # Windows older than the previous one of the longest period are dead weight
+                self._last_purge = now
+                rate_limit_repo.delete_windows_before(int(now - 2 * self.max_period_seconds))
+            db.commit()
+
+        if allowed:
+            return 0.0
+        if current_count > limit.requests or previous_count == 0:
+            return period - elapsed
+        # Wait until enough of the previous window has slid out of the period
+        return max(0.0, period - elapsed - (limit.requests - current_count) * period / previous_count)
+
+
+class RateLimiter:
+    """Limits each user per route: a route-specific rule when one exists, else the default"""
+
+    def __init__(self, store, default_limit: RateLimit, rules: Dict[str, RateLimit],
+                 clock: Callable[[], float] = time.time):
+        self.store = store
+        self.default_limit = default_limit
+        self.rules = rules
+        self._clock = clock
+
+    def check(self, user_id: str, route_key: str) -> Optional[float]:
+        """Count one request; returns None when allowed, else the Retry-After seconds"""
+        limit = self.rules.get(route_key, self.default_limit)
+        retry_after = self.store.acquire(f"{user_id}:{route_key}", limit, self._clock())
+        return retry_after if retry_after > 0 else None
+
+
+def route_key(request: Request) -> str:
+    """Rate-limit routes by their template, so /portfolio/{portfolio_id} is one route"""
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    return f"{request.method} {path}"
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide limiter configured from Config"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        default_limit = parse_rate_limit(Config.RATE_LIMIT_DEFAULT)
+        rules = parse_rate_limit_rules(Config.RATE_LIMIT_RULES)
+        if Config.RATE_LIMIT_STORE == "database":
+            max_period_seconds = max(limit.period_seconds for limit in [default_limit, *rules.values()])
+            store = DatabaseWindowStore(get_engine(), max_period_seconds)
+        else:
+            store = TokenBucketStore()
+        _rate_limiter = RateLimiter(store, default_limit, rules)
+    return _rate_limiter
+
+
+def enforce_rate_limit(request: Request, user_id: str) -> None:
+    """Raise 429 with Retry-After when the user has exceeded the limit for this route"""
+    if not Config.RATE_LIMIT_ENABLED:
+        return
+    retry_after = get_rate_limiter().check(user_id, route_key(request))
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from assessment_app.config import Config
+from assessment_app.service.price_store import get_price_store
+from assessment_app.utils.fast_json import dumps
+from assessment_app.utils.metrics import CACHE_REQUESTS
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "immutable"])
+
+
+def serialize_json(content: Any) -> bytes:
+    """Serialize to the same JSON FastAPI's JSONResponse would produce, via orjson"""
+    return dumps(content)
+
+
+class ResponseCache:
+    """
+    Serialized JSON responses for market-data queries, keyed by (route, symbol, normalized params).
+    Entries are evicted least-recently-used once their bodies exceed max_bytes in total, and
+    dropped per symbol when the price store reloads that symbol's data.
+    """
+
+    def __init__(self, max_bytes: int = Config.RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[Tuple[Hashable, ...], CachedResponse]" = OrderedDict()
+        self._keys_by_symbol: Dict[str, Set[Tuple[Hashable, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple[Hashable, ...], stock_symbol: str, entry: CachedResponse) -> None:
+        # A body that alone exceeds the budget would only flush everything else
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._keys_by_symbol.setdefault(stock_symbol, set()).add(key)
+            self.size_bytes += len(entry.body)
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_symbol(self, stock_symbol: str) -> None:
+        with self._lock:
+            for key in list(self._keys_by_symbol.get(stock_symbol, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_symbol.clear()
+            self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Tuple[Hashable, ...]) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= len(entry.body)
+        # Keys are (route, stock_symbol, *params)
+        keys = self._keys_by_symbol.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_symbol[key[1]]
+
+
+response_cache = ResponseCache()
+get_price_store().add_reload_listener(response_cache.invalidate_symbol)
+
+
+def cached_json_response(request: Request, route: str, stock_symbol: str, params: Tuple[Hashable, ...],
+                         build: Callable[[], Tuple[Any, bool]], public: bool = True) -> Response:
+    """
+    Serve a market-data response from response_cache, building it on a miss.
+    build() returns (content, immutable); immutable means the answer can never change,
+    i.e. it does not depend on bars after the last one currently in the data file.
+    Responses carry a strong ETag, and If-None-Match is answered with 304.
+    """
+    # Re-stats the data file; a changed file is reloaded, which invalidates the symbol's entries
+    get_price_store().get_frame(stock_symbol)
+
+    key = (route, stock_symbol, *params)
+    entry = response_cache.get(key)
+    CACHE_REQUESTS.inc("response", "miss" if entry is None else "hit")
+    if entry is None:
+        content, immutable = build()
+        body = serialize_json(content)
+        entry = CachedResponse(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', immutable)
+        response_cache.put(key, stock_symbol, entry)
+
+    scope = "public" if public else "private"
+    if entry.immutable:
+        cache_control = f"{scope}, max-age={Config.RESPONSE_CACHE_MAX_AGE}, immutable"
+    else:
+        cache_control = f"{scope}, no-cache"
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+
+    if entry.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
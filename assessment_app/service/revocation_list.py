@@ -0,0 +1,132 @@
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from assessment_app.config import Config
+from assessment_app.repository.revoked_token_repository import RevokedTokenRepository
+from assessment_app.service.token_cache import VerifiedToken
+from assessment_app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+
+def token_key(jti: str) -> str:
+    return f"jti:{jti}"
+
+
+def to_epoch(value: datetime) -> float:
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+class RevocationList:
+    """
+    In-memory view of the revoked_tokens table: a Bloom filter over revoked jtis,
+    and the latest revoke-all time of each user with an unexpired one. The user
+    check never touches the database, and a token whose jti is absent from the
+    filter is accepted without a query; only filter hits are confirmed with one.
+    Each worker rebuilds both from the table every refresh_seconds, which
+    bounds how long a revocation made by another worker takes to apply.
+    """
+
+    def __init__(self, capacity: int = Config.REVOCATION_BLOOM_CAPACITY,
+                 error_rate: float = Config.REVOCATION_BLOOM_ERROR_RATE,
+                 refresh_seconds: float = Config.REVOCATION_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self._clock = clock
+        self._filter = BloomFilter(capacity, error_rate)
+        # user_id -> epoch of the latest revoke-all; rows are few, one per logout/all
+        self._user_revoked_at: Dict[str, float] = {}
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        # Revocations made locally while a rebuild is reading the table
+        self._pending: Set[str] = set()
+        self._pending_users: Dict[str, float] = {}
+
+    def is_revoked(self, db: Session, token: VerifiedToken) -> bool:
+        """Check a verified token against the revocation list"""
+        self.refresh_if_stale(db)
+        revoked_at = self._user_revoked_at.get(token.user_id)
+        # Tokens without iat predate revocation support and count as issued before it
+        if revoked_at is not None and (token.issued_at or 0) <= revoked_at:
+            return True
+        if token.jti is None or token_key(token.jti) not in self._filter:
+            return False
+        return RevokedTokenRepository(db).is_token_revoked(token.jti)
+
+    def revoke_token(self, db: Session, jti: str, user_id: str) -> None:
+        RevokedTokenRepository(db).revoke_token(jti, user_id, self._revocation_expiry())
+        self._add(token_key(jti))
+
+    def revoke_user(self, db: Session, user_id: str) -> None:
+        revoked_at = to_epoch(RevokedTokenRepository(db).revoke_user_tokens(user_id, self._revocation_expiry()))
+        with self._lock:
+            self._set_user_revoked_at(self._user_revoked_at, user_id, revoked_at)
+            if self._rebuilding:
+                self._set_user_revoked_at(self._pending_users, user_id, revoked_at)
+
+    def refresh_if_stale(self, db: Session) -> None:
+        refreshed_at = self._refreshed_at
+        if refreshed_at is not None and self._clock() - refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            # Only one request rebuilds; the others keep using the current filter
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+            self._pending = set()
+            self._pending_users = {}
+        try:
+            self.refresh(db)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def refresh(self, db: Session) -> None:
+        """Rebuild the filter and the users' revoke-all times from every unexpired revocation"""
+        revocations = RevokedTokenRepository(db).get_active_revocations(datetime.utcnow())
+        keys = []
+        user_revoked_at: Dict[str, float] = {}
+        for jti, user_id, revoked_at in revocations:
+            if jti is not None:
+                keys.append(token_key(jti))
+            else:
+                self._set_user_revoked_at(user_revoked_at, user_id, to_epoch(revoked_at))
+        bloom = BloomFilter(max(self.capacity, 2 * len(keys)), self.error_rate, keys)
+        with self._lock:
+            for key in self._pending:
+                bloom.add(key)
+            for user_id, revoked_at in self._pending_users.items():
+                self._set_user_revoked_at(user_revoked_at, user_id, revoked_at)
+            self._pending = set()
+            self._pending_users = {}
+            self._filter = bloom
+            self._user_revoked_at = user_revoked_at
+            self._refreshed_at = self._clock()
+        logger.debug(f"Rebuilt token revocation filter with {len(keys)} tokens and {len(user_revoked_at)} users")
+
+    @staticmethod
+    def _set_user_revoked_at(revoked_at_by_user: Dict[str, float], user_id: str, revoked_at: float) -> None:
+        revoked_at_by_user[user_id] = max(revoked_at, revoked_at_by_user.get(user_id, revoked_at))
+
+    @staticmethod
+    def _revocation_expiry() -> datetime:
+        # No token issued up to now outlives this, so the row can be dropped afterwards
+        return datetime.utcnow() + timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    def _add(self, key: str) -> None:
+        with self._lock:
+            self._filter.add(key)
+            if self._rebuilding:
+                self._pending.add(key)
+
+
+revocation_list = RevocationList()
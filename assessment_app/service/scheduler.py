@@ -0,0 +1,341 @@
+import heapq
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from assessment_app.service.group_service import WorkloadMatrix
+
+EPSILON = 1e-9
+
+
+class WorkloadLeveler:
+    """
+    Moves work between days so that no day's effort exceeds capacity. Each task's
+    work starts spread evenly over its scheduled days (as in tasks_for_day) and may
+    only move to other days of its own window and weekdays inside the workload's range.
+
+    A greedy pass takes overloaded days from a priority queue, biggest excess first,
+    and moves each excess straight to the nearest day with spare capacity that one of
+    the day's tasks may use. Whatever is left is handled as a min-cost flow on the
+    days: excess is pushed along augmenting paths with the fewest moves, where a task
+    can make room on a day by moving its own work on to another one. With a time_limit
+    (seconds for the whole leveling) that pass may stop early: the schedule is then
+    marked incomplete and any excess left is unresolved, but not proven infeasible.
+    """
+
+    def __init__(self, workload: "WorkloadMatrix", capacity: float, time_limit: Optional[float] = None):
+        self.workload = workload
+        self.capacity = capacity
+        self.time_limit = time_limit
+        self.loads = workload.totals.copy()
+        # Every move as (tasks, source, target, amounts), netted into moves at the end
+        self._moved: List[Tuple[np.ndarray, int, int, np.ndarray]] = []
+        # Per day, built on first use: the tasks scheduled that day and how much of their work is on it
+        self._work: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # Plain lists, so the greedy pass's per-task lookups stay out of numpy
+        self._first = workload.first.tolist()
+        self._last = workload.last.tolist()
+        self._weekdays = [[day for day, runs in enumerate(row) if runs] for row in workload.masks.tolist()]
+        # Days below capacity, kept sorted per weekday so a task's nearest one is a bisect away
+        self.spare: List[List[int]] = [[] for _ in range(workload.masks.shape[1])]
+        for day in np.flatnonzero(self.loads < capacity - EPSILON).tolist():
+            self.spare[workload.day_weekdays[day]].append(day)
+        # Built for the min-cost-flow pass: [day, other] is how much of day's work could move to other,
+        # kept up to date from the tasks' _week_bins
+        self._capacities: Optional[np.ndarray] = None
+        self._bins: Optional[np.ndarray] = None
+        self._grid_cells = 0
+        self.method = "none"
+        # False when the time limit stopped the min-cost-flow pass with excess still left
+        self.complete = True
+
+    def level(self) -> "WorkloadLeveler":
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        if self._overloaded().size:
+            self.method = "greedy"
+            self._greedy()
+        if self._overloaded().size and any(self.spare):
+            self.method = "min_cost_flow"
+            self._bins, self._grid_cells = self._week_bins()
+            self._capacities = np.array([self._capacity_row(day) for day in range(self.workload.n_days)])
+            while self._augment(deadline):
+                pass
+        return self
+
+    def _overloaded(self) -> np.ndarray:
+        return np.flatnonzero(self.loads > self.capacity + EPSILON)
+
+    def _day_work(self, day: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The tasks scheduled on day, sorted, and their work on it; _move updates the amounts in place"""
+        work = self._work.get(day)
+        if work is None:
+            w = self.workload
+            tasks = np.flatnonzero((w.first <= day) & (w.last >= day) & w.masks[:, w.day_weekdays[day]])
+            work = self._work[day] = tasks, w.daily_effort[tasks]
+        return work
+
+    def _tasks_on(self, day: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Tasks with work on day, and how much"""
+        tasks, amounts = self._day_work(day)
+        has_work = amounts > EPSILON
+        return tasks[has_work], amounts[has_work]
+
+    def _allowed(self, tasks: np.ndarray, day: int) -> np.ndarray:
+        w = self.workload
+        return (w.first[tasks] <= day) & (w.last[tasks] >= day) & w.masks[tasks, w.day_weekdays[day]]
+
+    def _week_bins(self) -> Tuple[np.ndarray, int]:
+        """
+        Days as a flattened (weeks x 7) grid, day = 7 * week + offset: a task's work covers a run of
+        weeks in each offset column on one of its weekdays. [task, 0, offset] is the first cell of that
+        run and [task, 1, offset] the one after its last; both point past the grid where there is no run.
+        Returns them and the number of cells in the grid.
+        """
+        w = self.workload
+        n_weekdays = w.masks.shape[1]
+        weeks = -(-w.n_days // n_weekdays) + 1
+        offsets = np.arange(n_weekdays)
+        first_week = (w.first[:, None] - offsets + n_weekdays - 1) // n_weekdays
+        last_week = (w.last[:, None] - offsets) // n_weekdays
+        runs = w.masks[:, (w.day_weekdays[0] + offsets) % n_weekdays] & (first_week <= last_week)
+        outside = weeks * n_weekdays
+        bins = np.stack([
+            np.where(runs, first_week * n_weekdays + offsets, outside),
+            np.where(runs, (last_week + 1) * n_weekdays + offsets, outside),
+        ], axis=1)
+        return bins, outside
+
+    def _reach(self, tasks: np.ndarray, amounts: np.ndarray) -> np.ndarray:
+        """How much of the tasks' work (amounts) could go on each day: one weighted sweep down the grid columns"""
+        bins = self._bins[tasks]
+        # +amount where each of a task's runs starts, -amount after it ends
+        weights = np.empty(bins.shape)
+        weights[:, 0] = amounts[:, None]
+        weights[:, 1] = -amounts[:, None]
+        coverage = np.bincount(bins.ravel(), weights=weights.ravel(), minlength=self._grid_cells + 1)
+        return np.cumsum(coverage[:-1].reshape(-1, bins.shape[2]), axis=0).ravel()[:self.workload.n_days]
+
+    def _nearest_spare(self, task: int, day: int) -> Optional[int]:
+        first, last = self._first[task], self._last[task]
+        best, distance = None, self.workload.n_days
+        for weekday in self._weekdays[task]:
+            days = self.spare[weekday]
+            # day itself is over capacity, so the nearest candidates are the ones either side of it
+            index = bisect_left(days, day)
+            if index and days[index - 1] >= first and day - days[index - 1] < distance:
+                best = days[index - 1]
+                distance = day - best
+            if index < len(days) and days[index] <= last and days[index] - day < distance:
+                best = days[index]
+                distance = best - day
+        return best
+
+    @property
+    def moves(self) -> Dict[Tuple[int, int, int], float]:
+        """How much work each (task, source, target) moved, after work moved back where it came from cancels out"""
+        if not self._moved:
+            return {}
+        n_days = self.workload.n_days
+        tasks = np.concatenate([tasks for tasks, *_ in self._moved])
+        sources = np.concatenate([np.full(len(tasks), source) for tasks, source, *_ in self._moved])
+        targets = np.concatenate([np.full(len(tasks), target) for tasks, _, target, _ in self._moved])
+        amounts = np.concatenate([amounts for *_, amounts in self._moved])
+        # Net each task's work moved between each pair of days, counted from the earlier day to the later
+        earlier, later = np.minimum(sources, targets), np.maximum(sources, targets)
+        keys, inverse = np.unique((tasks * n_days + earlier) * n_days + later, return_inverse=True)
+        net = np.bincount(inverse, weights=np.where(sources == earlier, amounts, -amounts))
+        tasks, days = np.divmod(keys, n_days * n_days)
+        earlier, later = np.divmod(days, n_days)
+        return {
+            (task, first, second) if amount > 0 else (task, second, first): abs(amount)
+            for task, first, second, amount in zip(tasks.tolist(), earlier.tolist(), later.tolist(), net.tolist())
+            if amount != 0
+        }
+
+    def _move(self, tasks: np.ndarray, amounts: np.ndarray, source: int, target: int) -> None:
+        """Move amounts of the tasks' work from source to target"""
+        self._move_work(tasks, amounts, source, target)
+        self._move_load(float(amounts.sum()), source, target)
+
+    def _move_work(self, tasks: np.ndarray, amounts: np.ndarray, source: int, target: int) -> None:
+        """The per-task side of a move: each task's work on both days, the move log and the capacities"""
+        # Work only moves between days the tasks are scheduled on, so each one is in both days' tasks
+        source_tasks, source_amounts = self._day_work(source)
+        source_amounts[source_tasks.searchsorted(tasks)] -= amounts
+        target_tasks, target_amounts = self._day_work(target)
+        target_amounts[target_tasks.searchsorted(tasks)] += amounts
+        self._moved.append((tasks, source, target, amounts))
+        if self._capacities is not None:
+            # The moved work can go on to the same days as before, but from target instead of source
+            reach = self._reach(tasks, amounts)
+            self._capacities[source] -= reach
+            self._capacities[target] += reach
+            self._capacities[source, source] = self._capacities[target, target] = 0.0
+
+    def _move_load(self, total: float, source: int, target: int) -> None:
+        """The per-day side of a move: both days' loads, and whether target still has room"""
+        self.loads[source] -= total
+        self.loads[target] += total
+        if self.loads[target] >= self.capacity - EPSILON:
+            days = self.spare[self.workload.day_weekdays[target]]
+            index = bisect_left(days, target)
+            if index < len(days) and days[index] == target:
+                days.pop(index)
+
+    def _greedy(self) -> None:
+        w = self.workload
+        # Moving work only fills days that have room, so each overloaded day is visited once
+        queue = [(self.capacity - self.loads[day], day) for day in self._overloaded().tolist()]
+        heapq.heapify(queue)
+        # Days with room only fill up here, so a task with none left in its window never gets one
+        stuck = set()
+        while queue:
+            _, day = heapq.heappop(queue)
+            excess = self.loads[day] - self.capacity
+            tasks, amounts = self._tasks_on(day)
+            # Tasks with the widest windows have the most room to move into
+            order = np.argsort(w.first[tasks] - w.last[tasks], kind="stable")
+            # The day's work is moved to each target at once when the day is done. A task goes to a target
+            # only once: each move takes all of its work, all of the excess, or all of the target's room.
+            batches: Dict[int, Tuple[List[int], List[float]]] = defaultdict(lambda: ([], []))
+            for task, amount in zip(tasks[order].tolist(), amounts[order].tolist()):
+                while excess > EPSILON and amount > EPSILON and task not in stuck:
+                    target = self._nearest_spare(task, day)
+                    if target is None:
+                        stuck.add(task)
+                        break
+                    moved = min(amount, excess, self.capacity - self.loads[target])
+                    self._move_load(moved, day, target)
+                    batches[target][0].append(task)
+                    batches[target][1].append(moved)
+                    excess -= moved
+                    amount -= moved
+                if excess <= EPSILON:
+                    break
+            for target, (moved_tasks, moved_amounts) in batches.items():
+                self._move_work(np.array(moved_tasks), np.array(moved_amounts), day, target)
+
+    def _capacity_row(self, day: int) -> np.ndarray:
+        """How much of the work on day could move to each day"""
+        row = self._reach(*self._tasks_on(day))
+        row[day] = 0.0
+        return row
+
+    def _levels(self) -> Tuple[np.ndarray, int]:
+        """
+        Breadth-first search, one level at a time, from the overloaded days to the nearest days
+        with room. Returns each day's level (-1 if not reached) and the level of those days,
+        or -1 when no day with room can be reached.
+        """
+        n_days = self.workload.n_days
+        frontier = self._overloaded()
+        level = np.full(n_days, -1)
+        level[frontier] = 0
+        depth = 0
+        while frontier.size:
+            depth += 1
+            reached = np.flatnonzero((self._capacities[frontier] > EPSILON).any(axis=0) & (level < 0))
+            level[reached] = depth
+            if (self.loads[reached] < self.capacity - EPSILON).any():
+                return level, depth
+            frontier = reached
+        return level, -1
+
+    def _level_path(self, source: int, level: np.ndarray, depth: int, dead: np.ndarray) -> Optional[List[int]]:
+        """A path one level at a time from source to a day with room, over the widest edges"""
+        path = [source]
+        while path:
+            day = path[-1]
+            if len(path) - 1 == depth:
+                if self.loads[day] < self.capacity - EPSILON:
+                    return path
+                found = None
+            else:
+                widths = np.where((level == len(path)) & ~dead, self._capacities[day], 0.0)
+                found = int(widths.argmax())
+                if widths[found] <= EPSILON:
+                    found = None
+            if found is None:
+                dead[day] = True
+                path.pop()
+            else:
+                path.append(found)
+        return None
+
+    def _push(self, path: List[int]) -> None:
+        amount = min(self.loads[path[0]] - self.capacity, self.capacity - self.loads[path[-1]])
+        hops = []
+        for source, target in zip(path, path[1:]):
+            tasks, amounts = self._tasks_on(source)
+            allowed = self._allowed(tasks, target)
+            hops.append((source, target, tasks[allowed], amounts[allowed]))
+            available = amounts[allowed].sum()
+            if available <= EPSILON:
+                # Rounding left a trace of capacity that no task actually has
+                self._capacities[source, target] = 0.0
+                return
+            amount = min(amount, available)
+        for source, target, tasks, amounts in hops:
+            # The first tasks' work, up to amount in all
+            moved = np.clip(amount - (np.cumsum(amounts) - amounts), 0.0, amounts)
+            used = moved > EPSILON
+            self._move(tasks[used], moved[used], source, target)
+
+    def _augment(self, deadline: Optional[float] = None) -> bool:
+        """
+        One phase of pushing excess along the paths with the fewest moves, until every such path
+        is blocked; False when no path is left or the deadline has passed
+        """
+        level, depth = self._levels()
+        if depth < 0:
+            return False
+        dead = np.zeros(self.workload.n_days, dtype=bool)
+        for source in np.flatnonzero(level == 0).tolist():
+            while self.loads[source] > self.capacity + EPSILON:
+                path = self._level_path(source, level, depth, dead)
+                if path is None:
+                    break
+                self._push(path)
+                if deadline is not None and time.monotonic() > deadline:
+                    self.complete = not self._overloaded().size
+                    return False
+        return True
+
+    def schedule(self) -> Dict[str, Any]:
+        w = self.workload
+        excess = np.maximum(self.loads - self.capacity, 0.0)
+        moves = sorted(
+            (w.task_ids[task], source, target, amount)
+            for (task, source, target), amount in self.moves.items() if amount > EPSILON
+        )
+        resolved = not bool((excess > EPSILON).any())
+        return {
+            # Excess left after an incomplete pass might still have been resolvable
+            "feasible": True if resolved else (False if self.complete else None),
+            "complete": self.complete,
+            "method": self.method,
+            "moved_effort": float(sum(amount for *_, amount in moves)),
+            "unresolved_effort": float(excess[excess > EPSILON].sum()),
+            "days": [
+                {
+                    "day": w.start_day + timedelta(days=day),
+                    "original_effort": original,
+                    "scheduled_effort": scheduled,
+                }
+                for day, (original, scheduled) in enumerate(zip(w.totals.tolist(), self.loads.tolist()))
+            ],
+            "moves": [
+                {
+                    "task_id": task_id,
+                    "from_day": w.start_day + timedelta(days=source),
+                    "to_day": w.start_day + timedelta(days=target),
+                    "effort": amount,
+                }
+                for task_id, source, target, amount in moves
+            ],
+        }
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from assessment_app.config import Config
+from assessment_app.utils.metrics import CACHE_REQUESTS
+
+# The claims of a verified token that later checks (e.g. revocation) need
+VerifiedToken = namedtuple("VerifiedToken", ["user_id", "jti", "issued_at"])
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified access tokens -> VerifiedToken.
+    An entry lives until the earlier of the token's own `exp` and the TTL,
+    so a cached token is never accepted after decoding it would have failed.
+    """
+
+    def __init__(self, max_size: int = Config.TOKEN_CACHE_SIZE,
+                 ttl_seconds: float = Config.TOKEN_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[VerifiedToken, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        """Get the claims of a previously verified token, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                CACHE_REQUESTS.inc("token", "miss")
+                return None
+            verified, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(token)
+                CACHE_REQUESTS.inc("token", "miss")
+                return None
+            self._entries.move_to_end(token)
+            CACHE_REQUESTS.inc("token", "hit")
+            return verified
+
+    def put(self, token: str, verified: VerifiedToken, token_exp: Optional[float] = None) -> None:
+        """Remember a verified token; token_exp is the JWT `exp` claim in epoch seconds"""
+        if self.max_size <= 0:
+            return
+        expires_at = self._clock() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (verified, expires_at)
+            self._tokens_by_user.setdefault(verified.user_id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached token of a user, e.g. after the user is changed or deleted"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, token: str) -> None:
+        verified, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(verified.user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[verified.user_id]
+
+
+token_cache = TokenCache()
@@ -0,0 +1,273 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+from jose.utils import base64url_decode, base64url_encode
+
+from assessment_app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# kid of the shared-secret key used when no signing keys are configured
+HMAC_KEY_ID = "default"
+# A JWKS document that can't be fetched or parsed; the cached keys stay in use
+JWKS_ERRORS = (httpx.HTTPError, OSError, ValueError, KeyError, TypeError, AttributeError, JWKError)
+
+
+class Ed25519Key(Key):
+    """EdDSA (Ed25519) key for python-jose, which has no built-in support for it"""
+
+    def __init__(self, key, algorithm):
+        if algorithm != "EdDSA":
+            raise JWKError(f"Ed25519Key does not support {algorithm}")
+        self._algorithm = algorithm
+        if isinstance(key, dict):
+            key = self._from_jwk(key)
+        elif isinstance(key, (str, bytes)):
+            key = key.encode() if isinstance(key, str) else key
+            if b"PRIVATE" in key:
+                key = serialization.load_pem_private_key(key, password=None)
+            else:
+                key = serialization.load_pem_public_key(key)
+        if not isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+            raise JWKError("Not an Ed25519 key")
+        self.prepared_key = key
+
+    @staticmethod
+    def _from_jwk(data: Dict):
+        if data.get("kty") != "OKP" or data.get("crv") != "Ed25519":
+            raise JWKError("Not an Ed25519 JWK")
+        if "d" in data:
+            return ed25519.Ed25519PrivateKey.from_private_bytes(base64url_decode(data["d"].encode()))
+        return ed25519.Ed25519PublicKey.from_public_bytes(base64url_decode(data["x"].encode()))
+
+    def is_public(self) -> bool:
+        return isinstance(self.prepared_key, ed25519.Ed25519PublicKey)
+
+    def sign(self, msg: bytes) -> bytes:
+        return self.prepared_key.sign(msg)
+
+    def verify(self, msg: bytes, sig: bytes) -> bool:
+        try:
+            self.public_key().prepared_key.verify(sig, msg)
+            return True
+        except InvalidSignature:
+            return False
+
+    def public_key(self) -> "Ed25519Key":
+        if self.is_public():
+            return self
+        return Ed25519Key(self.prepared_key.public_key(), self._algorithm)
+
+    def to_dict(self) -> Dict:
+        raw = self.public_key().prepared_key.public_bytes(
+            serialization.Encoding.Raw, serialization.PublicFormat.Raw
+        )
+        return {"alg": self._algorithm, "kty": "OKP", "crv": "Ed25519", "x": base64url_encode(raw).decode()}
+
+
+jwk.register_key("EdDSA", Ed25519Key)
+
+
+def algorithm_for(private_key) -> str:
+    """Pick the JWS algorithm for a private key loaded from PEM"""
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return "EdDSA"
+    if isinstance(private_key, rsa.RSAPrivateKey):
+        return "RS256"
+    if isinstance(private_key, ec.EllipticCurvePrivateKey):
+        return "ES256"
+    raise ValueError(f"Unsupported signing key type {type(private_key).__name__}")
+
+
+class Keyring:
+    """
+    Signing and verification keys by kid, parsed once and reused for every token.
+
+    Signing keys are `<kid>.pem` private keys in keys_dir; the most recently
+    written one signs, and all of them verify. Rotating means adding a new file
+    and deleting the old one once its tokens have expired. Nodes that only
+    verify point jwks_url at a signer's /.well-known/jwks.json (or a file) and
+    need no secret. Without either, tokens are HS256 with Config.SECRET_KEY.
+
+    The JWKS is fetched on first use and when an unknown kid shows up; stale keys
+    are refreshed by a background thread while the cached ones keep verifying.
+    A failed fetch is logged and, like a successful one, starts the refetch backoff.
+    """
+
+    def __init__(self, keys_dir: Optional[str] = Config.JWT_KEYS_DIR,
+                 jwks_url: Optional[str] = Config.JWT_JWKS_URL,
+                 secret_key: str = Config.SECRET_KEY,
+                 jwks_refresh_seconds: float = Config.JWKS_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.keys_dir = keys_dir
+        self.jwks_url = jwks_url
+        self.jwks_refresh_seconds = jwks_refresh_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Separate from _lock so a slow JWKS fetch never holds up signing
+        self._jwks_lock = threading.Lock()
+        self._jwks_refresh: Optional[threading.Thread] = None
+        self._signing: Optional[Tuple[str, str, Key]] = None
+        self._local_keys: Dict[str, Tuple[str, Key]] = {}
+        self._remote_keys: Dict[str, Tuple[str, Key]] = {}
+        self._keys_dir_mtime: Optional[float] = None
+        self._jwks_loaded_at: Optional[float] = None
+        if not keys_dir and not jwks_url:
+            hmac_key = jwk.construct(secret_key, Config.ALGORITHM)
+            self._signing = (HMAC_KEY_ID, Config.ALGORITHM, hmac_key)
+            self._local_keys = {HMAC_KEY_ID: (Config.ALGORITHM, hmac_key)}
+
+    def encode(self, claims: Dict) -> str:
+        """Sign claims with the current signing key"""
+        self._load_keys_dir()
+        if self._signing is None:
+            raise RuntimeError("No JWT signing key configured on this node")
+        kid, algorithm, key = self._signing
+        return jwt.encode(claims, key, algorithm=algorithm, headers={"kid": kid})
+
+    def decode(self, token: str) -> Dict:
+        """Verify a token against the key named by its kid and return its claims"""
+        kid = jwt.get_unverified_header(token).get("kid")
+        entry = self._find_key(kid)
+        if entry is None:
+            raise JWTError("Unknown signing key")
+        algorithm, key = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+    def jwks(self) -> Dict:
+        """Public keys of this node's signing keys, as a JWK Set"""
+        self._load_keys_dir()
+        return {
+            "keys": [
+                dict(key.public_key().to_dict(), kid=kid, use="sig")
+                for kid, (algorithm, key) in self._local_keys.items()
+                if kid != HMAC_KEY_ID
+            ]
+        }
+
+    def _find_key(self, kid: Optional[str]) -> Optional[Tuple[str, Key]]:
+        self._load_keys_dir()
+        self._load_jwks()
+        if kid is None:
+            # Tokens issued before key ids were added were all signed with the shared secret
+            kid = HMAC_KEY_ID
+        entry = self._local_keys.get(kid) or self._remote_keys.get(kid)
+        if entry is None and self.jwks_url:
+            # A kid we have not seen yet usually means the signer rotated keys
+            self._load_jwks(force=True)
+            entry = self._remote_keys.get(kid)
+        return entry
+
+    def _load_keys_dir(self) -> None:
+        if not self.keys_dir:
+            return
+        try:
+            mtime = os.stat(self.keys_dir).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._keys_dir_mtime:
+            return
+        with self._lock:
+            if mtime == self._keys_dir_mtime:
+                return
+            files = []
+            for file_name in os.listdir(self.keys_dir):
+                if file_name.endswith(".pem"):
+                    path = os.path.join(self.keys_dir, file_name)
+                    files.append((os.stat(path).st_mtime, file_name[:-len(".pem")], path))
+
+            signing, local_keys = None, {}
+            for _, kid, path in sorted(files):
+                with open(path, "rb") as f:
+                    private_key = serialization.load_pem_private_key(f.read(), password=None)
+                algorithm = algorithm_for(private_key)
+                key = jwk.construct(private_key, algorithm)
+                local_keys[kid] = (algorithm, key.public_key())
+                signing = (kid, algorithm, key)
+            self._signing, self._local_keys = signing, local_keys
+            self._keys_dir_mtime = mtime
+
+    def _load_jwks(self, force: bool = False) -> None:
+        if not self.jwks_url:
+            return
+        loaded_at = self._jwks_loaded_at
+        if loaded_at is None:
+            self._refresh_jwks(loaded_at)
+            return
+        age = self._clock() - loaded_at
+        if force:
+            # Forced refetches for unknown kids are throttled so bad tokens can't hammer the signer
+            if age >= Config.JWKS_MIN_REFETCH_SECONDS:
+                self._refresh_jwks(loaded_at)
+        elif age >= self.jwks_refresh_seconds:
+            self._refresh_jwks_in_background(loaded_at)
+
+    def _refresh_jwks_in_background(self, loaded_at: Optional[float]) -> None:
+        with self._jwks_lock:
+            if loaded_at != self._jwks_loaded_at or (self._jwks_refresh and self._jwks_refresh.is_alive()):
+                return
+            self._jwks_refresh = threading.Thread(
+                target=self._refresh_jwks, args=(loaded_at,), name="jwks-refresh", daemon=True
+            )
+            self._jwks_refresh.start()
+
+    def _refresh_jwks(self, loaded_at: Optional[float]) -> None:
+        with self._jwks_lock:
+            if loaded_at != self._jwks_loaded_at:
+                return
+            try:
+                document = self._fetch_jwks()
+                self._remote_keys = {
+                    data["kid"]: (data["alg"], jwk.construct(data, data["alg"]))
+                    for data in document.get("keys", [])
+                }
+            except JWKS_ERRORS as e:
+                logger.warning("Could not load JWKS from %s, keeping %d cached keys: %s",
+                               self.jwks_url, len(self._remote_keys), e)
+            self._jwks_loaded_at = self._clock()
+
+    def _fetch_jwks(self) -> Dict:
+        if self.jwks_url.startswith(("http://", "https://")):
+            response = httpx.get(self.jwks_url, timeout=5)
+            response.raise_for_status()
+            return response.json()
+        with open(self.jwks_url) as f:
+            return json.load(f)
+
+
+_keyring: Optional[Keyring] = None
+
+
+def get_keyring() -> Keyring:
+    """Get the process-wide keyring built from Config"""
+    global _keyring
+    if _keyring is None:
+        _keyring = Keyring()
+    return _keyring
+
+
+def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a signed access token; jti and iat allow it to be revoked later"""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES))
+    # Sub-second iat, so tokens issued right after a revoke-all are not caught by it
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
+    return get_keyring().encode(to_encode)
+
+
+def decode_access_token(token: str) -> Dict:
+    """Verify a token and return its claims; raises JWTError when it is invalid or expired"""
+    return get_keyring().decode(token)
@@ -0,0 +1,33 @@
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys. Membership checks never give
+    false negatives; false positives happen at roughly `error_rate` once
+    `capacity` keys have been added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, keys: Iterable[str] = ()):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: str):
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
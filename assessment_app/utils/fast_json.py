@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+import pandas as pd
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from assessment_app.utils.metrics import Histogram
+from assessment_app.utils.tracing import span
+
+# Numpy arrays and scalars (e.g. datetime64 columns) are written without converting them first
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+SERIALIZATION_SECONDS = Histogram("serialization_duration_seconds", "JSON response serialization latency")
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, pd.Timestamp):
+        return obj.to_pydatetime()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+@SERIALIZATION_SECONDS.time()
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON; output matches FastAPI's encoding of the equivalent models"""
+    with span("serialize") as current:
+        body = orjson.dumps(content, default=_default, option=_OPTIONS)
+        current.set_attribute("response.body.size", len(body))
+    return body
+
+
+def json_response(content: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """A JSON response serialized with orjson, skipping response_model validation and jsonable_encoder"""
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json", headers=headers)
+
+
+def tick_records(stock_symbol: str, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Price bars as TickData-shaped dicts, built column-wise from the frame's arrays
+    instead of one TickData per row.
+    """
+    open_prices = df["Open"].to_numpy(dtype=float)
+    close_prices = df["Close"].to_numpy(dtype=float)
+    # Microsecond datetime64 converts to datetime, which orjson writes in the same ISO format as Pydantic
+    timestamps = df["Date"].to_numpy(dtype="datetime64[us]").tolist()
+    return [
+        {
+            "stock_symbol": stock_symbol,
+            "timestamp": timestamp,
+            "price": price,
+            "open_price": open_price,
+            "high_price": high_price,
+            "low_price": low_price,
+            "close_price": close_price,
+            "volume": volume,
+        }
+        for timestamp, price, open_price, high_price, low_price, close_price, volume in zip(
+            timestamps,
+            ((open_prices + close_prices) / 2).tolist(),
+            open_prices.tolist(),
+            df["High"].to_numpy(dtype=float).tolist(),
+            df["Low"].to_numpy(dtype=float).tolist(),
+            close_prices.tolist(),
+            df["Volume"].to_numpy(dtype="int64").tolist(),
+        )
+    ]
+
+
+def row_records(rows: Iterable) -> List[Dict[str, Any]]:
+    """Core result rows (or namedtuples with the same fields) as dicts keyed by column name"""
+    return [row._asdict() for row in rows]
@@ -0,0 +1,117 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node:
+    """
+    Intervals containing `center`, kept twice: sorted by start ascending and by end
+    ascending, with the keys in separate lists so they can be bisected.
+    """
+
+    __slots__ = ("center", "left", "right", "starts", "by_start", "ends", "by_end")
+
+    def __init__(self, center: Any):
+        self.center = center
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+        self.starts: List[Any] = []
+        self.by_start: List[Any] = []
+        self.ends: List[Any] = []
+        self.by_end: List[Any] = []
+
+    def add(self, start: Any, end: Any, item: Any) -> None:
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.by_start.insert(index, item)
+        index = bisect_right(self.ends, end)
+        self.ends.insert(index, end)
+        self.by_end.insert(index, item)
+
+
+class IntervalTree(Generic[T]):
+    """
+    Centered interval tree over closed intervals [start, end] of any ordered keys
+    (dates, numbers). Point and overlap queries take O(log n + k) for k results.
+    Built balanced from the initial intervals; later inserts go to the deepest node
+    whose center they contain, so rebuild periodically after many inserts.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, T]] = ()):
+        self._size = 0
+        self._root = self._build(list(intervals))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _build(self, intervals: List[Tuple[Any, Any, T]]) -> Optional[_Node]:
+        if not intervals:
+            return None
+        endpoints = sorted(key for start, end, _ in intervals for key in (start, end))
+        node = _Node(endpoints[len(endpoints) // 2])
+        left, right = [], []
+        for start, end, item in intervals:
+            if end < node.center:
+                left.append((start, end, item))
+            elif start > node.center:
+                right.append((start, end, item))
+            else:
+                node.add(start, end, item)
+                self._size += 1
+        node.left = self._build(left)
+        node.right = self._build(right)
+        return node
+
+    def add(self, start: Any, end: Any, item: T) -> None:
+        if start > end:
+            raise ValueError("Interval start must not be after its end")
+        self._size += 1
+        if self._root is None:
+            self._root = _Node(start)
+        node = self._root
+        while True:
+            if end < node.center:
+                if node.left is None:
+                    node.left = _Node(start)
+                node = node.left
+            elif start > node.center:
+                if node.right is None:
+                    node.right = _Node(start)
+                node = node.right
+            else:
+                node.add(start, end, item)
+                return
+
+    def at(self, point: Any) -> Iterator[T]:
+        """Items whose interval contains point"""
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                # Every interval here ends at or after center, so only the start matters
+                yield from node.by_start[:bisect_right(node.starts, point)]
+                node = node.left
+            elif point > node.center:
+                yield from node.by_end[bisect_left(node.ends, point):]
+                node = node.right
+            else:
+                yield from node.by_start
+                return
+
+    def overlapping(self, low: Any, high: Any) -> Iterator[T]:
+        """Items whose interval intersects [low, high]"""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if high < node.center:
+                yield from node.by_start[:bisect_right(node.starts, high)]
+                stack.append(node.left)
+            elif low > node.center:
+                yield from node.by_end[bisect_left(node.ends, low):]
+                stack.append(node.right)
+            else:
+                yield from node.by_start
+                stack.append(node.left)
+                stack.append(node.right)
@@ -0,0 +1,287 @@
+"""
+Synthetic market data for scale testing.
+
+Generates daily or minute OHLCV bars for any number of symbols and writes them as
+`<SYMBOL>.csv` files in the price store's `Date,Open,High,Low,Close,Adj Close,Volume`
+layout. Existing files are never replaced unless overwrite (--force) is set, so the
+checked-in data in assessment_app/data stays intact. Run with
+
+    python -m assessment_app.utils.market_data_generator --symbols 1000 --start 1995-01-01 --end 2024-12-31 --out /tmp/prices
+    python -m assessment_app.utils.market_data_generator --names RELIANCE,ICICIBANK --frequency 1min --start 2024-01-01 --end 2024-03-31 --out /tmp/intraday
+
+Prices follow geometric Brownian motion with a one-factor correlation structure: every symbol
+loads on a common market factor, so thousands of symbols are correlated without an N x N
+Cholesky factor. Volatility is stochastic (a log AR(1) process per symbol), which clusters large
+moves, and volume follows the same process, so busy periods are volatile ones; minute volume also
+has the intraday U shape. The calendar skips weekends and a set of holidays each year, each bar
+opens away from the previous close by an overnight (or between-bar) return, and symbols have
+trading halts (runs of missing bars) and late listings.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from assessment_app.config import Config
+
+HEADER = b"Date,Open,High,Low,Close,Adj Close,Volume\n"
+FREQUENCIES = ("1d", "1min")
+TRADING_DAYS_PER_YEAR = 252
+# NSE cash session: 09:15 to 15:30, one bar per minute
+SESSION_START_MINUTE = 9 * 60 + 15
+SESSION_MINUTES = 375
+# Share of a day's return variance that arrives overnight, i.e. as the gap between close and next open
+OVERNIGHT_VARIANCE = 0.25
+# Values generated per batch of symbols, which bounds memory whatever the number of bars
+BATCH_VALUES = 4_000_000
+
+
+def trading_days(start: date, end: date, holidays_per_year: int, rng: np.random.Generator) -> np.ndarray:
+    """Weekdays from start to end, less holidays_per_year random ones in each year"""
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    # 1970-01-01 was a Thursday
+    days = days[(days.astype(np.int64) + 3) % 7 < 5]
+    years = days.astype("datetime64[Y]").astype(np.int64)
+    # Rank the days of each year in a random order; the first ones are holidays
+    order = np.lexsort((rng.random(days.size), years))
+    first_of_year = np.searchsorted(years[order], years[order])
+    holiday = np.empty(days.size, dtype=bool)
+    holiday[order] = np.arange(days.size) - first_of_year < holidays_per_year
+    return days[~holiday]
+
+
+def bar_timestamps(days: np.ndarray, frequency: str) -> np.ndarray:
+    """Dates for daily bars, or the start of every minute of each day's session"""
+    if frequency == "1d":
+        return days
+    minutes = np.arange(SESSION_START_MINUTE, SESSION_START_MINUTE + SESSION_MINUTES).astype("timedelta64[m]")
+    return (days.astype("datetime64[m]")[:, None] + minutes).ravel().astype("datetime64[s]")
+
+
+def ar1(noise: np.ndarray, phi: float) -> np.ndarray:
+    """
+    x[t] = phi * x[t - 1] + noise[t] down the rows, vectorized within blocks of rows
+    as scaled cumulative sums and carried from block to block
+    """
+    # phi ** -block stays below e^20 so the scaled sums keep their precision
+    block = int(max(1, min(1024, 20 / max(-np.log(phi), 1e-12))))
+    exponents = np.arange(block)
+    decay = phi ** (exponents + 1)
+    out = np.empty_like(noise)
+    state = np.zeros(noise.shape[1:])
+    for start in range(0, len(noise), block):
+        chunk = noise[start:start + block]
+        n = len(chunk)
+        x = np.cumsum(chunk * phi ** -exponents[:n, None], axis=0) * phi ** exponents[:n, None]
+        x += decay[:n, None] * state
+        out[start:start + n] = x
+        state = x[-1]
+    return out
+
+
+def symbol_names(count: int, names: Sequence[str] = (), prefix: str = "SYN") -> List[str]:
+    """The given names first, then generated ones up to count"""
+    names = list(names)
+    return names + [f"{prefix}{i:05d}" for i in range(max(0, count - len(names)))]
+
+
+class MarketDataGenerator:
+    """
+    Bars for a universe of symbols over one calendar. The market factor is drawn once,
+    then symbols are generated in batches that all load on it.
+    """
+
+    def __init__(self, start: date, end: date, frequency: str = "1d", seed: int = 0,
+                 correlation: float = 0.3, holidays_per_year: int = 12, halts_per_year: float = 0.5,
+                 late_listing_share: float = 0.2, periods: Optional[int] = None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"frequency must be one of {FREQUENCIES}")
+        if not 0 <= correlation < 1:
+            raise ValueError("correlation must be in [0, 1)")
+        self.frequency = frequency
+        self.seed = seed
+        self.correlation = correlation
+        self.halts_per_year = halts_per_year
+        self.late_listing_share = late_listing_share
+        rng = np.random.default_rng(seed)
+        self.timestamps = bar_timestamps(trading_days(start, end, holidays_per_year, rng), frequency)
+        if periods is not None:
+            self.timestamps = self.timestamps[:periods]
+        self.bars_per_day = 1 if frequency == "1d" else SESSION_MINUTES
+        self.bars_per_year = TRADING_DAYS_PER_YEAR * self.bars_per_day
+        # Volatility persistence is about a month of trading days, whatever the bar size
+        self.phi = 0.97 ** (1 / self.bars_per_day)
+        self.market = rng.standard_normal(len(self.timestamps))
+        # True on the first bar of each day, where the overnight gap goes
+        self.opens_day = np.arange(len(self.timestamps)) % self.bars_per_day == 0
+
+    def batch_size(self) -> int:
+        return max(1, BATCH_VALUES // max(1, len(self.timestamps)))
+
+    def generate(self, n_symbols: int, batch: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Bars for n_symbols symbols as (bars x symbols) arrays, plus `valid`, False where a
+        symbol has no bar (halted or not yet listed). Batches with different numbers are independent.
+        """
+        rng = np.random.default_rng([self.seed, batch + 1])
+        n_bars = len(self.timestamps)
+        dt = 1 / self.bars_per_year
+        drift = rng.normal(0.08, 0.05, n_symbols)
+        volatility = rng.uniform(0.15, 0.5, n_symbols)
+        loading = np.clip(np.sqrt(self.correlation) * rng.uniform(0.7, 1.3, n_symbols), 0, 0.99)
+
+        vol_of_vol = 0.3
+        log_vol = ar1(rng.standard_normal((n_bars, n_symbols)) * vol_of_vol * np.sqrt(1 - self.phi ** 2), self.phi)
+        sigma = volatility * np.exp(log_vol - vol_of_vol ** 2 / 2)
+
+        shocks = loading * self.market[:, None] + np.sqrt(1 - loading ** 2) * rng.standard_normal((n_bars, n_symbols))
+        bar_sigma = sigma * np.sqrt(dt)
+        returns = (drift - sigma ** 2 / 2) * dt + bar_sigma * shocks
+        # Split each day's move into the overnight gap (the day's first open) and the session
+        day_sigma = sigma * np.sqrt(self.bars_per_day * dt)
+        gaps = np.where(self.opens_day[:, None],
+                        np.sqrt(OVERNIGHT_VARIANCE) * day_sigma * rng.standard_normal((n_bars, n_symbols)), 0.0)
+        if self.bars_per_day == 1:
+            returns *= np.sqrt(1 - OVERNIGHT_VARIANCE)
+
+        log_start = rng.uniform(np.log(10), np.log(3000), n_symbols)
+        log_close = log_start + np.cumsum(gaps + returns, axis=0)
+        log_open = log_close - returns
+        open_prices, close = np.exp(log_open), np.exp(log_close)
+        wick = bar_sigma * 0.5
+        high = np.maximum(open_prices, close) * np.exp(np.abs(rng.standard_normal((n_bars, n_symbols))) * wick)
+        low = np.minimum(open_prices, close) * np.exp(-np.abs(rng.standard_normal((n_bars, n_symbols))) * wick)
+
+        daily_volume = np.exp(rng.uniform(np.log(1e4), np.log(1e7), n_symbols))
+        log_volume = np.log(daily_volume / self.bars_per_day) + 1.5 * log_vol + 0.3 * np.abs(shocks) \
+            + 0.3 * rng.standard_normal((n_bars, n_symbols))
+        if self.bars_per_day > 1:
+            position = (np.arange(n_bars) % self.bars_per_day) / (self.bars_per_day - 1)
+            log_volume += np.log(0.6 + 1.6 * (2 * position - 1) ** 2)[:, None]
+        volume = np.maximum(1, np.rint(np.exp(log_volume))).astype(np.int64)
+
+        return {
+            "Open": open_prices, "High": high, "Low": low, "Close": close, "Volume": volume,
+            "valid": self._listed(rng, n_symbols),
+        }
+
+    def _listed(self, rng: np.random.Generator, n_symbols: int) -> np.ndarray:
+        """Where each symbol has a bar: after its listing and outside its halts"""
+        n_bars = len(self.timestamps)
+        changes = np.zeros((n_bars + 1, n_symbols), dtype=np.int64)
+        late = rng.random(n_symbols) < self.late_listing_share
+        listing = np.where(late, rng.integers(0, max(1, n_bars // 2), n_symbols), 0)
+        changes[0] -= 1
+        changes[listing, np.arange(n_symbols)] += 1
+
+        halts = rng.poisson(self.halts_per_year * n_bars / self.bars_per_year, n_symbols)
+        columns = np.repeat(np.arange(n_symbols), halts)
+        starts = rng.integers(0, n_bars, columns.size)
+        # Halts last a few days, or half an hour within a session
+        lengths = rng.geometric(1 / (3 if self.bars_per_day == 1 else 30), columns.size)
+        np.subtract.at(changes, (starts, columns), 1)
+        np.add.at(changes, (np.minimum(starts + lengths, n_bars), columns), 1)
+        return np.cumsum(changes[:-1], axis=0) >= 0
+
+    def write(self, directory: str, names: Sequence[str], workers: Optional[int] = None,
+              overwrite: bool = False) -> Dict[str, float]:
+        """
+        Write every symbol's bars to `<directory>/<name>.csv`; returns the totals.
+        Raises FileExistsError before writing anything if a file exists and overwrite is not set.
+        """
+        os.makedirs(directory, exist_ok=True)
+        if not overwrite:
+            existing = [name for name in names if os.path.exists(os.path.join(directory, f"{name}.csv"))]
+            if existing:
+                raise FileExistsError(
+                    f"{len(existing)} of the files already exist in {directory}, e.g. {existing[0]}.csv"
+                )
+        started = time.perf_counter()
+        rows = written = 0
+        batch_size = self.batch_size()
+        with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+            pending = []
+            for batch, first in enumerate(range(0, len(names), batch_size)):
+                batch_names = names[first:first + batch_size]
+                bars = self.generate(len(batch_names), batch)
+                # Let the writes of the previous batch finish before holding another batch in memory
+                for future in pending:
+                    file_rows, file_bytes = future.result()
+                    rows += file_rows
+                    written += file_bytes
+                pending = [
+                    pool.submit(self._write_symbol, os.path.join(directory, f"{name}.csv"), bars, column)
+                    for column, name in enumerate(batch_names)
+                ]
+            for future in pending:
+                file_rows, file_bytes = future.result()
+                rows += file_rows
+                written += file_bytes
+        return {"files": len(names), "rows": rows, "bytes": written, "seconds": time.perf_counter() - started}
+
+    def _write_symbol(self, path: str, bars: Dict[str, np.ndarray], column: int):
+        valid = bars["valid"][:, column]
+        prices = {name: np.round(bars[name][valid, column], 4) for name in ("Open", "High", "Low", "Close")}
+        table = pa.table({
+            "Date": pa.array(self.timestamps[valid]),
+            **prices,
+            "Adj Close": prices["Close"],
+            "Volume": bars["Volume"][valid, column],
+        })
+        with open(path, "wb") as f:
+            f.write(HEADER)
+            pa_csv.write_csv(table, f, pa_csv.WriteOptions(include_header=False))
+        return table.num_rows, os.path.getsize(path)
+
+
+def write_market_data(directory: str = Config.DATA_DIR, symbols: int = 100, start: date = date(2000, 1, 1),
+                      end: date = date(2024, 12, 31), names: Sequence[str] = (), workers: Optional[int] = None,
+                      overwrite: bool = False, **options) -> Dict[str, float]:
+    """
+    Generate and write bars for `symbols` symbols (the given names first); returns the totals.
+    `options` are passed on to MarketDataGenerator.
+    """
+    generator = MarketDataGenerator(start, end, **options)
+    return generator.write(directory, symbol_names(symbols, names), workers, overwrite)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=Config.DATA_DIR, help="directory for the CSV files")
+    parser.add_argument("--symbols", type=int, default=100, help="number of symbols, --names included")
+    parser.add_argument("--names", default="", help="comma-separated symbols to generate first")
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2000, 1, 1))
+    parser.add_argument("--end", type=date.fromisoformat, default=date(2024, 12, 31))
+    parser.add_argument("--frequency", choices=FREQUENCIES, default="1d")
+    parser.add_argument("--correlation", type=float, default=0.3, help="typical correlation between two symbols")
+    parser.add_argument("--holidays-per-year", type=int, default=12)
+    parser.add_argument("--halts-per-year", type=float, default=0.5, help="mean trading halts per symbol and year")
+    parser.add_argument("--late-listing-share", type=float, default=0.2, help="share of symbols listed mid-series")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="threads writing files")
+    parser.add_argument("--force", action="store_true", help="replace CSV files that already exist")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.names.split(",") if name.strip()]
+    generator = MarketDataGenerator(
+        args.start, args.end, frequency=args.frequency, seed=args.seed, correlation=args.correlation,
+        holidays_per_year=args.holidays_per_year, halts_per_year=args.halts_per_year,
+        late_listing_share=args.late_listing_share
+    )
+    try:
+        totals = generator.write(args.out, symbol_names(max(args.symbols, len(names)), names), args.workers,
+                                 args.force)
+    except FileExistsError as e:
+        parser.error(f"{e}; pass --force to replace them")
+    print(f"Wrote {totals['files']} files, {totals['rows']:,} bars, {totals['bytes'] / 1e6:,.1f} MB "
+          f"to {args.out} in {totals['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
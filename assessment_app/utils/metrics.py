@@ -0,0 +1,264 @@
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from assessment_app.config import Config
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """
+    Base for metrics with per-thread value shards.
+    Each thread only ever writes to its own shard, so updates take no lock;
+    shards are summed when the metric is collected.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 registry: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, List[float]]] = []
+        self._shards_lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_values(self) -> List[float]:
+        raise NotImplementedError
+
+    def _values(self, labels: Labels) -> List[float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Taken once per thread, never on the update path
+            shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = self._new_values()
+        return values
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        """Sum every thread's values per label set"""
+        with self._shards_lock:
+            shards = list(self._shards)
+        totals: Dict[Labels, List[float]] = {}
+        for shard in shards:
+            for labels, values in list(shard.items()):
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+        return totals
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_values(self) -> List[float]:
+        return [0.0]
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values(labels)[0] += amount
+
+
+class Histogram(Metric):
+    """Values are one count per bucket (not cumulative), the +Inf count, then the sum"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional["MetricsRegistry"] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, label_names, registry)
+
+    def _new_values(self) -> List[float]:
+        return [0.0] * (len(self.buckets) + 2)
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._values(labels)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> Dict:
+        """This process's metrics as a JSON-serializable dict"""
+        snapshot = {}
+        for name, metric in self._metrics.items():
+            snapshot[name] = {
+                "type": metric.kind,
+                "help": metric.documentation,
+                "labels": list(metric.label_names),
+                "buckets": list(getattr(metric, "buckets", ())),
+                "samples": [[list(labels), values] for labels, values in metric.collect().items()],
+            }
+        return snapshot
+
+
+REGISTRY = MetricsRegistry()
+
+# Shared by every in-process cache, so hit ratios are comparable across them
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result", ["cache", "result"])
+
+
+def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+    """Sum snapshots from several workers per metric and label set"""
+    merged: Dict = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, dict(metric, samples={}))
+            for labels, values in metric["samples"]:
+                total = target["samples"].get(tuple(labels))
+                if total is None:
+                    target["samples"][tuple(labels)] = list(values)
+                else:
+                    for index, value in enumerate(values):
+                        total[index] += value
+    for metric in merged.values():
+        metric["samples"] = [[list(labels), values] for labels, values in metric["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render(snapshot: Dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, values in sorted(metric["samples"]):
+            pairs = list(zip(metric["labels"], labels))
+            if metric["type"] == "histogram":
+                cumulative = 0.0
+                for bound, count in zip([*metric["buckets"], math.inf], values[:-1]):
+                    cumulative += count
+                    bucket_labels = _format_labels([*pairs, ("le", _format_value(bound))])
+                    lines.append(f"{name}_bucket{bucket_labels} {_format_value(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(pairs)} {_format_value(values[-1])}")
+                lines.append(f"{name}_count{_format_labels(pairs)} {_format_value(cumulative)}")
+            else:
+                lines.append(f"{name}{_format_labels(pairs)} {_format_value(values[0])}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessSnapshots:
+    """
+    Multiprocess mode: every worker writes its snapshot to its own file in a directory
+    shared by all workers, and whichever worker serves /metrics sums all the files.
+    Files of exited workers are kept so their counts are not lost; the directory should
+    be emptied when the server (not a single worker) starts.
+    """
+
+    def __init__(self, directory: str, registry: MetricsRegistry = REGISTRY,
+                 interval_seconds: float = Config.METRICS_FLUSH_SECONDS):
+        self.directory = directory
+        self.registry = registry
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> str:
+        # pid alone could be reused by a later worker and overwrite an exited worker's counts
+        return os.path.join(self.directory, f"worker_{os.getpid()}_{_PROCESS_STARTED_NS}.json")
+
+    def write(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.registry.snapshot(), f)
+        os.replace(tmp_path, self.path)
+
+    def collect(self) -> Dict:
+        """Write this worker's snapshot, then merge every worker's"""
+        self.write()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "worker_*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # Removed or rewritten while listing; its next write will be picked up
+                continue
+        return merge_snapshots(snapshots)
+
+    def start(self) -> None:
+        """Write the snapshot every interval_seconds from a background thread"""
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                self.write()
+
+        self._thread = threading.Thread(target=run, name="metrics-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write()
+
+
+_PROCESS_STARTED_NS = time.time_ns()
+
+_multiprocess: Optional[MultiprocessSnapshots] = None
+
+
+def get_multiprocess_snapshots() -> Optional[MultiprocessSnapshots]:
+    """Get this worker's snapshot writer when Config.METRICS_MULTIPROC_DIR is set"""
+    global _multiprocess
+    if _multiprocess is None and Config.METRICS_MULTIPROC_DIR:
+        _multiprocess = MultiprocessSnapshots(Config.METRICS_MULTIPROC_DIR)
+    return _multiprocess
+
+
+def generate_latest() -> str:
+    """All metrics in the text exposition format, summed across workers in multiprocess mode"""
+    multiprocess = get_multiprocess_snapshots()
+    snapshot = multiprocess.collect() if multiprocess is not None else REGISTRY.snapshot()
+    return render(snapshot)
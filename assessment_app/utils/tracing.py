@@ -0,0 +1,195 @@
+import json
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from assessment_app.config import Config
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Trace:
+    """The spans of one request, buffered until the request ends and sampling is decided"""
+
+    __slots__ = ("trace_id", "spans", "dropped_spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.dropped_spans = 0
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes if attributes is not None else {}
+        self.error = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class NonRecordingSpan:
+    """Stands in for a span outside a traced request, so callers need no None checks"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = NonRecordingSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost active span, or None outside a traced request"""
+    return _current_span.get()
+
+
+def start_trace(name: str, traceparent: Optional[str] = None) -> Tuple[Span, Token]:
+    """
+    Start the root span of a request and make it current.
+    A W3C traceparent header continues the caller's trace instead of starting a new one.
+    """
+    match = _TRACEPARENT.match(traceparent or "")
+    if match:
+        trace_id, parent_id = match.group(1), match.group(2)
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+    root = Span(Trace(trace_id), name, parent_id, SPAN_KIND_SERVER)
+    return root, _current_span.set(root)
+
+
+def finish_trace(root: Span, token: Token) -> None:
+    _current_span.reset(token)
+    root.end_ns = time.time_ns()
+    # Always recorded: end_span keeps a slot free for it
+    root.trace.spans.append(root)
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None,
+               kind: int = SPAN_KIND_INTERNAL) -> Optional[Span]:
+    """Start a child of the current span without making it current; None outside a traced request"""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+def end_span(span: Span, error: bool = False) -> None:
+    span.end_ns = time.time_ns()
+    span.error = span.error or error
+    trace = span.trace
+    # A runaway loop of queries must not grow a request's buffer without bound; the last slot is the root's
+    if len(trace.spans) < Config.TRACE_MAX_SPANS - 1:
+        trace.spans.append(span)
+    else:
+        trace.dropped_spans += 1
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """Trace a block as a child of the current span; a no-op outside a traced request"""
+    current = start_span(name, attributes)
+    if current is None:
+        yield NON_RECORDING_SPAN
+        return
+    token = _current_span.set(current)
+    error = False
+    try:
+        yield current
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _current_span.reset(token)
+        end_span(current, error)
+
+
+def _attribute(key: str, value: Any) -> Dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        # int64 is a string in the OTLP JSON encoding
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def to_otlp(trace: Trace) -> Dict:
+    """Encode a trace as an OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for item in trace.spans:
+        encoded = {
+            "traceId": trace.trace_id,
+            "spanId": item.span_id,
+            "parentSpanId": item.parent_id or "",
+            "name": item.name,
+            "kind": item.kind,
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns),
+            "attributes": [_attribute(key, value) for key, value in item.attributes.items()],
+        }
+        if item.error:
+            encoded["status"] = {"code": 2}
+        spans.append(encoded)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", Config.TRACE_SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "assessment_app"}, "spans": spans}],
+        }]
+    }
+
+
+class JsonLinesExporter:
+    """
+    Writes each sampled trace as one line of OTLP/JSON, to a file or stdout.
+    An OpenTelemetry Collector can tail the file (or the process output) with its
+    OTLP JSON file receiver and forward the traces to any backend.
+    """
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        self.path = path
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(to_otlp(trace), separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._stream is None:
+                self._stream = open(self.path, "a", encoding="utf-8")
+            self._stream.write(line)
+            self._stream.flush()
+
+
+def build_exporter() -> JsonLinesExporter:
+    """Build the exporter selected by Config.TRACE_EXPORTER ("file" or "stdout")"""
+    if Config.TRACE_EXPORTER == "stdout":
+        return JsonLinesExporter(stream=sys.stdout)
+    return JsonLinesExporter(path=Config.TRACE_FILE)
@@ -1,7 +1,9 @@
+import base64
 import datetime
 
 from assessment_app.models.constants import DAYS_IN_YEAR
 from datetime import datetime
+from typing import Tuple
 
 
 def compute_cagr(start_price: float, end_price: float, start_ts: datetime, end_ts: datetime) -> float:
@@ -24,3 +26,23 @@ def compute_cagr(start_price: float, end_price: float, start_ts: datetime, end_t
     cagr = (end_price / start_price) ** (1 / years) - 1
 
     return cagr
+
+
+def encode_cursor(execution_ts: datetime, trade_id: str) -> str:
+    """
+    Encode the (execution_ts, id) of the last row of a page into an opaque cursor
+    """
+    raw = f"{execution_ts.isoformat()}|{trade_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by `encode_cursor`. Raises ValueError if it is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        execution_ts, trade_id = raw.split("|", 1)
+        return datetime.fromisoformat(execution_ts), trade_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -1,238 +1,339 @@
-import requests
+"""
+Load generator for the Stock Market Simulator.
+
+Simulates concurrent virtual users against a running server. Each virtual user has
+its own httpx.AsyncClient, so its requests reuse one keep-alive connection, and
+follows the scenario of a trader:
+
+    register -> log in -> create a portfolio -> then, for each iteration:
+    get a tick -> trade at its price -> advance the portfolio a trading day ->
+    analyze the stock and the portfolio -> check the net worth
+
+A user that runs out of trading days starts over as a new user. At the end the
+script reports throughput, p50/p95/p99 latency per endpoint and the error rate, and
+exits with status 1 if a --max-p95-ms or --max-error-rate threshold is exceeded.
+
+    python driver.py --users 50 --duration 60
+    python driver.py --start-server --users 20 --iterations 10 --max-p95-ms 250 --json report.json
+
+--start-server runs a local uvicorn on SQLite (TESTING=true) in a scratch directory,
+with rate limiting off unless --keep-rate-limits is given, so runs are repeatable.
+"""
+import argparse
+import asyncio
 import json
-from datetime import datetime, timedelta
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
 import time
 import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
 
 BASE_URL = "http://localhost:8000"
-TEST_USER_ID = str(uuid.uuid4())  # Generate a unique user ID
-HEADERS = {"X-User-ID": TEST_USER_ID}  # Headers for authentication
 STOCKS = ["RELIANCE", "ICICIBANK", "HDFCBANK", "TATAMOTORS"]
+PASSWORD = "load-test-password"
+# Analyses look back this many trading days
+ANALYSIS_WINDOW = 20
+PERCENTILES = (50, 95, 99)
+
+
+class Stats:
+    """Latencies and errors per endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, seconds: float, status: str, ok: bool) -> None:
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @staticmethod
+    def percentile(ordered: List[float], percent: float) -> float:
+        """Nearest-rank percentile of sorted values"""
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[int(rank) - 1]
+
+    def summary(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            endpoints[endpoint] = {
+                "requests": len(ordered),
+                "errors": self.errors[endpoint],
+                "statuses": dict(self.statuses[endpoint]),
+                "throughput": len(ordered) / elapsed,
+                **{f"p{p}_ms": self.percentile(ordered, p) * 1e3 for p in PERCENTILES},
+                "max_ms": ordered[-1] * 1e3,
+            }
+        requests = sum(len(latencies) for latencies in self.latencies.values())
+        errors = sum(self.errors.values())
+        everything = sorted(latency for latencies in self.latencies.values() for latency in latencies)
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": requests,
+            "errors": errors,
+            "error_rate": errors / requests if requests else 0.0,
+            "throughput": requests / elapsed,
+            **{f"p{p}_ms": self.percentile(everything, p) * 1e3 if everything else 0.0 for p in PERCENTILES},
+            "endpoints": endpoints,
+        }
 
 
-def print_response(response, message):
-    print(f"\n{message}")
-    print(f"Status Code: {response.status_code}")
-    if response.status_code == 200:
-        print(json.dumps(response.json(), indent=2))
+def print_summary(summary: dict) -> None:
+    print(f"\n{summary['requests']} requests in {summary['elapsed_seconds']:.1f}s: "
+          f"{summary['throughput']:.1f} req/s, error rate {summary['error_rate']:.2%}")
+    header = f"{'endpoint':<42} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["endpoints"].items()) + [("all", summary)]
+    for endpoint, row in rows:
+        print(f"{endpoint:<42} {row['requests']:>8} {row['errors']:>6} {row['throughput']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+    for endpoint, row in summary["endpoints"].items():
+        failures = {code: count for code, count in row["statuses"].items() if not code.startswith("2")}
+        if failures:
+            print(f"  {endpoint}: {failures}")
+
+
+class VirtualUser:
+    """One simulated trader with its own connection"""
+
+    def __init__(self, number: int, client: httpx.AsyncClient, stats: Stats, calendar: List[str],
+                 args: argparse.Namespace, run_id: str):
+        self.number = number
+        self.client = client
+        self.stats = stats
+        self.calendar = calendar
+        self.args = args
+        self.run_id = run_id
+        self.rng = random.Random(args.seed * 100_003 + number)
+        self.sessions = 0
+        self.headers: Dict[str, str] = {}
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request, recording it under endpoint; None unless it succeeded"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.record(endpoint, time.perf_counter() - start, type(e).__name__, False)
+            return None
+        ok = response.is_success
+        self.stats.record(endpoint, time.perf_counter() - start, str(response.status_code), ok)
+        return response if ok else None
+
+    async def think(self) -> None:
+        if self.args.think_time > 0:
+            await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+    async def sign_up(self) -> Optional[str]:
+        """Register and log in as a new user with a new portfolio; returns the portfolio id"""
+        self.sessions += 1
+        self.headers = {}
+        email = f"load-{self.run_id}-{self.number}-{self.sessions}@example.com"
+        response = await self.request("POST /register", "POST", "/register",
+                                      json={"username": email.split("@")[0], "email": email, "password": PASSWORD})
+        if response is None:
+            return None
+        user_id = response.json()["id"]
+        response = await self.request("POST /login", "POST", "/login", data={"username": email, "password": PASSWORD})
+        if response is None:
+            return None
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}", "X-User-ID": user_id}
+        response = await self.request("POST /portfolio", "POST", "/portfolio",
+                                      json={"initial_capital": self.args.initial_capital})
+        return None if response is None else response.json()["id"]
+
+    async def run(self, deadline: float, iterations: Optional[int]) -> None:
+        done = 0
+        while time.monotonic() < deadline and (iterations is None or done < iterations):
+            portfolio_id = await self.sign_up()
+            if portfolio_id is None:
+                return
+            holdings: Dict[str, int] = defaultdict(int)
+            # Users start on different days so they don't all hit the same cached ticks
+            position = self.rng.randrange(max(1, len(self.calendar) // 2))
+            response = await self.request("PUT /portfolio/{id}/timestamp", "PUT", f"/portfolio/{portfolio_id}/timestamp",
+                                          json={"new_ts": self.calendar[position]})
+            if response is None:
+                return
+            while position + 1 < len(self.calendar) and time.monotonic() < deadline \
+                    and (iterations is None or done < iterations):
+                await self.iteration(portfolio_id, position, holdings)
+                position += 1
+                done += 1
+                await self.think()
+
+    async def iteration(self, portfolio_id: str, position: int, holdings: Dict[str, int]) -> None:
+        day, next_day = self.calendar[position], self.calendar[position + 1]
+        symbol = self.rng.choice(STOCKS)
+        response = await self.request("POST /market/data/tick", "POST", "/market/data/tick",
+                                      json={"stock_symbol": symbol, "current_ts": day})
+        if response is not None:
+            if holdings[symbol] and self.rng.random() < 0.5:
+                trade_type, quantity = "SELL", self.rng.randint(1, holdings[symbol])
+            else:
+                trade_type, quantity = "BUY", self.rng.randint(1, 5)
+            response = await self.request("POST /market/trade", "POST", "/market/trade", json={
+                "stock_symbol": symbol,
+                "quantity": quantity,
+                "price": response.json()["price"],
+                "trade_type": trade_type,
+                "execution_ts": day,
+            })
+            if response is not None:
+                holdings[symbol] += quantity if trade_type == "BUY" else -quantity
+
+        await self.request("PUT /portfolio/{id}/timestamp", "PUT", f"/portfolio/{portfolio_id}/timestamp",
+                           json={"new_ts": next_day})
+        window = {"start_ts": self.calendar[max(0, position - ANALYSIS_WINDOW)], "end_ts": day}
+        await self.request("GET /analysis/estimate_returns/stock", "GET", "/analysis/estimate_returns/stock",
+                           params={"stock_symbol": symbol, **window})
+        await self.request("GET /analysis/estimate_returns/portfolio", "GET", "/analysis/estimate_returns/portfolio",
+                           params={"portfolio_id": portfolio_id, **window})
+        await self.request("GET /portfolio-net-worth", "GET", "/portfolio-net-worth")
+
+
+async def fetch_calendar(client: httpx.AsyncClient) -> List[str]:
+    """The trading days (as ISO timestamps) on which every stock has a bar"""
+    days = None
+    for symbol in STOCKS:
+        response = await client.post("/market/data/range", json={
+            "stock_symbol": symbol, "from_ts": "1900-01-01T00:00:00", "to_ts": "2100-01-01T00:00:00"
+        })
+        response.raise_for_status()
+        symbol_days = {tick["timestamp"][:10] for tick in response.json()}
+        days = symbol_days if days is None else days & symbol_days
+    return [f"{day}T00:00:00" for day in sorted(days)]
+
+
+async def wait_for_server(base_url: str, timeout: float) -> None:
+    """Wait for the server to answer, or fail after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                if (await client.get("/")).is_success:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"Server at {base_url} did not start within {timeout:.0f}s")
+            await asyncio.sleep(0.5)
+
+
+@contextmanager
+def local_server(port: int, workers: int, keep_rate_limits: bool):
+    """Run the app under uvicorn on a fresh SQLite database in a scratch directory"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory(prefix="load-test-") as directory:
+        # The app reads its data files and SQLite database relative to the working directory
+        os.symlink(os.path.join(root, "assessment_app"), os.path.join(directory, "assessment_app"))
+        env = {**os.environ, "TESTING": "true"}
+        if not keep_rate_limits:
+            env["RATE_LIMIT_ENABLED"] = "false"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "assessment_app.main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+            cwd=directory, env=env
+        )
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> dict:
+    await wait_for_server(base_url, args.server_timeout)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout) as client:
+        calendar = await fetch_calendar(client)
+    if len(calendar) < 2:
+        raise SystemExit("The server needs at least two trading days common to all stocks")
+
+    stats = Stats()
+    run_id = uuid.uuid4().hex[:8]
+    iterations = None if args.duration else args.iterations
+    deadline = time.monotonic() + args.duration if args.duration else float("inf")
+
+    async def virtual_user(number: int) -> None:
+        # Users start spread evenly over the ramp-up period
+        await asyncio.sleep(args.ramp_up * number / args.users)
+        limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            await VirtualUser(number, client, stats, calendar, args, run_id).run(deadline, iterations)
+
+    print(f"Running {args.users} virtual users against {base_url} "
+          + (f"for {args.duration:.0f}s" if args.duration else f"for {args.iterations} iterations each"))
+    start = time.perf_counter()
+    await asyncio.gather(*(virtual_user(number) for number in range(args.users)))
+    return stats.summary(time.perf_counter() - start)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=5, help="scenario iterations per user")
+    parser.add_argument("--duration", type=float, help="run for this many seconds instead of --iterations")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="seconds over which the users start")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean seconds a user waits between iterations (exponentially distributed)")
+    parser.add_argument("--initial-capital", type=float, default=1_000_000.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-server", action="store_true", help="run a local uvicorn on SQLite for the test")
+    parser.add_argument("--port", type=int, default=8765, help="port for --start-server")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for --start-server")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="leave rate limiting on with --start-server")
+    parser.add_argument("--server-timeout", type=float, default=60.0, help="seconds to wait for the server")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if the overall p95 latency is higher")
+    parser.add_argument("--max-error-rate", type=float, help="fail if the error rate (0-1) is higher")
+    args = parser.parse_args(argv)
+    if args.users < 1:
+        parser.error("--users must be at least 1")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.start_server:
+        with local_server(args.port, args.workers, args.keep_rate_limits) as base_url:
+            summary = asyncio.run(run_load(base_url, args))
     else:
-        print(response.text)
+        summary = asyncio.run(run_load(args.base_url, args))
 
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
 
-def wait_for_server():
-    """Wait for the server to be ready"""
-    while True:
-        try:
-            response = requests.get(f"{BASE_URL}/stocks", headers=HEADERS)
-            if response.status_code == 200:
-                print("Server is ready!")
-                break
-        except requests.exceptions.ConnectionError:
-            print("Waiting for server to start...")
-            time.sleep(1)
-
-
-def get_available_stocks():
-    """Get list of available stocks"""
-    response = requests.get(f"{BASE_URL}/stocks", headers=HEADERS)
-    print_response(response, "Available Stocks:")
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-
-def get_market_data(stock_symbol: str):
-    """Get market data for a stock"""
-    # Use a timestamp that exists in our data (with time component)
-    current_ts = datetime(2023, 7, 19, 0, 0, 0)
-    payload = {
-        "stock_symbol": stock_symbol,
-        "current_ts": current_ts.isoformat()
-    }
-    response = requests.post(f"{BASE_URL}/market/data/tick", json=payload, headers=HEADERS)
-    print_response(response, f"Market Data for {stock_symbol}:")
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-
-def create_portfolio(user_id: str):
-    """Create a new portfolio"""
-    payload = {
-        "initial_capital": 100000.0,
-        "user_id": user_id
-    }
-    response = requests.post(f"{BASE_URL}/portfolio", json=payload, headers=HEADERS)
-    print_response(response, "Portfolio Creation:")
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-
-def update_portfolio_timestamp(portfolio_id: str, new_ts: datetime):
-    """Update portfolio timestamp"""
-    response = requests.put(
-        f"{BASE_URL}/portfolio/{portfolio_id}/timestamp",
-        json={"new_ts": new_ts.isoformat()},
-        headers=HEADERS
-    )
-    print_response(response, "Portfolio Timestamp Update:")
-    if response.status_code == 200:
-        return response.json()
-    print("Failed to update portfolio timestamp")
-    return None
-
-
-def execute_trade(portfolio_id: str, stock_symbol: str, quantity: int, trade_type: str):
-    """Execute a trade"""
-    # Use a timestamp that exists in our data (with time component)
-    current_ts = datetime(2023, 7, 19, 0, 0, 0)
-    # Get current market price
-    market_data = get_market_data(stock_symbol)
-    if market_data:
-        current_price = (market_data["open_price"] + market_data["close_price"]) / 2
-        payload = {
-            "stock_symbol": stock_symbol,
-            "quantity": quantity,
-            "price": current_price,
-            "trade_type": trade_type,
-            "execution_ts": current_ts.isoformat()
-        }
-        response = requests.post(f"{BASE_URL}/market/trade", json=payload, headers=HEADERS)
-        print_response(response, "Trade Execution:")
-        if response.status_code == 200:
-            return response.json()
-    return None
-
-
-def get_portfolio_net_worth(portfolio_id: str):
-    """Get portfolio net worth"""
-    response = requests.get(f"{BASE_URL}/portfolio-net-worth", headers=HEADERS)
-    print_response(response, "Portfolio Net Worth:")
-    if response.status_code == 200:
-        return response.json()
-    print("Failed to get portfolio net worth")
-    return None
-
-
-def get_stock_analysis(stock_symbol: str):
-    """Get stock analysis"""
-    # Use a timestamp that exists in our data (with time component)
-    end_ts = datetime(2023, 7, 19, 0, 0, 0)
-    start_ts = end_ts - timedelta(days=30)
-    params = {
-        "stock_symbol": stock_symbol,
-        "start_ts": start_ts.isoformat(),
-        "end_ts": end_ts.isoformat()
-    }
-    response = requests.get(
-        f"{BASE_URL}/analysis/estimate_returns/stock",
-        params=params,
-        headers=HEADERS
-    )
-    print_response(response, f"Stock Analysis for {stock_symbol}:")
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-
-def get_portfolio_analysis(portfolio_id: str):
-    """Get portfolio analysis"""
-    # Use a timestamp that exists in our data (with time component)
-    end_ts = datetime(2023, 7, 19, 0, 0, 0)
-    start_ts = end_ts - timedelta(days=30)
-    params = {
-        "start_ts": start_ts.isoformat(),
-        "end_ts": end_ts.isoformat(),
-        "portfolio_id": portfolio_id
-    }
-    response = requests.get(
-        f"{BASE_URL}/analysis/estimate_returns/portfolio",
-        params=params,
-        headers=HEADERS
-    )
-    print_response(response, "Portfolio Analysis:")
-    if response.status_code == 200:
-        return response.json()
-    return None
-
-
-def main():
-    print("Starting Stock Market Simulator Demo...")
-    print(f"Using test user ID: {TEST_USER_ID}")
-
-    # Wait for server to be ready
-    wait_for_server()
-
-    params = {
-        "name": "my-task-2",
-        "group_id": "group-2",
-        "start_date": "2025-06-03",
-        "end_date": "2025-06-07",
-        "estimated_effort": 8.0,
-        "weekdays": [1, 2, 3, 4]
-    }
-    response = requests.post(f"{BASE_URL}/tasks",
-                             params=params,
-                             headers=HEADERS)
-    print_response(response, "Portfolio Analysis:")
-
-    return
-    # Get available stocks
-    stocks = get_available_stocks()
-    if not stocks:
-        print("Failed to get available stocks")
-        return
-
-    # Get market data for RELIANCE
-    for stock in STOCKS:
-        market_data = get_market_data(stock)
-        if not market_data:
-            print("Failed to get market data")
-            return
-
-    # Create a new portfolio
-    portfolio = create_portfolio(TEST_USER_ID)
-    if not portfolio:
-        print("Failed to create portfolio")
-        return
-
-    portfolio_id = portfolio["id"]
-
-    # Update portfolio timestamp
-    new_ts = datetime(2023, 7, 19, 0, 0, 0)
-    if not update_portfolio_timestamp(portfolio_id, new_ts):
-        print("Failed to update portfolio timestamp")
-        return
-
-    # Execute a trade
-    for stock in STOCKS:
-        trade = execute_trade(portfolio_id, stock, 10, "BUY")
-        if not trade:
-            print("Failed to execute trade")
-            return
-
-    # Get portfolio net worth
-    net_worth = get_portfolio_net_worth(portfolio_id)
-    if not net_worth:
-        print("Failed to get portfolio net worth")
-        return
-
-    # Get stock analysis
-    for stock in STOCKS:
-        stock_analysis = get_stock_analysis(stock)
-        if not stock_analysis:
-            print("Failed to get stock analysis")
-            return
-
-    # Get portfolio analysis
-    portfolio_analysis = get_portfolio_analysis(portfolio_id)
-    if not portfolio_analysis:
-        print("Failed to get portfolio analysis")
-        return
-
-    print("\nDemo completed successfully!")
+    failures = []
+    if args.max_p95_ms is not None and summary["p95_ms"] > args.max_p95_ms:
+        failures.append(f"p95 latency {summary['p95_ms']:.1f}ms is over {args.max_p95_ms:.1f}ms")
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {summary['error_rate']:.2%} is over {args.max_error_rate:.2%}")
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,30 +1,99 @@
 # Graph and Dynamic Programming Algorithms Analysis
 
+from math import isqrt
+
 # Problem 1: All Paths in a DAG
 # Find all paths from node 0 to node n-1 in a directed acyclic graph
 
-def allPathsDisplay(graph):
+def allPathsDisplay(graph, max_paths=None):
     """
     Find all paths from source (0) to destination (n-1) in a DAG.
+    With max_paths, stop after the first max_paths of them.
     
     Time Complexity: O(2^n) in worst case, but typically much better for DAGs
-    Space Complexity: O(n) for recursion stack + O(2^n) for result storage
+    Space Complexity: O(n) for the path stack + O(2^n) for result storage
+    """
+    return list(allPathsIter(graph, max_paths))
+
+def allPathsIter(graph, max_paths=None):
+    """
+    Generate the paths from source (0) to destination (n-1) in a DAG one at a time,
+    in the same order as allPathsDisplay. Uses an explicit stack instead of recursion,
+    so deep graphs don't hit the recursion limit, and only holds the current path.
+    
+    Time Complexity: O(V + E) to start, then O(length) per path: nodes that can't
+    reach the destination are skipped instead of explored
+    Space Complexity: O(V)
     """
     n = len(graph) - 1
-    result = []
+    if max_paths is not None and max_paths <= 0:
+        return
+    if n == 0:
+        yield [0]
+        return
+    
+    # Nodes that can reach the destination, found by walking the edges backwards
+    predecessors = [[] for _ in graph]
+    for node, neighbors in enumerate(graph):
+        for neighbor in neighbors:
+            predecessors[neighbor].append(node)
+    reaches = [False] * len(graph)
+    reaches[n] = True
+    stack = [n]
+    while stack:
+        for node in predecessors[stack.pop()]:
+            if not reaches[node]:
+                reaches[node] = True
+                stack.append(node)
+    if not reaches[0]:
+        return
+    
+    found = 0
+    path = [0]
+    # One iterator over the neighbors still to visit for each node on the path
+    stack = [iter(graph[0])]
+    while stack:
+        neighbor = next(stack[-1], None)
+        if neighbor is None:
+            stack.pop()  # Backtrack
+            path.pop()
+        elif neighbor == n:
+            yield path + [n]
+            found += 1
+            if max_paths is not None and found >= max_paths:
+                return
+        elif reaches[neighbor]:
+            path.append(neighbor)
+            stack.append(iter(graph[neighbor]))
 
-    def dfs(node, path):
-        if node == n:
-            result.append(path[:])  # Make a copy of the path
-            return
-        
+def countPaths(graph):
+    """
+    Count the paths from source (0) to destination (n-1) in a DAG without enumerating
+    them: the number of ways to reach each node, summed in topological order (Kahn's algorithm).
+    
+    Time Complexity: O(V + E)
+    Space Complexity: O(V)
+    """
+    n = len(graph) - 1
+    indegree = [0] * len(graph)
+    for neighbors in graph:
+        for neighbor in neighbors:
+            indegree[neighbor] += 1
+    
+    # ways[i] = number of paths from 0 to i
+    ways = [0] * len(graph)
+    ways[0] = 1
+    order = [node for node in range(len(graph)) if indegree[node] == 0]
+    for node in order:  # order grows as nodes lose their last incoming edge
         for neighbor in graph[node]:
-            path.append(neighbor)
-            dfs(neighbor, path)
-            path.pop()  # Backtrack
+            ways[neighbor] += ways[node]
+            indegree[neighbor] -= 1
+            if indegree[neighbor] == 0:
+                order.append(neighbor)
     
-    dfs(0, [0])
-    return result
+    if len(order) < len(graph):
+        raise ValueError("Graph has a cycle")
+    return ways[n]
 
 # Test cases for allPathsDisplay
 test_cases = [
@@ -41,8 +110,26 @@ for graph, expected in test_cases:
     print(f"Result: {result}")
     print(f"Expected: {expected}")
     print(f"Correct: {result == expected}")
+    print(f"Count: {countPaths(graph)}, Correct: {countPaths(graph) == len(expected)}")
     print()
 
+# A chain far deeper than the recursion limit has one path
+deep_graph = [[i + 1] for i in range(99_999)] + [[]]
+deep_paths = list(allPathsIter(deep_graph))
+print(f"Deep chain of {len(deep_graph)} nodes: {len(deep_paths)} path of length {len(deep_paths[0])}")
+print(f"Correct: {deep_paths == [list(range(len(deep_graph)))] and countPaths(deep_graph) == 1}")
+print()
+
+# 64 diamonds in a row have 2^64 paths: count them, and only list the first few
+wide_graph = []
+for i in range(64):
+    wide_graph += [[3 * i + 1, 3 * i + 2], [3 * i + 3], [3 * i + 3]]
+wide_graph.append([])
+first_paths = allPathsDisplay(wide_graph, max_paths=3)
+print(f"Diamond chain: {countPaths(wide_graph)} paths, first {len(first_paths)} listed")
+print(f"Correct: {countPaths(wide_graph) == 2 ** 64 and len(first_paths) == 3}")
+print()
+
 # Problem 2: Partition Equal Subset Sum
 # Check if array can be partitioned into two subsets with equal sums
 
@@ -124,6 +211,87 @@ def isSubsetPossibleMemo(nums):
     
     return can_form_sum(0, 0)
 
+# Bitset implementation: bit i of a Python int is set when sum i can be formed
+def isSubsetPossibleBitset(nums):
+    """
+    Check if array can be partitioned into two subsets with equal sums, shifting all
+    the reachable sums at once: bits |= bits << num. Stops as soon as target is reachable.
+    
+    Time Complexity: O(n * target / w) for machine word size w
+    Space Complexity: O(target / w)
+    """
+    total_sum = sum(nums)
+    if total_sum % 2 != 0:
+        return False
+    
+    target = total_sum // 2
+    mask = (1 << (target + 1)) - 1  # Sums above target are never needed
+    bits = 1  # Only sum 0 (the empty subset) to start with
+    for num in nums:
+        bits |= (bits << num) & mask
+        if bits >> target & 1:
+            return True
+    return bits >> target & 1 == 1
+
+def subsetPartition(nums):
+    """
+    Partition the array into two subsets with equal sums, as (subset, rest), or None.
+    Walking back from the last number needed, a number is in the subset exactly when
+    the remaining sum can't be formed without it. The bitsets for that walk are
+    recomputed from one checkpoint every sqrt(n) numbers instead of all being kept.
+    
+    Time Complexity: O(n * target / w), about twice isSubsetPossibleBitset
+    Space Complexity: O(sqrt(n) * target / w)
+    """
+    total_sum = sum(nums)
+    if total_sum % 2 != 0:
+        return None
+    
+    target = total_sum // 2
+    mask = (1 << (target + 1)) - 1
+    step = max(1, isqrt(len(nums)))
+    checkpoints = []  # checkpoints[j] = reachable sums before nums[j * step]
+    bits = 1
+    used = 0  # Only the first `used` numbers are needed to reach target
+    while not bits >> target & 1:
+        if used == len(nums):
+            return None
+        if used % step == 0:
+            checkpoints.append(bits)
+        bits |= (bits << nums[used]) & mask
+        used += 1
+    
+    chosen = set()
+    remaining = target
+    end = used
+    for j in range(len(checkpoints) - 1, -1, -1):
+        start = j * step
+        # before[k] = reachable sums before nums[start + k]
+        before = [checkpoints[j]]
+        for num in nums[start:end - 1]:
+            before.append(before[-1] | ((before[-1] << num) & mask))
+        for index in range(end - 1, start - 1, -1):
+            if not before[index - start] >> remaining & 1:
+                chosen.add(index)
+                remaining -= nums[index]
+        end = start
+    
+    subset = [num for index, num in enumerate(nums) if index in chosen]
+    rest = [num for index, num in enumerate(nums) if index not in chosen]
+    return subset, rest
+
+print("Testing bitset version:")
+for nums, expected in subset_test_cases:
+    result = isSubsetPossibleBitset(nums)
+    partition = subsetPartition(nums)
+    print(f"Array: {nums}")
+    print(f"Result: {result}, Partition: {partition}")
+    print(f"Expected: {expected}")
+    valid = partition is None if not expected else sum(partition[0]) == sum(partition[1]) and \
+        sorted(partition[0] + partition[1]) == sorted(nums)
+    print(f"Correct: {result == expected and valid}")
+    print()
+
 print("Testing memoization version:")
 for nums, expected in subset_test_cases[:3]:  # Test first 3 cases
     result = isSubsetPossibleMemo(nums)
@@ -0,0 +1,120 @@
+"""
+Login-rate benchmark.
+
+Fires concurrent /login requests at the app in-process while timing a cheap
+request ("/") alongside them, once with hashing on the dedicated pool and
+once with hashing inline on the event loop (the old behaviour).
+
+    python login_benchmark.py --logins 64 --concurrency 16
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import time
+
+os.environ.setdefault("TESTING", "true")
+os.environ.setdefault("SKIP_DDL", "true")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.main import app
+from assessment_app.models.db_models import Base
+from assessment_app.repository.database import get_db
+from assessment_app.service import password_hasher as hasher_module
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+
+class InlineHasher:
+    """Hashes on the calling thread, i.e. blocks the event loop like the original handlers"""
+
+    def __init__(self, context):
+        self.context = context
+
+    async def hash(self, password):
+        return self.context.hash(password)
+
+    async def verify(self, password, hashed_password):
+        return self.context.verify_and_update(password, hashed_password)
+
+
+def use_hasher(hasher):
+    import assessment_app.routers.user_mgmt as user_mgmt
+    user_mgmt.password_hasher = hasher
+
+
+async def run(logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/register", json={"username": "bench", "email": EMAIL, "password": PASSWORD})
+
+        semaphore = asyncio.Semaphore(concurrency)
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/login", data={"username": EMAIL, "password": PASSWORD})
+                assert response.status_code == 200, response.text
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    probe_latencies.sort()
+    return {
+        "logins_per_second": logins / elapsed,
+        "probe_p50_ms": statistics.median(probe_latencies) * 1000,
+        "probe_max_ms": probe_latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    for name, hasher in [
+        ("inline", InlineHasher(hasher_module.pwd_context)),
+        ("executor", hasher_module.password_hasher),
+    ]:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        use_hasher(hasher)
+        result = asyncio.run(run(args.logins, args.concurrency))
+        print(f"{name:>8}: {result['logins_per_second']:.1f} logins/s, "
+              f"'/' p50 {result['probe_p50_ms']:.1f} ms, max {result['probe_max_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/bin/bash
+# Hot-path micro-benchmarks (tests/benchmarks) against a baseline saved on this machine.
+#
+#   ./run_benchmarks.sh save              # record a new baseline in .benchmarks/
+#   ./run_benchmarks.sh check [PERCENT]   # fail if a benchmark's mean is PERCENT% (default 10) slower
+#
+# Further arguments go to pytest, e.g. ./run_benchmarks.sh check 15 -k "not 1000000" for a quick run.
+# The suite builds its own databases and price files, so the shared conftest is skipped.
+set -e
+cd "$(dirname "$0")"
+export TESTING=true
+
+mode=${1:-check}
+shift || true
+options=(tests/benchmarks --noconftest --benchmark-only --benchmark-storage=.benchmarks --benchmark-sort=name)
+
+case "$mode" in
+  save)
+    python -m pytest "${options[@]}" --benchmark-save=baseline "$@"
+    ;;
+  check)
+    percent=10
+    if [[ "$1" =~ ^[0-9]+([.][0-9]+)?$ ]]; then
+      percent=$1
+      shift
+    fi
+    python -m pytest "${options[@]}" --benchmark-compare --benchmark-compare-fail="mean:${percent}%" "$@"
+    ;;
+  *)
+    echo "usage: $0 save|check [PERCENT] [pytest args...]" >&2
+    exit 2
+    ;;
+esac
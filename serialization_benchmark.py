@@ -0,0 +1,122 @@
+"""
+Response serialization benchmark.
+
+Times building and serializing large responses the old way (one Pydantic model
+per row, then jsonable_encoder and json.dumps, as FastAPI does for a
+response_model) against the fast path in assessment_app.utils.fast_json
+(dicts built straight from NumPy arrays or DB rows, serialized by orjson).
+
+    python serialization_benchmark.py --rows 20000 --repeat 5
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+os.environ.setdefault("TESTING", "true")
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from assessment_app.models.models import Portfolio, TickData, Trade, TradePage, UserResponse
+from assessment_app.repository.trade_archive import ArchivedTrade
+from assessment_app.utils.fast_json import dumps, row_records, tick_records
+
+PortfolioRow = namedtuple("PortfolioRow", list(Portfolio.model_fields))
+UserRow = namedtuple("UserRow", list(UserResponse.model_fields))
+
+
+def fastapi_dumps(content) -> bytes:
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def make_price_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    return pd.DataFrame({
+        "Date": pd.date_range("1990-01-01", periods=rows, freq="D"),
+        "Open": close * (1 + rng.normal(0, 0.005, rows)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, rows),
+    })
+
+
+def make_rows(rows: int):
+    start = datetime(2023, 1, 1)
+    trades = [
+        ArchivedTrade(uuid.uuid4().hex, "user", "RELIANCE", 10, 2500.5, "BUY",
+                      start + timedelta(minutes=i), start + timedelta(minutes=i))
+        for i in range(rows)
+    ]
+    portfolios = [PortfolioRow(uuid.uuid4().hex, uuid.uuid4().hex, 1e6, start, 1e6, start) for _ in range(rows)]
+    users = [UserRow(uuid.uuid4().hex, f"user{i}", f"user{i}@example.com", start) for i in range(rows)]
+    return trades, portfolios, users
+
+
+def pydantic_ticks(stock_symbol: str, df: pd.DataFrame):
+    return [
+        TickData(
+            stock_symbol=stock_symbol,
+            timestamp=row['Date'],
+            price=(row['Open'] + row['Close']) / 2,
+            open_price=row['Open'],
+            high_price=row['High'],
+            low_price=row['Low'],
+            close_price=row['Close'],
+            volume=row['Volume']
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_price_frame(args.rows)
+    trades, portfolios, users = make_rows(args.rows)
+
+    cases = [
+        ("/market/data/range",
+         lambda: fastapi_dumps(pydantic_ticks("RELIANCE", df)),
+         lambda: dumps(tick_records("RELIANCE", df))),
+        ("/trades",
+         lambda: fastapi_dumps(TradePage(trades=[Trade(**row._asdict()) for row in trades])),
+         lambda: dumps({"trades": row_records(trades), "next_cursor": None})),
+        ("/portfolios",
+         lambda: fastapi_dumps([Portfolio(**row._asdict()) for row in portfolios]),
+         lambda: dumps(row_records(portfolios))),
+        ("/users",
+         lambda: fastapi_dumps([UserResponse(**row._asdict()) for row in users]),
+         lambda: dumps(row_records(users))),
+    ]
+    print(f"{args.rows} rows, best of {args.repeat}")
+    for name, old, new in cases:
+        assert json.loads(old()) == json.loads(new()), name
+        old_seconds = best_of(args.repeat, old)
+        new_seconds = best_of(args.repeat, new)
+        print(f"{name:>20}: pydantic {old_seconds * 1000:8.1f} ms, "
+              f"fast path {new_seconds * 1000:7.1f} ms, {old_seconds / new_seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Partition Equal Subset Sum benchmark.
+
+Times the three implementations in graph_algorithms on random arrays whose sums run
+into the millions: the O(n * target) DP list, the recursive memoized search and the
+bitset (with and without reconstructing the partition). Each size is run on an array
+that can be partitioned and on one that can't, where the bitset gets no early exit.
+The DP list is skipped once n * target passes --dp-limit, and the memo, which also
+keeps a dict entry per state, once it passes --memo-limit.
+
+    python subset_sum_benchmark.py --sizes 100 300 1000 10000 --max-value 2000
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+
+# graph_algorithms prints its test cases when imported
+with contextlib.redirect_stdout(io.StringIO()):
+    from graph_algorithms import isSubsetPossible, isSubsetPossibleBitset, isSubsetPossibleMemo, subsetPartition
+
+
+def make_arrays(size: int, max_value: int, seed: int):
+    """A partitionable array, and one with an even sum that isn't: its last number is over half the sum"""
+    rng = random.Random(seed)
+    nums = [rng.randint(1, max_value) for _ in range(size)]
+    if sum(nums) % 2:
+        nums[0] += 1
+    return nums, nums[:-1] + [sum(nums[:-1]) + 2]
+
+
+def timed(function, nums, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(nums)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000, 10000])
+    parser.add_argument("--max-value", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dp-limit", type=float, default=5e7,
+                        help="skip the DP list above this many n * target steps")
+    parser.add_argument("--memo-limit", type=float, default=1e7,
+                        help="skip the memo version above this many n * target states")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * max(args.sizes) + 100))
+
+    implementations = [
+        ("dp list", isSubsetPossible, args.dp_limit),
+        ("memo", isSubsetPossibleMemo, args.memo_limit),
+        ("bitset", isSubsetPossibleBitset, None),
+        ("bitset+partition", lambda nums: subsetPartition(nums) is not None, None),
+    ]
+    print(f"{'n':>6} {'sum':>11} {'possible':>8} " + " ".join(f"{name:>17}" for name, _, _ in implementations))
+    for size in args.sizes:
+        for nums in make_arrays(size, args.max_value, args.seed):
+            cells = []
+            answers = set()
+            for name, function, limit in implementations:
+                if limit is not None and len(nums) * sum(nums) / 2 > limit:
+                    cells.append("skipped")
+                    continue
+                seconds, answer = timed(function, nums, 1 if limit is not None else args.repeat)
+                answers.add(answer)
+                cells.append(f"{seconds * 1e3:.1f} ms")
+            assert len(answers) == 1, f"implementations disagree for n={size}"
+            print(f"{size:>6} {sum(nums):>11} {str(answers.pop()):>8} " + " ".join(f"{cell:>17}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+from datetime import date
+from typing import List
+
+from assessment_app.models.constants import StockSymbols
+from assessment_app.utils.market_data_generator import SESSION_MINUTES, MarketDataGenerator
+
+# Beyond this many rows a file holds minute bars; daily bars would run past pandas' year 2262
+MAX_DAILY_ROWS = 50_000
+START = date(1990, 1, 1)
+
+
+def symbol_names(count: int) -> List[str]:
+    """The real stock symbols first, so the app accepts trades in them, then synthetic ones"""
+    real = [symbol.value for symbol in StockSymbols]
+    return (real + [f"SYN{i:05d}" for i in range(count - len(real))])[:count]
+
+
+def write_price_files(directory: str, symbols: int, rows: int, seed: int = 0) -> List[str]:
+    """Write `rows` synthetic bars per symbol as <SYMBOL>.csv in the price store's layout"""
+    frequency = "1d" if rows <= MAX_DAILY_ROWS else "1min"
+    trading_days = rows if frequency == "1d" else -(-rows // SESSION_MINUTES)
+    # Enough calendar days for that many trading days after weekends and holidays
+    end = date.fromordinal(START.toordinal() + trading_days * 3 // 2 + 30)
+    generator = MarketDataGenerator(START, end, frequency=frequency, seed=seed, halts_per_year=0,
+                                    late_listing_share=0, periods=rows)
+    names = symbol_names(symbols)
+    generator.write(directory, names)
+    return names
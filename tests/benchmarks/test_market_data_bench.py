@@ -0,0 +1,127 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.config import Config
+from assessment_app.models.db_models import Base
+from assessment_app.models.models import Portfolio
+from assessment_app.repository.database import get_db
+from assessment_app.repository.portfolio_repository import PortfolioRepository
+from assessment_app.routers import market_integration
+from assessment_app.routers.market_integration import get_stock_data, get_stock_data_range
+from assessment_app.service import price_store
+from assessment_app.service.price_store import PriceStore
+from assessment_app.utils.fast_json import dumps, tick_records
+from tests.benchmarks.price_files import write_price_files
+
+ROWS = [250, 10_000, 1_000_000]
+
+
+@pytest.fixture(scope="session")
+def price_data(tmp_path_factory):
+    """Get a warmed-up store of synthetic price files for (symbols, rows), written once per session"""
+    created = {}
+
+    def get(symbols, rows):
+        if (symbols, rows) not in created:
+            directory = str(tmp_path_factory.mktemp(f"prices-{symbols}x{rows}"))
+            names = write_price_files(directory, symbols, rows)
+            store = PriceStore(directory)
+            store.warmup(names)
+            created[symbols, rows] = (store, names)
+        return created[symbols, rows]
+
+    return get
+
+
+@pytest.fixture
+def use_prices(monkeypatch, price_data):
+    """Serve the app's price lookups from synthetic files"""
+    def use(symbols, rows):
+        store, names = price_data(symbols, rows)
+        monkeypatch.setitem(price_store._stores, Config.DATA_DIR, store)
+        return store, names
+
+    return use
+
+
+@pytest.mark.benchmark(group="tick lookup")
+@pytest.mark.parametrize("symbols,rows", [(4, 250), (4, 10_000), (4, 1_000_000), (1000, 250)])
+def test_tick_lookup(benchmark, use_prices, symbols, rows):
+    store, names = use_prices(symbols, rows)
+    day = store.get_frame(names[0])["Date"].iloc[rows // 2].to_pydatetime()
+
+    frames = benchmark(lambda: [get_stock_data(name, day) for name in names])
+    assert all(len(frame) for frame in frames)
+
+
+@pytest.mark.benchmark(group="range fetch")
+@pytest.mark.parametrize("rows", ROWS)
+def test_range_fetch(benchmark, use_prices, rows):
+    store, names = use_prices(4, rows)
+    start = store.get_frame(names[0])["Date"].iloc[0].to_pydatetime()
+
+    frame = benchmark(get_stock_data_range, names[0], start, start + timedelta(days=365))
+    assert len(frame)
+
+
+@pytest.mark.benchmark(group="range serialization")
+@pytest.mark.parametrize("rows", ROWS)
+def test_range_serialization(benchmark, use_prices, rows):
+    store, names = use_prices(4, rows)
+    frame = store.get_frame(names[0])
+
+    body = benchmark(lambda: dumps(tick_records(names[0], frame)))
+    assert body.startswith(b"[{")
+
+
+@pytest.fixture
+def trade_client(monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_AUTH", True)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", False)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    user_id = str(uuid.uuid4())
+    PortfolioRepository(session).create_portfolio(Portfolio(
+        id=str(uuid.uuid4()),
+        user_id=user_id,
+        cash_balance=1e12,
+        current_ts=datetime(1990, 1, 1),
+        net_worth=1e12,
+        created_at=datetime.now()
+    ))
+    app = FastAPI()
+    app.include_router(market_integration.router)
+    app.dependency_overrides[get_db] = lambda: session
+    client = TestClient(app, headers={"X-User-ID": user_id})
+    yield client
+    session.close()
+
+
+@pytest.mark.benchmark(group="trade execution")
+@pytest.mark.parametrize("rows", [250, 1_000_000])
+def test_trade_execution(benchmark, use_prices, trade_client, rows):
+    store, names = use_prices(4, rows)
+    frame = store.get_frame(names[0])
+    # The price is checked against the bar covering the execution time
+    bar = frame.iloc[-1]
+    trade = {
+        "stock_symbol": names[0],
+        "quantity": 1,
+        "price": (bar["Open"] + bar["Close"]) / 2,
+        "trade_type": "BUY",
+        "execution_ts": bar["Date"].isoformat(),
+    }
+
+    response = benchmark(trade_client.post, "/market/trade", json=trade)
+    assert response.status_code == 200, response.text
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.models.db_models import Base, PortfolioHolding as DBPortfolioHolding
+from assessment_app.models.models import Portfolio
+from assessment_app.repository.portfolio_repository import PortfolioRepository
+from assessment_app.service.analysis_service import AnalysisService
+from assessment_app.utils.utils import compute_cagr
+from tests.benchmarks.price_files import symbol_names
+
+
+@pytest.mark.benchmark(group="cagr")
+def test_compute_cagr(benchmark):
+    cagr = benchmark(compute_cagr, 100.0, 180.0, datetime(2015, 1, 1), datetime(2023, 7, 19))
+    assert cagr == pytest.approx(0.0712, abs=1e-4)
+
+
+@pytest.mark.benchmark(group="max drawdown")
+@pytest.mark.parametrize("rows", [250, 10_000, 1_000_000])
+def test_max_drawdown(benchmark, rows):
+    prices = (100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, rows)))).tolist()
+
+    drawdown = benchmark(AnalysisService()._calculate_max_drawdown, prices)
+    assert 0 < drawdown < 100
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.mark.benchmark(group="holdings")
+@pytest.mark.parametrize("symbols", [4, 1000])
+def test_get_all_holdings(benchmark, db_session, symbols):
+    repo = PortfolioRepository(db_session)
+    portfolio = repo.create_portfolio(Portfolio(
+        id=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+        cash_balance=10000.0,
+        current_ts=datetime(2023, 7, 18),
+        net_worth=10000.0,
+        created_at=datetime.now()
+    ))
+    db_session.add_all(
+        DBPortfolioHolding(id=str(uuid.uuid4()), portfolio_id=portfolio.id, stock_symbol=name,
+                           quantity=10, average_price=100.0, current_value=1000.0)
+        for name in symbol_names(symbols)
+    )
+    db_session.commit()
+
+    holdings = benchmark(repo.get_all_holdings, portfolio.user_id)
+    assert len(holdings) == symbols
@@ -0,0 +1,112 @@
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.models.db_models import Base, Group as DBGroup, Task as DBTask
+from assessment_app.repository.database import get_db
+from assessment_app.repository.tasks import TaskRepository
+from assessment_app.routers import groups, tasks
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(tasks.router)
+    app.include_router(groups.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def task_record(**overrides):
+    record = {
+        "name": "task",
+        "group_id": "group-1",
+        "start_date": "2025-06-03",
+        "end_date": "2025-06-07",
+        "estimated_effort": 8.0,
+        "weekdays": [1, 2, 3, 4],
+    }
+    record.update(overrides)
+    return record
+
+
+def test_json_import_reports_each_bad_row(client, db_session):
+    records = [
+        task_record(id="t1"),
+        task_record(start_date="2025-06-08"),
+        task_record(weekdays=[1, 1]),
+        task_record(weekdays=[7]),
+        task_record(name="", estimated_effort="lots"),
+        task_record(id="t1"),
+        task_record(weekdays=[4, 0], start_date="2025-06-02T09:30:00"),
+    ]
+    response = client.post("/tasks/bulk", json=records)
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["received"], body["inserted"], body["failed"]) == (7, 2, 5)
+    assert [(error["row"], error["field"]) for error in body["errors"]] == [
+        (1, "end_date"), (2, "weekdays"), (3, "weekdays"), (4, "name"), (4, "estimated_effort"), (5, "id"),
+    ]
+
+    stored = {task.id: task for task in db_session.query(DBTask).all()}
+    assert len(stored) == 2
+    assert stored["t1"].weekdays == [1, 2, 3, 4]
+    other = next(task for task_id, task in stored.items() if task_id != "t1")
+    assert other.weekdays == [0, 4]
+    assert other.start_date == datetime(2025, 6, 2, 9, 30)
+
+    # Existing ids are rejected on the next import
+    body = client.post("/tasks/bulk", json=[task_record(id="t1")]).json()
+    assert body["inserted"] == 0 and body["errors"][0]["message"] == "id already exists"
+
+
+def test_csv_upload_and_task_index(client, db_session):
+    task_repo = TaskRepository(db_session)
+    assert task_repo.tasks_for_day(date(2025, 6, 4)) == []
+    csv_data = (
+        "id,name,group_id,start_date,end_date,estimated_effort,weekdays\n"
+        "c1,first,group-1,2025-06-01,2025-06-30,6,\"0,2,4\"\n"
+        "c2,second,group-1,2025-06-01,2025-06-30,2,2\n"
+        "c3,third,group-1,not-a-date,2025-06-30,2,2\n"
+    )
+    response = client.post("/tasks/bulk", files={"file": ("plan.csv", csv_data, "text/csv")})
+    body = response.json()
+    assert (body["inserted"], body["failed"]) == (2, 1)
+    assert body["errors"][0]["field"] == "start_date"
+    # The bulk insert invalidates this worker's task index
+    assert [task.id for task in task_repo.tasks_for_day(date(2025, 6, 4))] == ["c1", "c2"]
+
+    response = client.post("/tasks/bulk", content=csv_data.replace("c", "d"),
+                           headers={"content-type": "text/csv"})
+    assert response.json()["inserted"] == 2
+
+
+def test_all_or_nothing_and_groups(client, db_session):
+    body = client.post("/tasks/bulk", params={"all_or_nothing": True},
+                       json=[task_record(), task_record(end_date="2025-01-01")]).json()
+    assert (body["inserted"], body["failed"]) == (0, 1)
+    assert db_session.query(DBTask).count() == 0
+
+    body = client.post("/groups/bulk", json=[{"id": "g1", "name": "one"}, {"name": "two"}, {"id": "g1", "name": "x"},
+                                             {"id": 3, "name": "three"}]).json()
+    assert (body["inserted"], body["failed"]) == (2, 2)
+    assert sorted(group.name for group in db_session.query(DBGroup).all()) == ["one", "two"]
+
+    assert client.post("/groups/bulk", json={"id": "g2"}).status_code == 400
+    assert client.post("/groups/bulk", content=b"[{", headers={"content-type": "application/json"}).status_code == 400
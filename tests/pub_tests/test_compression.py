@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from assessment_app.middleware.compression import CompressionMiddleware, choose_encoding
+from assessment_app.routers.market_integration import router as market_router
+
+LARGE_BODY = b'{"rows":[' + b",".join(b'{"price":%d.5}' % i for i in range(500)) + b"]}"
+
+
+def make_app():
+    app = FastAPI()
+    app.include_router(market_router)
+
+    @app.get("/large")
+    def large():
+        return Response(LARGE_BODY, media_type="application/json", headers={"ETag": '"abc"'})
+
+    @app.get("/image")
+    def image():
+        return Response(LARGE_BODY, media_type="image/png")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((b"symbol,price\n" * 100 for _ in range(3)), media_type="text/csv")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, encodings=["zstd", "br", "gzip"])
+    return app
+
+
+@pytest.fixture
+def client():
+    return TestClient(make_app())
+
+
+def call(app, path, accept_encoding):
+    """Run one request through the ASGI app and return the raw response messages"""
+    messages = []
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": [(b"accept-encoding", accept_encoding.encode())], "http_version": "1.1",
+             "scheme": "http", "server": ("test", 80), "client": ("test", 1), "root_path": ""}
+
+    async def run():
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+        complete = asyncio.Event()
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            # The client stays connected until the response is complete
+            await complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                complete.set()
+
+        await app(scope, receive, send)
+
+    asyncio.run(run())
+    return messages
+
+
+def test_choose_encoding():
+    preferred = ["zstd", "br", "gzip"]
+    assert choose_encoding("gzip, deflate", preferred) == "gzip"
+    assert choose_encoding("gzip;q=0.5, br", preferred) == "br"
+    assert choose_encoding("gzip;q=0, identity", preferred) is None
+    assert choose_encoding("", preferred) is None
+
+
+def test_large_json_is_gzipped(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert response.content == LARGE_BODY
+
+
+@pytest.mark.parametrize("module, encoding", [("zstandard", "zstd"), ("brotli", "br")])
+def test_preferred_encoding_is_used(client, module, encoding):
+    pytest.importorskip(module)
+    accept = "gzip, br" if encoding == "br" else "gzip, br, zstd"
+    response = client.get("/large", headers={"Accept-Encoding": accept})
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.content == LARGE_BODY
+
+
+def test_small_and_binary_responses_are_not_compressed(client):
+    tick = client.post("/market/data/tick", json={"stock_symbol": "RELIANCE", "current_ts": "2023-07-18T00:00:00"},
+                       headers={"Accept-Encoding": "gzip"})
+    assert tick.status_code == 200
+    assert "Content-Encoding" not in tick.headers
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in image.headers
+
+
+def test_streaming_response_is_compressed_per_chunk():
+    messages = call(make_app(), "/stream", "gzip")
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    chunks = [m["body"] for m in messages[1:]]
+    # Each chunk is flushed as it is produced, so a client can decode it before the next one
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(chunks[0]) == b"symbol,price\n" * 100
+    assert gzip.decompress(b"".join(chunks)) == b"symbol,price\n" * 300
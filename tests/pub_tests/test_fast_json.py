@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.models.db_models import Base, Portfolio as DBPortfolio, User as DBUser
+from assessment_app.models.models import Portfolio, TickData, Trade, TradePage, UserResponse
+from assessment_app.repository.portfolio_repository import PortfolioRepository
+from assessment_app.repository.trade_archive import ArchivedTrade
+from assessment_app.repository.user_repository import UserRepository
+from assessment_app.service.price_store import get_price_store
+from assessment_app.utils.fast_json import dumps, row_records, tick_records
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_tick_records_match_tick_data():
+    df = get_price_store().get_frame("RELIANCE").iloc[:50]
+    expected = [
+        TickData(
+            stock_symbol="RELIANCE",
+            timestamp=row['Date'],
+            price=(row['Open'] + row['Close']) / 2,
+            open_price=row['Open'],
+            high_price=row['High'],
+            low_price=row['Low'],
+            close_price=row['Close'],
+            volume=row['Volume']
+        )
+        for _, row in df.iterrows()
+    ]
+    assert json.loads(dumps(tick_records("RELIANCE", df))) == jsonable_encoder(expected)
+
+
+def test_trade_rows_match_trade_page():
+    ts = datetime(2023, 7, 18, 10, 15, 30, 250000)
+    rows = [ArchivedTrade("t1", "u1", "RELIANCE", 10, 2500.5, "BUY", ts, ts)]
+    expected = TradePage(trades=[Trade(**row._asdict()) for row in rows], next_cursor="abc")
+    body = dumps({"trades": row_records(rows), "next_cursor": "abc"})
+    assert body == expected.model_dump_json().encode()
+
+
+def test_dumps_handles_models_and_timestamps():
+    assert dumps({"ts": pd.Timestamp("2023-07-18 09:15")}) == b'{"ts":"2023-07-18T09:15:00"}'
+    user = UserResponse(id="u1", username="a", email="a@example.com", created_at=datetime(2023, 1, 1))
+    assert json.loads(dumps([user])) == jsonable_encoder([user])
+
+
+def test_user_rows_exclude_password(db_session):
+    db_session.add(DBUser(id="u1", username="a", email="a@example.com", hashed_password="secret"))
+    db_session.commit()
+    records = row_records(UserRepository(db_session).get_all_user_rows())
+    assert len(records) == 1
+    assert set(records[0]) == set(UserResponse.model_fields)
+
+
+def test_portfolio_rows_match_portfolios(db_session):
+    now = datetime(2023, 7, 18)
+    db_session.add(DBPortfolio(id="p1", user_id="u1", cash_balance=1000.0, current_ts=now,
+                               net_worth=1000.0, created_at=now))
+    db_session.commit()
+    portfolio_repo = PortfolioRepository(db_session)
+    expected = portfolio_repo.get_all_portfolios()
+    assert json.loads(dumps(row_records(portfolio_repo.get_all_portfolio_rows()))) == jsonable_encoder(expected)
+    assert isinstance(expected[0], Portfolio)
@@ -0,0 +1,101 @@
+import random
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.models.db_models import Base
+from assessment_app.models.models import Group, Task
+from assessment_app.repository.database import get_db
+from assessment_app.repository.group import GroupRepository
+from assessment_app.repository.tasks import TaskRepository
+from assessment_app.routers import groups
+from assessment_app.service.group_service import GroupService, WorkloadMatrix, weekday_masks
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db_session):
+    app = FastAPI()
+    app.include_router(groups.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    return TestClient(app)
+
+
+def add_tasks(db_session, group_id, count, seed=5):
+    GroupRepository(db_session).create_group(Group(id=group_id, name=group_id))
+    task_repo = TaskRepository(db_session)
+    rng = random.Random(seed)
+    for index in range(count):
+        start = datetime(2025, rng.randint(1, 2), rng.randint(1, 28), rng.randint(0, 23))
+        end = datetime(2025, rng.randint(3, 6), rng.randint(1, 28))
+        weekdays = sorted(rng.sample(range(7), rng.randint(1, 7)))
+        task_repo.create_task(Task(id=None, group_id=group_id, name=f"task-{index}", start_date=start, end_date=end,
+                                   estimated_effort=rng.uniform(1, 10), weekdays=weekdays))
+
+
+def test_sweep_matches_dense_matrix():
+    rng = np.random.default_rng(11)
+    n = 500
+    starts = np.datetime64("2025-01-01") + rng.integers(-30, 300, n)
+    ends = starts + rng.integers(0, 120, n)
+    masks = weekday_masks(sorted(set(rng.integers(0, 7, rng.integers(0, 5)).tolist())) for _ in range(n))
+    workload = WorkloadMatrix(date(2025, 2, 1), date(2025, 9, 30), [str(i) for i in range(n)],
+                              starts, ends, rng.uniform(1, 10, n), masks)
+
+    matrix = workload.effort_matrix()
+    assert matrix.shape == (242, len(workload.task_ids))
+    np.testing.assert_allclose(workload.totals, matrix.sum(axis=1), atol=1e-9)
+    np.testing.assert_array_equal(workload.active_tasks, (matrix > 0).sum(axis=1))
+
+    peaks = workload.peak_days(5)
+    assert workload.totals[peaks].tolist() == sorted(workload.totals, reverse=True)[:5]
+
+
+def test_workload_matches_tasks_for_range(db_session):
+    add_tasks(db_session, "g1", 60)
+    add_tasks(db_session, "g2", 10, seed=6)
+    content = GroupService(db_session).get_workload("g1", date(2025, 2, 10), date(2025, 5, 20))
+
+    ranges = TaskRepository(db_session).tasks_for_range(date(2025, 2, 10), date(2025, 5, 20))
+    assert [day["day"] for day in content["days"]] == [workload.day for workload in ranges]
+    for day, workload in zip(content["days"], ranges):
+        tasks = [task for task in workload.tasks if task.group_id == "g1"]
+        assert day["total_effort"] == pytest.approx(sum(task.estimated_effort for task in tasks))
+        assert day["active_tasks"] == len(tasks)
+
+
+def test_workload_endpoint(client, db_session):
+    add_tasks(db_session, "g1", 20)
+    response = client.get("/groups/g1/workload", params={"from": "2025-03-01", "to": "2025-03-31", "peaks": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["days"]) == 31
+    assert body["total_effort"] == pytest.approx(sum(day["total_effort"] for day in body["days"]))
+    assert [day["total_effort"] for day in body["peak_days"]] == \
+        sorted((day["total_effort"] for day in body["days"]), reverse=True)[:3]
+    assert body["effort_matrix"] is None
+
+    response = client.get("/groups/g1/workload", params={"from": "2025-03-01", "to": "2025-03-31", "matrix": True})
+    body = response.json()
+    assert len(body["effort_matrix"]) == 31
+    assert all(len(row) == len(body["task_ids"]) for row in body["effort_matrix"])
+
+    assert client.get("/groups/missing/workload", params={"from": "2025-03-01", "to": "2025-03-31"}).status_code == 404
+    assert client.get("/groups/g1/workload", params={"from": "2025-03-31", "to": "2025-03-01"}).status_code == 400
+    assert client.get("/groups/g1/workload", params={"from": "2025-01-01", "to": "2026-06-01"}).status_code == 400
@@ -0,0 +1,73 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from assessment_app.service.price_store import PriceStore
+from assessment_app.utils.market_data_generator import (
+    HEADER, MarketDataGenerator, ar1, trading_days, write_market_data
+)
+
+
+def test_trading_days_skip_weekends_and_holidays():
+    days = trading_days(date(2020, 1, 1), date(2022, 12, 31), 10, np.random.default_rng(0))
+    weekdays = pd.DatetimeIndex(days).weekday
+    assert (weekdays < 5).all()
+    per_year = pd.Series(1, index=pd.DatetimeIndex(days).year).groupby(level=0).sum()
+    all_weekdays = pd.Series(1, index=pd.bdate_range("2020-01-01", "2022-12-31").year).groupby(level=0).sum()
+    assert (per_year == all_weekdays - 10).all()
+
+
+def test_ar1_matches_recursion():
+    noise = np.random.default_rng(1).standard_normal((3000, 2))
+    expected = np.zeros_like(noise)
+    for t in range(len(noise)):
+        expected[t] = 0.9 * (expected[t - 1] if t else 0) + noise[t]
+    assert np.allclose(ar1(noise, 0.9), expected)
+
+
+def test_bars_are_consistent_and_correlated():
+    generator = MarketDataGenerator(date(2000, 1, 1), date(2009, 12, 31), correlation=0.5, halts_per_year=0,
+                                    late_listing_share=0)
+    bars = generator.generate(3)
+    assert bars["valid"].all()
+    assert (bars["Low"] <= np.minimum(bars["Open"], bars["Close"])).all()
+    assert (bars["High"] >= np.maximum(bars["Open"], bars["Close"])).all()
+    assert (bars["Volume"] >= 1).all()
+    returns = np.diff(np.log(bars["Close"]), axis=0)
+    correlation = np.corrcoef(returns.T)
+    assert (correlation[np.triu_indices(3, 1)] > 0.25).all()
+
+    uncorrelated = MarketDataGenerator(date(2000, 1, 1), date(2009, 12, 31), correlation=0).generate(2)
+    returns = np.diff(np.log(uncorrelated["Close"]), axis=0)
+    assert abs(np.corrcoef(returns.T)[0, 1]) < 0.1
+
+
+def test_written_files_load_in_price_store(tmp_path):
+    totals = write_market_data(str(tmp_path), symbols=3, start=date(2024, 1, 1), end=date(2024, 1, 31),
+                               names=["RELIANCE"], frequency="1min", halts_per_year=50, workers=2)
+    assert totals["files"] == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["RELIANCE.csv", "SYN00000.csv", "SYN00001.csv"]
+    assert (tmp_path / "RELIANCE.csv").read_bytes().startswith(HEADER)
+
+    frame = PriceStore(str(tmp_path)).get_frame("RELIANCE")
+    assert list(frame.columns) == ["Date", "Open", "High", "Low", "Close", "Adj Close", "Volume"]
+    minutes = frame["Date"].dt.hour * 60 + frame["Date"].dt.minute
+    assert minutes.between(9 * 60 + 15, 15 * 60 + 29).all()
+    assert frame["Date"].is_monotonic_increasing
+    assert (frame["Close"] == frame["Adj Close"]).all()
+    assert sum(len(PriceStore(str(tmp_path)).get_frame(name)) for name in ["RELIANCE", "SYN00000", "SYN00001"]) \
+        == totals["rows"]
+
+
+def test_existing_files_are_not_replaced_without_overwrite(tmp_path):
+    (tmp_path / "RELIANCE.csv").write_text("checked in")
+    with pytest.raises(FileExistsError):
+        write_market_data(str(tmp_path), symbols=2, start=date(2024, 1, 1), end=date(2024, 1, 31), names=["RELIANCE"])
+    assert (tmp_path / "RELIANCE.csv").read_text() == "checked in"
+    assert not (tmp_path / "SYN00000.csv").exists()
+
+    write_market_data(str(tmp_path), symbols=2, start=date(2024, 1, 1), end=date(2024, 1, 31), names=["RELIANCE"],
+                      overwrite=True)
+    assert (tmp_path / "RELIANCE.csv").read_bytes().startswith(HEADER)
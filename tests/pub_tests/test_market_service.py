@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime, timedelta
 from assessment_app.service.market_service import MarketService
+from assessment_app.service.price_store import get_price_store
 from assessment_app.models.models import Trade, TradeType, TickData
 import pandas as pd
 import os
@@ -177,4 +178,6 @@ def test_get_available_stocks(market_service):
     finally:
         # Clean up test files
         for stock in stocks:
-            os.remove(f"assessment_app/data/{stock}.csv") 
\ No newline at end of file
+            os.remove(f"assessment_app/data/{stock}.csv") 
+def test_shares_the_routers_price_store(market_service):
+    assert get_price_store(market_service.data_dir) is get_price_store()
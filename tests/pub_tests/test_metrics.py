@@ -0,0 +1,109 @@
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.middleware.metrics import MetricsMiddleware
+from assessment_app.models.db_models import Base, User as DBUser
+from assessment_app.repository.instrumentation import DB_QUERY_SECONDS, REPOSITORY_CALL_SECONDS
+from assessment_app.repository.user_repository import UserRepository
+from assessment_app.routers.metrics import router as metrics_router
+from assessment_app.utils.metrics import (
+    Counter, Histogram, MetricsRegistry, MultiprocessSnapshots, merge_snapshots, render
+)
+
+
+def count(histogram, *labels):
+    values = histogram.collect().get(labels)
+    return sum(values[:-1]) if values else 0
+
+
+def test_thread_shards_are_summed():
+    registry = MetricsRegistry()
+    counter = Counter("jobs_total", "Jobs", ["kind"], registry=registry)
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2)
+    assert counter.collect() == {("a",): [4000.0], ("b",): [2.0]}
+
+
+def test_render_histogram():
+    registry = MetricsRegistry()
+    histogram = Histogram("latency_seconds", "Latency", ["route"], buckets=[0.1, 1], registry=registry)
+    histogram.observe(0.05, 'say "hi"')
+    histogram.observe(0.5, 'say "hi"')
+    histogram.observe(5, 'say "hi"')
+    text = render(registry.snapshot())
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="0.1"} 1.0' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="1.0"} 2.0' in text
+    assert 'latency_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 3.0' in text
+    assert 'latency_seconds_count{route="say \\"hi\\""} 3.0' in text
+    assert 'latency_seconds_sum{route="say \\"hi\\""} 5.55' in text
+
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    registry = MetricsRegistry()
+    counter = Counter("jobs_total", "Jobs", ["kind"], registry=registry)
+    counter.inc("a", amount=3)
+    other_worker = {"jobs_total": {"type": "counter", "help": "Jobs", "labels": ["kind"], "buckets": [],
+                                   "samples": [[["a"], [4.0]], [["b"], [1.0]]]}}
+    (tmp_path / "worker_1_1.json").write_text(json.dumps(other_worker))
+
+    merged = MultiprocessSnapshots(str(tmp_path), registry=registry).collect()
+    assert sorted(merged["jobs_total"]["samples"]) == [[["a"], [7.0]], [["b"], [1.0]]]
+    assert merge_snapshots([]) == {}
+
+
+def test_repository_queries_are_attributed():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(DBUser(id="u1", username="a", email="a@example.com", hashed_password="x"))
+    db.commit()
+
+    labels = ("UserRepository", "get_user_by_email")
+    queries, calls = count(DB_QUERY_SECONDS, *labels), count(REPOSITORY_CALL_SECONDS, *labels)
+    assert UserRepository(db).get_user_by_email("a@example.com").id == "u1"
+    assert count(DB_QUERY_SECONDS, *labels) == queries + 1
+    assert count(REPOSITORY_CALL_SECONDS, *labels) == calls + 1
+    db.close()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app)
+
+
+def test_metrics_endpoint_reports_requests_by_route(client):
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/nowhere")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}' in text
+    assert "# TYPE cache_requests_total counter" in text
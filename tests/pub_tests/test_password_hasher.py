@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+
+from passlib.context import CryptContext
+
+from assessment_app.service.password_hasher import PasswordHasher
+
+
+def fast_context(rounds):
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(fast_context(4), max_workers=1)
+    hashed = asyncio.run(hasher.hash("secret"))
+    assert hashed.startswith("$2b$04$")
+    assert asyncio.run(hasher.verify("secret", hashed)) == (True, None)
+    assert asyncio.run(hasher.verify("wrong", hashed)) == (False, None)
+
+
+def test_verify_flags_outdated_cost_for_rehash():
+    old_hash = fast_context(4).hash("secret")
+    hasher = PasswordHasher(fast_context(5), max_workers=1)
+    verified, new_hash = asyncio.run(hasher.verify("secret", old_hash))
+    assert verified
+    assert new_hash.startswith("$2b$05$")
+    assert asyncio.run(hasher.verify("secret", new_hash)) == (True, None)
+
+
+def test_hashing_runs_off_the_event_loop(monkeypatch):
+    context = fast_context(4)
+    hasher = PasswordHasher(context, max_workers=2)
+    hashed = context.hash("secret")
+    worker_threads = []
+
+    def blocking(work):
+        def run(*args, **kwargs):
+            worker_threads.append(threading.get_ident())
+            # Stands in for an expensive hash; would stall every tick below if it ran on the loop
+            time.sleep(0.2)
+            return work(*args, **kwargs)
+        return run
+
+    monkeypatch.setattr(context, "hash", blocking(context.hash))
+    monkeypatch.setattr(context, "verify_and_update", blocking(context.verify_and_update))
+
+    async def hash_while_ticking():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        new_hash = await hasher.hash("secret")
+        verified = await hasher.verify("secret", hashed)
+        ticker.cancel()
+        return threading.get_ident(), new_hash, verified, ticks
+
+    loop_thread, new_hash, verified, ticks = asyncio.run(hash_while_ticking())
+    assert new_hash.startswith("$2b$04$")
+    assert verified == (True, None)
+    assert len(worker_threads) == 2
+    assert loop_thread not in worker_threads
+    # 0.4s of hashing leaves the loop free to run about 40 ticks
+    assert ticks >= 10
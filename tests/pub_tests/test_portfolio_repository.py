@@ -1,8 +1,9 @@
 import pytest
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from assessment_app.models.db_models import Base, Portfolio as DBPortfolio, PortfolioHolding as DBPortfolioHolding
+from assessment_app.models.db_models import Base, Portfolio as DBPortfolio, PortfolioHolding as DBPortfolioHolding, \
+    Trade as DBTrade
 from assessment_app.repository.portfolio_repository import PortfolioRepository
 from assessment_app.models.models import Portfolio, PortfolioHolding
 import uuid
@@ -95,4 +96,50 @@ def test_get_all_portfolios(portfolio_repo, test_portfolio):
     created_portfolio = portfolio_repo.create_portfolio(test_portfolio)
     portfolios = portfolio_repo.get_all_portfolios()
     assert len(portfolios) == 1
-    assert portfolios[0].id == created_portfolio.id 
\ No newline at end of file
+    assert portfolios[0].id == created_portfolio.id 
+
+def test_get_portfolio_for_trade_missing(portfolio_repo, test_user_id):
+    assert portfolio_repo.get_portfolio_for_trade(test_user_id) is None
+
+def test_portfolio_unit_of_work_single_flush(portfolio_repo, db_session, test_portfolio):
+    created_portfolio = portfolio_repo.create_portfolio(test_portfolio)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        unit_of_work = portfolio_repo.get_portfolio_for_trade(created_portfolio.user_id)
+        assert unit_of_work.get_holding("RELIANCE") is None
+        unit_of_work.portfolio.cash_balance -= 1000.0
+        unit_of_work.add_holding(DBPortfolioHolding(
+            id=str(uuid.uuid4()),
+            portfolio_id=created_portfolio.id,
+            stock_symbol="RELIANCE",
+            quantity=10,
+            average_price=100.0,
+            current_value=1000.0
+        ))
+        unit_of_work.add_trade(DBTrade(
+            id=str(uuid.uuid4()),
+            user_id=created_portfolio.user_id,
+            stock_symbol="RELIANCE",
+            quantity=10,
+            price=100.0,
+            trade_type="BUY",
+            execution_ts=datetime.now(),
+            created_at=datetime.now()
+        ))
+        unit_of_work.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # One SELECT for portfolio + holdings, then portfolio UPDATE, snapshot upsert and two INSERTs
+    assert len(statements) == 5
+    assert statements[0].lstrip().upper().startswith("SELECT")
+
+    holdings = portfolio_repo.get_all_holdings(created_portfolio.user_id)
+    assert len(holdings) == 1
+    assert holdings[0].quantity == 10
+    assert portfolio_repo.get_portfolio(created_portfolio.user_id).cash_balance == 99000.0
@@ -0,0 +1,126 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from assessment_app.models.db_models import Base, PortfolioHolding as DBPortfolioHolding, Trade as DBTrade, \
+    PositionSnapshot as DBPositionSnapshot
+from assessment_app.models.models import Portfolio
+from assessment_app.repository.portfolio_repository import PortfolioRepository
+from assessment_app.repository.position_snapshot_repository import PositionSnapshotRepository
+from assessment_app.service.position_service import PositionService
+import uuid
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db_session():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def portfolio(db_session):
+    return PortfolioRepository(db_session).create_portfolio(Portfolio(
+        id=str(uuid.uuid4()),
+        user_id=str(uuid.uuid4()),
+        cash_balance=10000.0,
+        current_ts=datetime(2023, 7, 18),
+        net_worth=10000.0,
+        created_at=datetime.now()
+    ))
+
+def buy(db_session, portfolio, quantity, price, execution_ts):
+    unit_of_work = PortfolioRepository(db_session).get_portfolio_for_trade(portfolio.user_id)
+    unit_of_work.portfolio.cash_balance -= quantity * price
+    unit_of_work.portfolio.current_ts = execution_ts
+    holding = unit_of_work.get_holding("RELIANCE")
+    if holding:
+        holding.average_price = (holding.quantity * holding.average_price + quantity * price) / (holding.quantity + quantity)
+        holding.quantity += quantity
+    else:
+        unit_of_work.add_holding(DBPortfolioHolding(
+            id=str(uuid.uuid4()),
+            portfolio_id=portfolio.id,
+            stock_symbol="RELIANCE",
+            quantity=quantity,
+            average_price=price,
+            current_value=quantity * price
+        ))
+    unit_of_work.add_trade(DBTrade(
+        id=str(uuid.uuid4()),
+        user_id=portfolio.user_id,
+        stock_symbol="RELIANCE",
+        quantity=quantity,
+        price=price,
+        trade_type="BUY",
+        execution_ts=execution_ts,
+        created_at=datetime.now()
+    ))
+    unit_of_work.commit()
+
+def test_create_portfolio_writes_opening_snapshot(db_session, portfolio):
+    snapshot = PositionSnapshotRepository(db_session).get_snapshot(portfolio.id, date(2023, 7, 18))
+    assert snapshot.cash_balance == 10000.0
+    assert snapshot.holdings == {}
+
+def test_trade_updates_end_of_day_snapshot(db_session, portfolio):
+    buy(db_session, portfolio, 10, 100.0, datetime(2023, 7, 19, 10))
+    buy(db_session, portfolio, 10, 110.0, datetime(2023, 7, 19, 15))
+    snapshot = PositionSnapshotRepository(db_session).get_snapshot(portfolio.id, date(2023, 7, 19))
+    assert snapshot.cash_balance == 7900.0
+    assert snapshot.holdings["RELIANCE"]["quantity"] == 20
+
+def test_positions_as_of_replays_trades_after_snapshot(db_session, portfolio):
+    buy(db_session, portfolio, 10, 100.0, datetime(2023, 7, 19))
+    buy(db_session, portfolio, 5, 100.0, datetime(2023, 7, 21))
+    # Drop the later snapshot so the position must be replayed from 2023-07-19
+    db_session.query(DBPositionSnapshot).filter(DBPositionSnapshot.snapshot_date == date(2023, 7, 21)).delete()
+    db_session.commit()
+
+    service = PositionService(db_session)
+    assert service.get_positions_as_of(portfolio, date(2023, 7, 17)) is None
+    cash_balance, holdings = service.get_positions_as_of(portfolio, date(2023, 7, 20))
+    assert cash_balance == 9000.0
+    assert holdings["RELIANCE"]["quantity"] == 10
+    cash_balance, holdings = service.get_positions_as_of(portfolio, date(2023, 7, 25))
+    assert cash_balance == 8500.0
+    assert holdings["RELIANCE"]["quantity"] == 15
+
+def test_valuation_and_profit_loss(db_session, portfolio, tmp_path):
+    (tmp_path / "RELIANCE.csv").write_text(
+        "Date,Open,High,Low,Close,Adj Close,Volume\n"
+        "2023-07-19,100,121,99,120,120,1000\n"
+    )
+    buy(db_session, portfolio, 10, 100.0, datetime(2023, 7, 19))
+    service = PositionService(db_session)
+    service.market_service.data_dir = str(tmp_path)
+    # 2023-07-20 has no bar, so the 2023-07-19 close is used
+    valuation = service.get_valuation(portfolio, date(2023, 7, 20))
+    assert valuation.net_worth == pytest.approx(9000.0 + 10 * 120.0)
+    profit_loss = service.get_profit_loss(portfolio, date(2023, 7, 18), date(2023, 7, 20))
+    assert profit_loss["profit_loss"] == pytest.approx(200.0)
+
+def test_value_and_compact_snapshots(db_session, portfolio):
+    for day in (19, 20, 21):
+        buy(db_session, portfolio, 1, 100.0, datetime(2023, 7, day))
+    buy(db_session, portfolio, 1, 100.0, datetime(2023, 8, 1))
+    service = PositionService(db_session)
+    assert service.value_snapshots() == 5
+    before = {day: service.get_positions_as_of(portfolio, date(2023, 7, day)) for day in (18, 19, 20)}
+    assert service.compact_snapshots(date(2023, 8, 1)) == 2
+    db_session.commit()
+
+    remaining = db_session.query(DBPositionSnapshot).order_by(DBPositionSnapshot.snapshot_date).all()
+    assert [s.snapshot_date for s in remaining] == [date(2023, 7, 18), date(2023, 7, 21), date(2023, 8, 1)]
+    # Days of the first month before its last snapshot still resolve from the first snapshot
+    for day, positions in before.items():
+        assert service.get_positions_as_of(portfolio, date(2023, 7, day)) == positions
+    assert all(s.net_worth is not None for s in remaining)
+    assert service.get_positions_as_of(portfolio, date(2023, 7, 25))[1]["RELIANCE"]["quantity"] == 3
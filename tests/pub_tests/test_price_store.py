@@ -0,0 +1,129 @@
+import os
+from datetime import date, datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from assessment_app.config import Config
+from assessment_app.repository.database import get_db
+from assessment_app.routers import market_integration
+from assessment_app.service import price_store as price_store_module
+from assessment_app.service.price_store import PriceStore, parse_interval, resample_bars
+from assessment_app.service.response_cache import response_cache
+
+CSV_HEADER = "Date,Open,High,Low,Close,Adj Close,Volume\n"
+
+@pytest.fixture
+def price_store(tmp_path):
+    (tmp_path / "RELIANCE.csv").write_text(CSV_HEADER + "2023-07-18,1,2,0.5,1.5,1.5,100\n")
+    (tmp_path / "HDFCBANK.csv").write_text(CSV_HEADER + "2023-07-18,3,4,2.5,3.5,3.5,200\n")
+    return PriceStore(str(tmp_path))
+
+def test_get_frame_is_cached(price_store):
+    df = price_store.get_frame("RELIANCE")
+    assert df.iloc[0]['Close'] == 1.5
+    assert str(df['Date'].dtype).startswith("datetime64")
+    assert price_store.get_frame("RELIANCE") is df
+
+def test_get_frame_reloads_changed_file(price_store, tmp_path):
+    df = price_store.get_frame("RELIANCE")
+    path = tmp_path / "RELIANCE.csv"
+    path.write_text(CSV_HEADER + "2023-07-18,1,2,0.5,1.5,1.5,100\n2023-07-19,1,2,0.5,1.75,1.75,100\n")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    reloaded = price_store.get_frame("RELIANCE")
+    assert reloaded is not df
+    assert len(reloaded) == 2
+
+def test_get_frame_missing_symbol(price_store):
+    assert price_store.get_frame("UNKNOWN") is None
+
+def test_warmup(price_store):
+    assert price_store.warmup(["RELIANCE", "HDFCBANK", "UNKNOWN"]) == 2
+    assert set(price_store._frames) == {"RELIANCE", "HDFCBANK"}
+
+MINUTE_BARS = (
+    "2024-01-02 09:15:00,100,101,99,100.5,100.5,10\n"
+    "2024-01-02 09:16:00,100.5,102,100,101.5,101.5,20\n"
+    "2024-01-02 09:17:00,101.5,101.5,98,99,99,30\n"
+    "2024-01-02 10:02:00,99,100,97,98,98,40\n"
+    "2024-01-03 09:15:00,98,99,96,97,97,50\n"
+)
+
+@pytest.fixture
+def minute_store(tmp_path):
+    (tmp_path / "RELIANCE.csv").write_text(CSV_HEADER + MINUTE_BARS)
+    return PriceStore(str(tmp_path))
+
+def test_bar_covering_timestamp(minute_store):
+    bars = minute_store.get_bars("RELIANCE")
+    assert bars.interval == 60 * 10 ** 9
+    assert bars.at(datetime(2024, 1, 2, 9, 16, 30)).iloc[0]['Close'] == 101.5
+    assert bars.at(datetime(2024, 1, 2, 9, 17)).iloc[0]['Close'] == 99
+    # Between bars, and before the session
+    assert bars.at(datetime(2024, 1, 2, 9, 30)).empty
+    assert bars.at(datetime(2024, 1, 2)).empty
+
+def test_daily_bar_covers_whole_day(price_store):
+    bars = price_store.get_bars("RELIANCE")
+    assert bars.at(datetime(2023, 7, 18, 15, 45)).iloc[0]['Close'] == 1.5
+    assert bars.at(datetime(2023, 7, 19)).empty
+
+def test_bars_between_respect_time_of_day(minute_store):
+    bars = minute_store.get_bars("RELIANCE")
+    df = bars.between(datetime(2024, 1, 2, 9, 16, 30), datetime(2024, 1, 2, 10, 2))
+    assert df['Volume'].tolist() == [20, 30, 40]
+    assert bars.last_before(date(2024, 1, 2)).iloc[0]['Volume'] == 40
+
+def test_resample_matches_pandas(minute_store):
+    df = minute_store.get_frame("RELIANCE")
+    for interval, rule in [("5m", "5min"), ("1h", "1h"), ("1d", "1D")]:
+        expected = df.set_index("Date").resample(rule).agg(
+            {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Adj Close": "last", "Volume": "sum"}
+        ).dropna().reset_index()
+        resampled = resample_bars(df, parse_interval(interval))
+        assert resampled['Date'].tolist() == expected['Date'].tolist()
+        for column in ["Open", "High", "Low", "Close", "Adj Close", "Volume"]:
+            assert resampled[column].tolist() == expected[column].tolist()
+
+def test_parse_interval_rejects_unknown_units():
+    assert parse_interval("1h") == 3_600 * 10 ** 9
+    for interval in ["", "0m", "5w", "m5"]:
+        with pytest.raises(ValueError):
+            parse_interval(interval)
+
+@pytest.fixture
+def market_client(monkeypatch, minute_store):
+    monkeypatch.setattr(Config, "SKIP_AUTH", True)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setitem(price_store_module._stores, Config.DATA_DIR, minute_store)
+    response_cache.invalidate_symbol("RELIANCE")
+    app = FastAPI()
+    app.include_router(market_integration.router)
+    app.dependency_overrides[get_db] = lambda: None
+    yield TestClient(app, headers={"X-User-ID": "trader"})
+    response_cache.invalidate_symbol("RELIANCE")
+
+def test_range_endpoint_resamples(market_client):
+    body = {"stock_symbol": "RELIANCE", "from_ts": "2024-01-02T09:16:00", "to_ts": "2024-01-03T09:15:00"}
+    response = market_client.post("/market/data/range", json=body)
+    assert [tick["volume"] for tick in response.json()] == [20, 30, 40, 50]
+
+    response = market_client.post("/market/data/range", json={**body, "interval": "1h"})
+    ticks = response.json()
+    # The first hour is widened to start at 09:00, so it includes the 09:15 bar
+    assert [(tick["timestamp"], tick["volume"]) for tick in ticks] == [
+        ("2024-01-02T09:00:00", 60), ("2024-01-02T10:00:00", 40), ("2024-01-03T09:00:00", 50)
+    ]
+    assert ticks[0]["open_price"] == 100 and ticks[0]["close_price"] == 99 and ticks[0]["low_price"] == 98
+
+    assert market_client.post("/market/data/range", json={**body, "interval": "30s"}).status_code == 400
+    assert market_client.post("/market/data/range", json={**body, "interval": "5x"}).status_code == 400
+
+def test_trade_checks_bar_at_execution_time(market_client):
+    trade = {"stock_symbol": "RELIANCE", "quantity": 1, "trade_type": "BUY", "execution_ts": "2024-01-02T09:16:20"}
+    response = market_client.post("/market/trade", json={**trade, "price": (100 + 100.5) / 2})
+    assert response.status_code == 400
+    assert "101.0" in response.json()["detail"]
+    trade["execution_ts"] = "2024-01-02T09:40:00"
+    assert market_client.post("/market/trade", json={**trade, "price": 101.0}).status_code == 404
@@ -0,0 +1,106 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from assessment_app.config import Config
+from assessment_app.models.db_models import Base
+from assessment_app.service import rate_limiter
+from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.service.rate_limiter import (
+    DatabaseWindowStore, RateLimit, RateLimiter, TokenBucketStore, parse_rate_limit_rules
+)
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rate_limit_rules():
+    rules = parse_rate_limit_rules("POST /market/trade=30/60; GET /trades=5/1;")
+    assert rules == {"POST /market/trade": RateLimit(30, 60.0), "GET /trades": RateLimit(5, 1.0)}
+
+
+def test_token_bucket_allows_burst_then_refills():
+    store = TokenBucketStore()
+    limit = RateLimit(3, 3)
+    assert [store.acquire("k", limit, 0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.acquire("k", limit, 0.0) == pytest.approx(1.0)
+    assert store.acquire("k", limit, 1.0) == 0.0
+    assert store.acquire("other", limit, 1.0) == 0.0
+
+
+def test_token_bucket_store_is_bounded():
+    store = TokenBucketStore(max_buckets=2)
+    for key in ["a", "b", "c"]:
+        store.acquire(key, RateLimit(1, 60), 0.0)
+    assert list(store._buckets) == ["b", "c"]
+
+
+@pytest.fixture
+def database_store():
+    Base.metadata.create_all(bind=engine)
+    yield DatabaseWindowStore(engine, max_period_seconds=10)
+    Base.metadata.drop_all(bind=engine)
+
+
+def test_database_store_shares_counts_between_workers(database_store):
+    other_worker = DatabaseWindowStore(engine, max_period_seconds=10)
+    limit = RateLimit(2, 10)
+    assert database_store.acquire("k", limit, 100.0) == 0.0
+    assert other_worker.acquire("k", limit, 101.0) == 0.0
+    assert database_store.acquire("k", limit, 102.0) == pytest.approx(8.0)
+
+
+def test_database_store_weights_previous_window(database_store):
+    limit = RateLimit(4, 10)
+    for _ in range(4):
+        assert database_store.acquire("k", limit, 105.0) == 0.0
+    # 25% into the next window, 75% of the previous four requests still count
+    assert database_store.acquire("k", limit, 112.5) == 0.0
+    assert database_store.acquire("k", limit, 112.5) == pytest.approx(2.5)
+    assert database_store.acquire("k2", limit, 112.5) == 0.0
+    assert database_store.acquire("k", limit, 115.0) == 0.0
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_AUTH", True)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    clock = FakeClock()
+    limiter = RateLimiter(TokenBucketStore(), RateLimit(100, 60), {"POST /orders/{order_id}": RateLimit(2, 60)}, clock)
+    monkeypatch.setattr(rate_limiter, "_rate_limiter", limiter)
+    app = FastAPI()
+
+    @app.post("/orders/{order_id}")
+    async def place_order(order_id: str, current_user_id: str = Depends(get_current_user_from_request)):
+        return {"order_id": order_id}
+
+    @app.get("/orders")
+    async def list_orders(current_user_id: str = Depends(get_current_user_from_request)):
+        return []
+
+    client = TestClient(app)
+    client.clock = clock
+    return client
+
+
+def test_limit_is_per_user_and_route(client):
+    alice, bob = {"X-User-ID": "alice"}, {"X-User-ID": "bob"}
+    assert client.post("/orders/1", headers=alice).status_code == 200
+    assert client.post("/orders/2", headers=alice).status_code == 200
+
+    response = client.post("/orders/3", headers=alice)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+    assert client.post("/orders/3", headers=bob).status_code == 200
+    assert client.get("/orders", headers=alice).status_code == 200
+    client.clock.now += 30
+    assert client.post("/orders/3", headers=alice).status_code == 200
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from assessment_app.routers.market_integration import router as market_router
+from assessment_app.service.price_store import get_price_store
+from assessment_app.service.response_cache import CachedResponse, ResponseCache, response_cache
+
+RANGE_REQUEST = {"stock_symbol": "RELIANCE", "from_ts": "2023-07-18T00:00:00", "to_ts": "2023-07-25T00:00:00"}
+
+
+def entry(size):
+    return CachedResponse(b"x" * size, '"etag"', True)
+
+
+def test_evicts_least_recently_used_by_size():
+    cache = ResponseCache(max_bytes=100)
+    cache.put(("/r", "A", 1), "A", entry(40))
+    cache.put(("/r", "A", 2), "A", entry(40))
+    assert cache.get(("/r", "A", 1)) is not None
+    cache.put(("/r", "B", 1), "B", entry(40))
+    assert cache.get(("/r", "A", 2)) is None
+    assert cache.size_bytes == 80
+    cache.put(("/r", "B", 2), "B", entry(101))
+    assert len(cache) == 2
+
+
+def test_invalidate_symbol_only_drops_that_symbol():
+    cache = ResponseCache(max_bytes=1000)
+    cache.put(("/r", "A", 1), "A", entry(10))
+    cache.put(("/r", "B", 1), "B", entry(10))
+    cache.invalidate_symbol("A")
+    assert cache.get(("/r", "A", 1)) is None
+    assert cache.get(("/r", "B", 1)) is not None
+    assert cache.size_bytes == 10
+
+
+@pytest.fixture
+def client():
+    response_cache.clear()
+    app = FastAPI()
+    app.include_router(market_router)
+    yield TestClient(app)
+    response_cache.clear()
+
+
+def test_range_is_cached_with_etag(client):
+    response = client.post("/market/data/range", json=RANGE_REQUEST)
+    assert response.status_code == 200
+    assert len(response.json()) == 6
+    assert response.headers["Cache-Control"].endswith("immutable")
+    etag = response.headers["ETag"]
+
+    # Bounds covering the same bars share an entry
+    same_days = dict(RANGE_REQUEST, to_ts="2023-07-25T15:30:00")
+    again = client.post("/market/data/range", json=same_days)
+    assert again.content == response.content
+    assert len(response_cache) == 1
+
+    # A range ending a day earlier covers other bars
+    shorter = client.post("/market/data/range", json=dict(RANGE_REQUEST, to_ts="2023-07-24T00:00:00"))
+    assert len(shorter.json()) == 5
+    assert len(response_cache) == 2
+
+    not_modified = client.post("/market/data/range", json=RANGE_REQUEST, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_range_reaching_last_bar_is_not_immutable(client):
+    response = client.post("/market/data/range", json=dict(RANGE_REQUEST, to_ts="2030-01-01T00:00:00"))
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, no-cache"
+
+
+def test_errors_are_not_cached(client):
+    response = client.post("/market/data/tick", json={"stock_symbol": "RELIANCE", "current_ts": "2020-01-01T00:00:00"})
+    assert response.status_code == 404
+    assert len(response_cache) == 0
+
+
+def test_reloading_symbol_invalidates_its_entries(client):
+    client.post("/market/data/range", json=RANGE_REQUEST)
+    client.post("/market/data/tick", json={"stock_symbol": "HDFCBANK", "current_ts": "2023-07-18T10:00:00"})
+    assert len(response_cache) == 2
+
+    path = get_price_store().path_for("RELIANCE")
+    stat = os.stat(path)
+    try:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        get_price_store().get_frame("RELIANCE")
+        assert len(response_cache) == 1
+    finally:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
@@ -0,0 +1,164 @@
+import time
+
+import pytest
+from datetime import datetime, timedelta
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from assessment_app.config import Config
+from assessment_app.models.db_models import Base, User as DBUser
+from assessment_app.repository.database import get_db
+from assessment_app.repository.revoked_token_repository import RevokedTokenRepository
+from assessment_app.routers import user_mgmt
+from assessment_app.service import auth_service
+from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.service.revocation_list import RevocationList
+from assessment_app.service.token_cache import VerifiedToken, token_cache
+from assessment_app.utils.bloom_filter import BloomFilter
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bloom_filter_has_no_false_negatives():
+    keys = [f"jti:{i}" for i in range(1000)]
+    bloom = BloomFilter(1000, 0.01, keys)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other:{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.fixture
+def db_session():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    revocations = RevocationList(capacity=1000)
+    monkeypatch.setattr(auth_service, "revocation_list", revocations)
+    monkeypatch.setattr(user_mgmt, "revocation_list", revocations)
+    return revocations
+
+
+@pytest.fixture
+def client(db_session, revocations, monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_AUTH", False)
+    token_cache.clear()
+    app = FastAPI()
+    app.include_router(user_mgmt.router)
+
+    @app.get("/whoami")
+    async def whoami(current_user_id: str = Depends(get_current_user_from_request)):
+        return {"user_id": current_user_id}
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    yield TestClient(app)
+    token_cache.clear()
+
+
+@pytest.fixture
+def user_id(db_session):
+    db_user = DBUser(username="revoke_user", email="revoke@example.com", hashed_password="x")
+    db_session.add(db_user)
+    db_session.commit()
+    return db_user.id
+
+
+def issue_token(user_id):
+    return user_mgmt.create_access_token({"sub": "revoke@example.com", "uid": user_id})
+
+
+def auth(token):
+    return {"Authorization": f"Bearer {token}", "X-User-ID": "ignored"}
+
+
+def test_logout_revokes_only_that_token(client, user_id):
+    token, other_token = issue_token(user_id), issue_token(user_id)
+    assert client.get("/whoami", headers=auth(token)).status_code == 200
+
+    assert client.post("/logout", headers=auth(token)).status_code == 200
+    response = client.get("/whoami", headers=auth(token))
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    assert client.get("/whoami", headers=auth(other_token)).status_code == 200
+
+
+def test_logout_all_revokes_earlier_tokens(client, user_id):
+    tokens = [issue_token(user_id) for _ in range(2)]
+    assert client.post("/logout/all", headers=auth(tokens[0])).status_code == 200
+    for token in tokens:
+        assert client.get("/whoami", headers=auth(token)).status_code == 401
+    assert client.get("/whoami", headers=auth(issue_token(user_id))).status_code == 200
+
+
+def test_bloom_miss_skips_revocation_lookup(db_session, revocations, user_id):
+    revocations.revoke_token(db_session, "revoked-jti", user_id)
+    revocations.refresh(db_session)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert not revocations.is_revoked(db_session, VerifiedToken("someone-else", "other-jti", 0))
+        assert statements == []
+        assert revocations.is_revoked(db_session, VerifiedToken(user_id, "revoked-jti", 0))
+        assert statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_user_revocation_is_checked_without_queries(db_session, revocations, user_id):
+    revocations.refresh(db_session)
+    revocations.revoke_user(db_session, user_id)
+    other_worker = RevocationList(capacity=1000)
+    other_worker.refresh(db_session)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        for worker in (revocations, other_worker):
+            assert worker.is_revoked(db_session, VerifiedToken(user_id, "old-jti", 0))
+            # Tokens issued after logging out everywhere, e.g. on the next login
+            assert not worker.is_revoked(db_session, VerifiedToken(user_id, "new-jti", time.time() + 1))
+        assert statements == []
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_revocation_reaches_other_workers_after_refresh(db_session, user_id):
+    clock = FakeClock()
+    worker_a = RevocationList(capacity=1000, refresh_seconds=30, clock=clock)
+    worker_b = RevocationList(capacity=1000, refresh_seconds=30, clock=clock)
+    token = VerifiedToken(user_id, "jti-1", 0)
+    assert not worker_b.is_revoked(db_session, token)
+
+    worker_a.revoke_token(db_session, "jti-1", user_id)
+    assert worker_a.is_revoked(db_session, token)
+    assert not worker_b.is_revoked(db_session, token)
+    clock.now += 30
+    assert worker_b.is_revoked(db_session, token)
+
+
+def test_delete_expired(db_session, user_id):
+    repo = RevokedTokenRepository(db_session)
+    repo.revoke_token("old", user_id, datetime.utcnow() - timedelta(minutes=1))
+    repo.revoke_token("live", user_id, datetime.utcnow() + timedelta(minutes=1))
+    assert repo.delete_expired(datetime.utcnow()) == 1
+    assert not repo.is_token_revoked("old")
+    assert repo.is_token_revoked("live")
@@ -0,0 +1,135 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.config import Config
+from assessment_app.models.db_models import Base
+from assessment_app.models.models import Group, Task
+from assessment_app.repository.database import get_db
+from assessment_app.repository.group import GroupRepository
+from assessment_app.repository.tasks import TaskRepository
+from assessment_app.routers import groups
+from assessment_app.service.group_service import WorkloadMatrix, weekday_masks
+from assessment_app.service.scheduler import WorkloadLeveler
+
+START = date(2025, 1, 6)
+
+
+def workload(windows, efforts, weekdays=None, days=3):
+    starts = np.array([np.datetime64(START) + first for first, _ in windows])
+    ends = np.array([np.datetime64(START) + last for _, last in windows])
+    weekdays = weekdays or [list(range(7))] * len(windows)
+    return WorkloadMatrix(START, date.fromordinal(START.toordinal() + days - 1), [f"t{i}" for i in range(len(windows))],
+                          starts, ends, np.array(efforts, dtype=float), weekday_masks(weekdays))
+
+
+def applied(matrix, leveler):
+    """The effort matrix after applying the leveler's moves"""
+    w = leveler.workload
+    scheduled = matrix.copy()
+    index = {task_id: column for column, task_id in enumerate(w.task_ids)}
+    for (task, source, target), amount in leveler.moves.items():
+        scheduled[source, task] -= amount
+        scheduled[target, task] += amount
+        assert matrix[target, index[w.task_ids[task]]] > 0, "work moved outside the task's days"
+    return scheduled
+
+
+def test_random_workload_is_leveled():
+    rng = np.random.default_rng(4)
+    n = 2000
+    first = rng.integers(0, 120, n)
+    windows = list(zip(first.tolist(), (first + rng.integers(0, 40, n)).tolist()))
+    weekdays = [sorted(set(rng.integers(0, 7, 4).tolist())) for _ in range(n)]
+    matrix_workload = workload(windows, rng.uniform(1, 8, n) * 7, weekdays, days=150)
+    capacity = matrix_workload.totals.mean() * 1.1
+
+    leveler = WorkloadLeveler(matrix_workload, capacity).level()
+    assert leveler.method in ("greedy", "min_cost_flow")
+    scheduled = applied(matrix_workload.effort_matrix(), leveler)
+    assert scheduled.min() > -1e-6
+    np.testing.assert_allclose(scheduled.sum(axis=1), leveler.loads, atol=1e-6)
+    np.testing.assert_allclose(scheduled.sum(axis=0), matrix_workload.effort_matrix().sum(axis=0), atol=1e-6)
+    schedule = leveler.schedule()
+    assert schedule["feasible"]
+    assert max(day["scheduled_effort"] for day in schedule["days"]) <= capacity + 1e-6
+
+
+def tight_year(seed=2):
+    """10k tasks over a year, with a capacity only 5% above the average day's effort"""
+    rng = np.random.default_rng(seed)
+    n = 10_000
+    first = rng.integers(0, 366, n)
+    windows = list(zip(first.tolist(), np.minimum(first + rng.integers(0, 120, n), 365).tolist()))
+    weekdays = [sorted(set(rng.integers(0, 7, 4).tolist())) for _ in range(n)]
+    matrix_workload = workload(windows, rng.uniform(1, 8, n) * 7, weekdays, days=366)
+    return matrix_workload, matrix_workload.totals.mean() * 1.05
+
+
+def test_tight_year_is_leveled_within_the_time_limit():
+    matrix_workload, capacity = tight_year()
+    leveler = WorkloadLeveler(matrix_workload, capacity, Config.SCHEDULE_FLOW_SECONDS).level()
+    schedule = leveler.schedule()
+    assert schedule["method"] == "min_cost_flow"
+    assert schedule["complete"] and schedule["feasible"]
+    assert leveler.loads.max() <= capacity + 1e-6
+    assert leveler.loads.sum() == pytest.approx(matrix_workload.totals.sum())
+
+
+def test_time_limit_leaves_schedule_incomplete_not_infeasible():
+    matrix_workload, capacity = tight_year()
+    schedule = WorkloadLeveler(matrix_workload, capacity, time_limit=0).level().schedule()
+    assert not schedule["complete"]
+    assert schedule["feasible"] is None
+    assert schedule["unresolved_effort"] > 0
+
+
+def test_chain_of_moves_when_no_direct_move_fits():
+    # Day 0 is over capacity, day 1 is full and only day 2 has room; t0 can't reach day 2,
+    # so t0 moves onto day 1 while t2 moves from day 1 onto day 2
+    leveler = WorkloadLeveler(workload([(0, 1), (0, 0), (1, 2)], [14, 14, 7]), capacity=3).level()
+    schedule = leveler.schedule()
+    assert schedule["method"] == "min_cost_flow"
+    assert schedule["feasible"]
+    assert [day["scheduled_effort"] for day in schedule["days"]] == pytest.approx([3, 3, 2])
+    assert [(move["task_id"], move["from_day"].day, move["to_day"].day, move["effort"]) for move in schedule["moves"]] \
+        == [("t0", 6, 7, pytest.approx(1)), ("t2", 7, 8, pytest.approx(1))]
+
+
+def test_infeasible_excess_is_reported():
+    schedule = WorkloadLeveler(workload([(0, 0), (1, 1), (0, 2)], [35, 7, 21]), capacity=4).level().schedule()
+    assert schedule["feasible"] is False and schedule["complete"]
+    assert schedule["unresolved_effort"] == pytest.approx(3)
+    assert [day["scheduled_effort"] for day in schedule["days"]] == pytest.approx([7, 4, 4])
+
+
+def test_schedule_endpoint():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db_session = sessionmaker(bind=engine)()
+    GroupRepository(db_session).create_group(Group(id="g1", name="g1"))
+    task_repo = TaskRepository(db_session)
+    for name, start, end in [("a", 2, 2), ("b", 2, 6), ("c", 3, 4)]:
+        task_repo.create_task(Task(id=name, group_id="g1", name=name, start_date=datetime(2025, 6, start),
+                                   end_date=datetime(2025, 6, end), estimated_effort=35, weekdays=[0, 1, 2, 3, 4]))
+    app = FastAPI()
+    app.include_router(groups.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(app)
+
+    params = {"from": "2025-06-02", "to": "2025-06-06", "capacity": 12}
+    body = client.get("/groups/g1/schedule", params=params).json()
+    assert body["feasible"] and body["complete"] and body["method"] == "greedy"
+    assert [day["original_effort"] for day in body["days"]] == [14, 14, 14, 7, 7]
+    assert all(day["scheduled_effort"] <= 12 for day in body["days"])
+    assert sum(move["effort"] for move in body["moves"]) == pytest.approx(body["moved_effort"])
+
+    assert client.get("/groups/g1/schedule", params={**params, "capacity": 0}).status_code == 422
+    assert client.get("/groups/nope/schedule", params=params).status_code == 404
+    db_session.close()
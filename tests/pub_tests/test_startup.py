@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import assessment_app.main as main
+from assessment_app.config import Config
+from assessment_app.service.price_store import get_price_store
+
+
+def test_app_imports_without_database():
+    env = {**os.environ, "TESTING": "false", "POSTGRES_HOST": "nonexistent.invalid"}
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import assessment_app.main, assessment_app.repository.database as database; "
+         "assert database._engine is None"],
+        env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+
+@pytest.fixture
+def init_db_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "init_db", lambda: calls.append(True))
+    return calls
+
+def test_lifespan_runs_ddl_and_warmup(init_db_calls, monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_DDL", False)
+    monkeypatch.setattr(Config, "WARMUP_MARKET_DATA", True)
+    with TestClient(main.app) as client:
+        assert client.get("/").status_code == 200
+    assert init_db_calls == [True]
+    assert get_price_store()._frames
+
+def test_lifespan_skip_ddl(init_db_calls, monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_DDL", True)
+    with TestClient(main.app):
+        pass
+    assert init_db_calls == []
@@ -0,0 +1,96 @@
+import random
+from datetime import date, datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.models.db_models import Base, Task as DBTask
+from assessment_app.models.models import Task
+from assessment_app.repository.task_index import get_task_index
+from assessment_app.repository.tasks import TaskRepository
+from assessment_app.utils.interval_tree import IntervalTree
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def make_task(name, start, end, effort, weekdays):
+    return Task(id=None, group_id="group-1", name=name, start_date=start, end_date=end,
+                estimated_effort=effort, weekdays=weekdays)
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    intervals = []
+    for item in range(300):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 50), item))
+    tree = IntervalTree(intervals[:200])
+    for start, end, item in intervals[200:]:
+        tree.add(start, end, item)
+    assert len(tree) == 300
+
+    for point in range(-5, 1060, 7):
+        expected = {item for start, end, item in intervals if start <= point <= end}
+        assert set(tree.at(point)) == expected
+    for low in range(0, 1000, 37):
+        high = low + 20
+        expected = {item for start, end, item in intervals if start <= high and end >= low}
+        assert set(tree.overlapping(low, high)) == expected
+
+
+def test_tasks_for_day_checks_weekday(db_session):
+    task_repo = TaskRepository(db_session)
+    # 2025-06-03 is a Tuesday; weekdays use date.weekday(), so 1-4 is Tuesday to Friday
+    task_repo.create_task(make_task("weekdays", datetime(2025, 6, 3), datetime(2025, 6, 7), 8.0, [1, 2, 3, 4]))
+    task_repo.create_task(make_task("weekend", datetime(2025, 6, 1), datetime(2025, 6, 30), 4.0, [5, 6]))
+
+    tuesday = task_repo.tasks_for_day(datetime(2025, 6, 3, 15, 30))
+    assert [(task.name, task.estimated_effort) for task in tuesday] == [("weekdays", 2.0)]
+    saturday = task_repo.tasks_for_day(date(2025, 6, 7))
+    assert [(task.name, task.estimated_effort) for task in saturday] == [("weekend", 2.0)]
+    assert task_repo.tasks_for_day(date(2025, 6, 9)) == []
+
+
+def test_tasks_for_range_matches_daily_queries(db_session):
+    task_repo = TaskRepository(db_session)
+    rng = random.Random(3)
+    for index in range(40):
+        start = datetime(2025, 1, 1 + rng.randint(0, 27))
+        end = datetime(2025, rng.randint(2, 4), rng.randint(1, 28))
+        weekdays = sorted(rng.sample(range(7), rng.randint(1, 5)))
+        task_repo.create_task(make_task(f"task-{index}", start, end, rng.uniform(1, 20), weekdays))
+
+    workloads = task_repo.tasks_for_range(date(2025, 1, 20), date(2025, 3, 10))
+    assert len(workloads) == 50
+    for workload in workloads:
+        daily = task_repo.tasks_for_day(workload.day)
+        assert workload.tasks == daily
+        assert workload.total_effort == pytest.approx(sum(task.estimated_effort for task in daily))
+
+    with pytest.raises(HTTPException):
+        task_repo.tasks_for_range(date(2025, 2, 1), date(2025, 1, 1))
+
+
+def test_index_refresh_picks_up_other_workers_tasks(db_session):
+    task_repo = TaskRepository(db_session)
+    assert task_repo.tasks_for_day(date(2025, 6, 4)) == []
+    # Written by another worker, so this process's index has not seen it yet
+    db_session.add(DBTask(id="t1", group_id="group-1", name="remote", start_date=datetime(2025, 6, 1),
+                          end_date=datetime(2025, 6, 30), estimated_effort=5.0, weekdays=[2]))
+    db_session.commit()
+    assert task_repo.tasks_for_day(date(2025, 6, 4)) == []
+
+    get_task_index(db_session).refresh(db_session)
+    assert [task.id for task in task_repo.tasks_for_day(date(2025, 6, 4))] == ["t1"]
@@ -0,0 +1,137 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from assessment_app.config import Config
+from assessment_app.models.db_models import Base, User as DBUser
+from assessment_app.repository.database import get_db
+from assessment_app.service import auth_service
+from assessment_app.service.auth_service import get_current_user_from_request
+from assessment_app.service.revocation_list import RevocationList
+from assessment_app.service.token_cache import TokenCache, VerifiedToken, token_cache
+
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TokenCache(max_size=2, ttl_seconds=60)
+    cache.put("a", VerifiedToken("user-a", None, None))
+    cache.put("b", VerifiedToken("user-b", None, None))
+    assert cache.get("a").user_id == "user-a"
+    cache.put("c", VerifiedToken("user-c", None, None))
+    assert cache.get("b") is None
+    assert cache.get("a").user_id == "user-a"
+    assert len(cache) == 2
+
+
+def test_cache_expires_at_ttl_or_token_exp():
+    clock = FakeClock()
+    cache = TokenCache(max_size=10, ttl_seconds=60, clock=clock)
+    cache.put("long", VerifiedToken("user-a", None, None))
+    cache.put("short", VerifiedToken("user-a", None, None), token_exp=clock.now + 5)
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("long").user_id == "user-a"
+    clock.now += 60
+    assert cache.get("long") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_user():
+    cache = TokenCache(max_size=10, ttl_seconds=60)
+    cache.put("a1", VerifiedToken("user-a", None, None))
+    cache.put("a2", VerifiedToken("user-a", None, None))
+    cache.put("b1", VerifiedToken("user-b", None, None))
+    cache.invalidate_user("user-a")
+    assert cache.get("a1") is None
+    assert cache.get("a2") is None
+    assert cache.get("b1").user_id == "user-b"
+
+
+@pytest.fixture
+def db_session():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    monkeypatch.setattr(Config, "SKIP_AUTH", False)
+    monkeypatch.setattr(auth_service, "revocation_list", RevocationList())
+    token_cache.clear()
+    app = FastAPI()
+
+    @app.get("/whoami")
+    async def whoami(current_user_id: str = Depends(get_current_user_from_request)):
+        return {"user_id": current_user_id}
+
+    app.dependency_overrides[get_db] = lambda: db_session
+    yield TestClient(app)
+    token_cache.clear()
+
+
+@pytest.fixture
+def user(db_session):
+    db_user = DBUser(username="cache_user", email="cache@example.com", hashed_password="x")
+    db_session.add(db_user)
+    db_session.commit()
+    return db_user
+
+
+def make_token(claims):
+    claims = dict(claims, exp=datetime.utcnow() + timedelta(minutes=5))
+    return jwt.encode(claims, Config.SECRET_KEY, algorithm=Config.ALGORITHM)
+
+
+def whoami(client, token):
+    return client.get("/whoami", headers={"Authorization": f"Bearer {token}", "X-User-ID": "ignored"})
+
+
+def test_verified_token_skips_user_lookup(client, user):
+    user_id, email = user.id, user.email
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        token = make_token({"sub": email, "uid": user_id})
+        assert whoami(client, token).json() == {"user_id": user_id}
+        assert any("FROM users" in statement for statement in statements)
+        statement_count = len(statements)
+        assert whoami(client, token).json() == {"user_id": user_id}
+        assert len(statements) == statement_count
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_token_without_uid_resolved_by_email(client, user):
+    response = whoami(client, make_token({"sub": user.email}))
+    assert response.status_code == 200
+    assert response.json() == {"user_id": user.id}
+
+
+def test_unknown_user_is_rejected_and_not_cached(client, user):
+    token = make_token({"sub": "nobody@example.com", "uid": "missing"})
+    assert whoami(client, token).status_code == 401
+    assert token_cache.get(token) is None
+
+
+def test_invalid_token_is_rejected(client):
+    assert whoami(client, "not-a-jwt").status_code == 401
@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jose import JWTError, jwt
+
+from assessment_app.config import Config
+from assessment_app.service.token_service import Keyring
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_key(keys_dir, kid, private_key, mtime):
+    path = keys_dir / f"{kid}.pem"
+    path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    os.utime(path, (mtime, mtime))
+    os.utime(keys_dir, (mtime, mtime))
+
+
+def write_jwks(path, keyring):
+    path.write_text(json.dumps(keyring.jwks()))
+
+
+def test_eddsa_sign_and_verify(tmp_path):
+    write_key(tmp_path, "k1", ed25519.Ed25519PrivateKey.generate(), 1000)
+    keyring = Keyring(keys_dir=str(tmp_path), jwks_url=None)
+    token = keyring.encode({"sub": "a@example.com"})
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+    assert jwt.get_unverified_header(token)["alg"] == "EdDSA"
+    assert keyring.decode(token)["sub"] == "a@example.com"
+
+    header, payload, signature = token.split(".")
+    forged = ".".join([header, payload, signature[:-4] + ("AAAA" if signature[-4:] != "AAAA" else "BBBB")])
+    with pytest.raises(JWTError):
+        keyring.decode(forged)
+
+
+def test_rotation_keeps_old_tokens_valid_until_key_removed(tmp_path):
+    write_key(tmp_path, "k1", ed25519.Ed25519PrivateKey.generate(), 1000)
+    keyring = Keyring(keys_dir=str(tmp_path), jwks_url=None)
+    old_token = keyring.encode({"sub": "a@example.com"})
+
+    write_key(tmp_path, "k2", rsa.generate_private_key(public_exponent=65537, key_size=2048), 2000)
+    new_token = keyring.encode({"sub": "a@example.com"})
+    assert jwt.get_unverified_header(new_token)["kid"] == "k2"
+    assert jwt.get_unverified_header(new_token)["alg"] == "RS256"
+    assert keyring.decode(old_token)["sub"] == "a@example.com"
+
+    os.remove(tmp_path / "k1.pem")
+    os.utime(tmp_path, (3000, 3000))
+    with pytest.raises(JWTError):
+        keyring.decode(old_token)
+    assert keyring.decode(new_token)["sub"] == "a@example.com"
+
+
+def test_verifier_uses_jwks_without_secret(tmp_path):
+    keys_dir = tmp_path / "keys"
+    keys_dir.mkdir()
+    write_key(keys_dir, "k1", ed25519.Ed25519PrivateKey.generate(), 1000)
+    signer = Keyring(keys_dir=str(keys_dir), jwks_url=None)
+    jwks_path = tmp_path / "jwks.json"
+    write_jwks(jwks_path, signer)
+    assert all("d" not in key for key in json.loads(jwks_path.read_text())["keys"])
+
+    clock = FakeClock()
+    verifier = Keyring(keys_dir=None, jwks_url=str(jwks_path), clock=clock)
+    assert verifier.decode(signer.encode({"sub": "a@example.com"}))["sub"] == "a@example.com"
+    with pytest.raises(RuntimeError):
+        verifier.encode({"sub": "a@example.com"})
+
+    # The signer rotates; the verifier picks up the new kid on first sight
+    write_key(keys_dir, "k2", ed25519.Ed25519PrivateKey.generate(), 2000)
+    rotated_token = signer.encode({"sub": "a@example.com"})
+    write_jwks(jwks_path, signer)
+    clock.now += Config.JWKS_MIN_REFETCH_SECONDS
+    assert verifier.decode(rotated_token)["sub"] == "a@example.com"
+
+
+def test_hmac_fallback_accepts_tokens_without_kid():
+    keyring = Keyring(keys_dir=None, jwks_url=None, secret_key="test-secret")
+    token = keyring.encode({"sub": "a@example.com"})
+    assert jwt.get_unverified_header(token)["alg"] == "HS256"
+    legacy_token = jwt.encode({"sub": "a@example.com"}, "test-secret", algorithm="HS256")
+    assert keyring.decode(legacy_token)["sub"] == "a@example.com"
+    with pytest.raises(JWTError):
+        keyring.decode(jwt.encode({"sub": "a@example.com"}, "other-secret", algorithm="HS256"))
+    assert keyring.jwks() == {"keys": []}
+
+
+def test_unreachable_jwks_is_an_invalid_token(tmp_path):
+    token = jwt.encode({"sub": "a@example.com"}, "test-secret", algorithm="HS256", headers={"kid": "k1"})
+    for jwks_url in [str(tmp_path / "missing.json"), "http://127.0.0.1:9/jwks.json"]:
+        with pytest.raises(JWTError):
+            Keyring(keys_dir=None, jwks_url=jwks_url, clock=FakeClock()).decode(token)
+    (tmp_path / "broken.json").write_text("{not json")
+    with pytest.raises(JWTError):
+        Keyring(keys_dir=None, jwks_url=str(tmp_path / "broken.json"), clock=FakeClock()).decode(token)
+
+
+def test_failed_refresh_keeps_cached_keys_and_backs_off(tmp_path, monkeypatch):
+    keys_dir = tmp_path / "keys"
+    keys_dir.mkdir()
+    write_key(keys_dir, "k1", ed25519.Ed25519PrivateKey.generate(), 1000)
+    signer = Keyring(keys_dir=str(keys_dir), jwks_url=None)
+    jwks_path = tmp_path / "jwks.json"
+    write_jwks(jwks_path, signer)
+    clock = FakeClock()
+    verifier = Keyring(keys_dir=None, jwks_url=str(jwks_path), clock=clock)
+    token = signer.encode({"sub": "a@example.com"})
+    assert verifier.decode(token)["sub"] == "a@example.com"
+
+    # The JWKS goes away; a stale refresh runs in the background and the cached key keeps verifying
+    os.remove(jwks_path)
+    clock.now += Config.JWKS_REFRESH_SECONDS
+    assert verifier.decode(token)["sub"] == "a@example.com"
+    verifier._jwks_refresh.join()
+    assert verifier._jwks_loaded_at == clock.now
+    assert verifier.decode(token)["sub"] == "a@example.com"
+
+    # Unknown kids don't refetch again until the backoff has passed
+    fetches = []
+    monkeypatch.setattr(verifier, "_fetch_jwks", lambda: fetches.append(1) or {"keys": []})
+    unknown = jwt.encode({"sub": "a@example.com"}, "x", algorithm="HS256", headers={"kid": "k9"})
+    with pytest.raises(JWTError):
+        verifier.decode(unknown)
+    assert fetches == []
+    clock.now += Config.JWKS_MIN_REFETCH_SECONDS
+    with pytest.raises(JWTError):
+        verifier.decode(unknown)
+    assert fetches == [1]
@@ -0,0 +1,102 @@
+import io
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from assessment_app.config import Config
+from assessment_app.middleware.tracing import TracingMiddleware
+from assessment_app.repository import instrumentation  # noqa: F401  registers the SQL event listeners
+from assessment_app.service.price_store import get_price_store
+from assessment_app.utils.fast_json import json_response
+from assessment_app.utils.tracing import JsonLinesExporter, NON_RECORDING_SPAN, span
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture
+def exported():
+    return io.StringIO()
+
+
+@pytest.fixture
+def client(exported):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    app = FastAPI()
+
+    @app.get("/fast")
+    def fast():
+        return {"ok": True}
+
+    @app.get("/slow/{stock_symbol}")
+    def slow(stock_symbol: str):
+        get_price_store().get_frame(stock_symbol)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        time.sleep(0.06)
+        return json_response({"ok": True})
+
+    @app.get("/queries/{count}")
+    def queries(count: int):
+        with engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(text("SELECT 1"))
+        time.sleep(0.06)
+        return {"ok": True}
+
+    @app.get("/broken")
+    def broken():
+        raise RuntimeError("boom")
+
+    app.add_middleware(TracingMiddleware, exporter=JsonLinesExporter(stream=exported), slow_threshold_ms=50)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def spans_of(exported):
+    lines = exported.getvalue().splitlines()
+    return [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"] for line in lines]
+
+
+def test_span_is_a_no_op_outside_a_request():
+    with span("work") as current:
+        assert current is NON_RECORDING_SPAN
+
+
+def test_fast_requests_are_dropped(client, exported):
+    assert client.get("/fast").status_code == 200
+    assert exported.getvalue() == ""
+
+
+def test_slow_requests_export_every_stage(client, exported):
+    assert client.get("/slow/RELIANCE", headers={"traceparent": TRACEPARENT}).status_code == 200
+    [spans] = spans_of(exported)
+    by_name = {item["name"]: item for item in spans}
+    root = by_name["GET /slow/{stock_symbol}"]
+    # The caller's trace is continued
+    assert root["traceId"] == "0af7651916cd43dd8448eb211c80319c"
+    assert root["parentSpanId"] == "b7ad6b7169203331"
+    for name in ["price_store.get_frame", "db.query", "serialize"]:
+        assert by_name[name]["parentSpanId"] == root["spanId"]
+    statement = next(a for a in by_name["db.query"]["attributes"] if a["key"] == "db.statement")
+    assert statement["value"]["stringValue"] == "SELECT 1"
+
+
+def test_server_errors_are_always_exported(client, exported):
+    assert client.get("/broken").status_code == 500
+    [spans] = spans_of(exported)
+    assert spans[0]["status"] == {"code": 2}
+
+
+def test_root_span_survives_the_span_cap(client, exported, monkeypatch):
+    monkeypatch.setattr(Config, "TRACE_MAX_SPANS", 3)
+    assert client.get("/queries/5").status_code == 200
+    [spans] = spans_of(exported)
+    assert len(spans) == 3
+    root = next(item for item in spans if item["name"] == "GET /queries/{count}")
+    assert [item["name"] for item in spans if item is not root] == ["db.query", "db.query"]
+    dropped = next(a for a in root["attributes"] if a["key"] == "trace.dropped_spans")
+    assert dropped["value"] == {"intValue": "3"}
@@ -3,9 +3,17 @@ from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from assessment_app.models.db_models import Base, Trade as DBTrade
+from assessment_app.repository.trade_archive import TradeArchive
 from assessment_app.repository.trade_repository import TradeRepository
 from assessment_app.models.models import Trade, TradeType
+import pandas as pd
 import uuid
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from assessment_app.config import Config
+from assessment_app.repository.database import get_db
+from assessment_app.routers import trades
 
 # Create test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -88,4 +96,104 @@ def test_get_trades_by_time_range(trade_repo, test_trade):
 def test_delete_trade(trade_repo, test_trade):
     created_trade = trade_repo.create_trade(test_trade)
     trade_repo.delete_trade(created_trade.id)
-    assert trade_repo.get_trade(created_trade.id) is None 
\ No newline at end of file
+    assert trade_repo.get_trade(created_trade.id) is None 
+
+def create_user_trades(trade_repo, user_id, count):
+    base_ts = datetime(2023, 7, 19)
+    trades = []
+    for i in range(count):
+        # Pairs share an execution_ts so the id tie-breaker is exercised
+        trades.append(trade_repo.create_trade(DBTrade(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            stock_symbol="RELIANCE",
+            quantity=1,
+            price=100.0,
+            trade_type="BUY",
+            execution_ts=base_ts + timedelta(days=i // 2),
+            created_at=datetime.now()
+        )))
+    return sorted(trades, key=lambda t: (t.execution_ts, t.id))
+
+def test_get_user_trades_page(trade_repo, test_user_id):
+    expected = [t.id for t in create_user_trades(trade_repo, test_user_id, 7)]
+    seen = []
+    after = None
+    while True:
+        rows = trade_repo.get_user_trades_page(test_user_id, after, limit=3)
+        seen.extend(row.id for row in rows)
+        if len(rows) < 3:
+            break
+        after = (rows[-1].execution_ts, rows[-1].id)
+    assert seen == expected
+
+def test_get_trades_by_time_range_page(trade_repo, test_user_id):
+    create_user_trades(trade_repo, test_user_id, 6)
+    rows = trade_repo.get_trades_by_time_range_page(datetime(2023, 7, 20), datetime(2023, 7, 21), limit=10)
+    assert len(rows) == 4
+    assert all(datetime(2023, 7, 20) <= row.execution_ts <= datetime(2023, 7, 21) for row in rows)
+
+def test_trades_range_endpoint_only_returns_own_trades(monkeypatch, db_session, trade_repo):
+    monkeypatch.setattr(Config, "SKIP_AUTH", True)
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", False)
+    user_a, user_b = str(uuid.uuid4()), str(uuid.uuid4())
+    own = [t.id for t in create_user_trades(trade_repo, user_b, 2)]
+    create_user_trades(trade_repo, user_a, 4)
+    app = FastAPI()
+    app.include_router(trades.router)
+    app.dependency_overrides[get_db] = lambda: db_session
+    client = TestClient(app)
+
+    params = {"start_ts": "2023-07-01T00:00:00", "end_ts": "2023-08-01T00:00:00"}
+    response = client.get("/trades/range", params=params, headers={"X-User-ID": user_b})
+    assert response.status_code == 200
+    assert [trade["id"] for trade in response.json()["trades"]] == own
+
+def test_stream_user_trades(trade_repo, test_user_id):
+    expected = [t.id for t in create_user_trades(trade_repo, test_user_id, 5)]
+    assert [row.id for row in trade_repo.stream_user_trades(test_user_id, batch_size=2)] == expected
+
+@pytest.fixture
+def archived_trade_repo(db_session, tmp_path, test_user_id):
+    pytest.importorskip("pyarrow")
+    archive = TradeArchive(str(tmp_path))
+    archive.write_month(2023, 6, pd.DataFrame([
+        {
+            "id": f"archived-{i}",
+            "user_id": test_user_id,
+            "stock_symbol": "RELIANCE",
+            "quantity": 1,
+            "price": 100.0,
+            "trade_type": "BUY",
+            "execution_ts": datetime(2023, 6, 28 + i),
+            "created_at": datetime(2023, 6, 28 + i),
+        }
+        for i in range(3)
+    ]))
+    return TradeRepository(db_session, archive=archive)
+
+def test_archive_read_is_pruned_by_range(archived_trade_repo, test_user_id):
+    archive = archived_trade_repo.archive
+    assert archive.months() == [(2023, 6)]
+    assert not archive.covers(datetime(2023, 7, 1), datetime(2023, 7, 31))
+    rows = list(archive.read(datetime(2023, 6, 29), datetime(2023, 7, 31), test_user_id))
+    assert [row.id for row in rows] == ["archived-1", "archived-2"]
+
+def test_time_range_reads_archive_and_live_trades(archived_trade_repo, test_user_id):
+    live = create_user_trades(archived_trade_repo, test_user_id, 2)
+    trades = archived_trade_repo.get_trades_by_time_range(datetime(2023, 6, 29), datetime(2023, 7, 31))
+    assert [t.id for t in trades] == ["archived-1", "archived-2"] + [t.id for t in live]
+
+def test_user_trades_page_spans_archive(archived_trade_repo, test_user_id):
+    live = create_user_trades(archived_trade_repo, test_user_id, 3)
+    expected = ["archived-0", "archived-1", "archived-2"] + [t.id for t in live]
+    seen = []
+    after = None
+    while True:
+        rows = archived_trade_repo.get_user_trades_page(test_user_id, after, limit=2)
+        seen.extend(row.id for row in rows)
+        if len(rows) < 2:
+            break
+        after = (rows[-1].execution_ts, rows[-1].id)
+    assert seen == expected
+    assert [row.id for row in archived_trade_repo.stream_user_trades(test_user_id)] == expected